@@ -0,0 +1,117 @@
+"""Compare request throughput of the threadpool (sync Session) and AsyncSession paths.
+
+Both endpoints run the same inquiry page query against a temporary SQLite file. Each
+request first runs ``SELECT sleep_ms(:ms)``, a SQL function that blocks in the driver
+for ``--db-latency-ms`` to stand in for the network/database wait of a server database.
+The sync path holds one of Starlette's threadpool slots (40 by default) for that wait;
+the async path only holds an aiosqlite connection.
+
+Usage:
+    poetry run python benchmarks/bench_async_db.py --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from inq_service_svc.models import Base, Inquiry, InquiryStatus
+from inq_service_svc.services.inquiry_service import list_inquiries_page
+
+
+def _sleep_ms(ms):
+    time.sleep((ms or 0) / 1000.0)
+    return ms
+
+
+def _register_sleep(engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        dbapi_connection.create_function("sleep_ms", 1, _sleep_ms)
+
+
+def build_app(db_path: Path, pool_size: int, latency_ms: float) -> FastAPI:
+    sync_engine = create_engine(f"sqlite:///{db_path}", pool_size=pool_size, max_overflow=0, connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", pool_size=pool_size, max_overflow=0)
+    _register_sleep(sync_engine)
+    _register_sleep(async_engine.sync_engine)
+
+    SessionLocal = sessionmaker(bind=sync_engine)
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+    Base.metadata.create_all(sync_engine)
+    with SessionLocal() as db:
+        db.add_all(
+            Inquiry(title=f"Bench {i}", content="x" * 200, customer_email=f"c{i}@example.com", status=InquiryStatus.New)
+            for i in range(1000)
+        )
+        db.commit()
+
+    app = FastAPI()
+
+    @app.get("/sync")
+    def sync_page():
+        with SessionLocal() as db:
+            db.execute(text("SELECT sleep_ms(:ms)"), {"ms": latency_ms})
+            rows, _ = list_inquiries_page(db, limit=20)
+            return {"count": len(rows)}
+
+    @app.get("/async")
+    async def async_page():
+        async with AsyncSessionLocal() as db:
+            await db.execute(text("SELECT sleep_ms(:ms)"), {"ms": latency_ms})
+            rows, _ = await db.run_sync(list_inquiries_page, None, None, 20)
+            return {"count": len(rows)}
+
+    return app
+
+
+async def run(app: FastAPI, path: str, total: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+
+        async def one() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                resp = await client.get(path)
+                resp.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--db-latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(Path(tmp) / "bench.db", pool_size=args.concurrency, latency_ms=args.db_latency_ms)
+        print(f"requests={args.requests} concurrency={args.concurrency} db_latency_ms={args.db_latency_ms}")
+        for label, path in (("threadpool (sync Session)", "/sync"), ("async (AsyncSession)", "/async")):
+            result = asyncio.run(run(app, path, args.requests, args.concurrency))
+            print(f"{label:28s} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
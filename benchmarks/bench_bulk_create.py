@@ -0,0 +1,81 @@
+"""Compare inquiry insert throughput: create_inquiry per item vs one create_inquiries call.
+
+Both paths write pre-classified inquiries (no LLM calls) to a temporary SQLite file with
+``--staff`` staff users. The per-item path runs staff assignment, an INSERT and a commit
+for every inquiry; the bulk path plans the assignments from one workload snapshot and
+writes each batch of ``--batch-size`` inquiries with one executemany INSERT and one commit.
+
+Usage:
+    poetry run python benchmarks/bench_bulk_create.py --inquiries 5000 --batch-size 500
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from inq_service_svc.models import Base, User, UserRole
+from inq_service_svc.schemas.inquiry import InquiryCreate
+from inq_service_svc.services.classifier import ClassificationResult
+from inq_service_svc.services.inquiry_service import create_inquiries, create_inquiry
+
+RESULT = ClassificationResult(category="General", urgency="Low")
+
+
+def build_session_factory(db_path: Path, staff: int):
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        db.add_all(
+            User(email=f"staff{i}@example.com", hashed_password="h", name=f"Staff {i}", role=UserRole.Staff)
+            for i in range(staff)
+        )
+        db.commit()
+    return SessionLocal
+
+
+def payloads(count: int):
+    return [
+        InquiryCreate(title=f"Inquiry {i}", content="x" * 200, customer_email=f"c{i}@example.com")
+        for i in range(count)
+    ]
+
+
+def per_item(SessionLocal, items) -> float:
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        for item in items:
+            create_inquiry(db, item, RESULT)
+        return time.perf_counter() - start
+
+
+def bulk(SessionLocal, items, batch_size: int) -> float:
+    with SessionLocal() as db:
+        start = time.perf_counter()
+        for offset in range(0, len(items), batch_size):
+            batch = items[offset:offset + batch_size]
+            create_inquiries(db, batch, [RESULT] * len(batch))
+        return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inquiries", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--staff", type=int, default=20)
+    args = parser.parse_args()
+
+    items = payloads(args.inquiries)
+    print(f"inquiries={args.inquiries} batch_size={args.batch_size} staff={args.staff}")
+    with tempfile.TemporaryDirectory() as tmp:
+        elapsed = per_item(build_session_factory(Path(tmp) / "per_item.db", args.staff), items)
+        print(f"create_inquiry per item: {args.inquiries / elapsed:10.1f} rows/s")
+        elapsed = bulk(build_session_factory(Path(tmp) / "bulk.db", args.staff), items, args.batch_size)
+        print(f"create_inquiries bulk:   {args.inquiries / elapsed:10.1f} rows/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Compare outbound mail throughput: one SMTP connection per message vs the mail outbox.
+
+Both modes deliver to a local SMTP stand-in. The stand-in sleeps ``--connect-latency-ms``
+before its greeting to stand in for the TCP, STARTTLS and AUTH round trips of a real
+server, and ``--message-latency-ms`` before accepting each message. The per-message mode
+opens a connection for every email like send_email does; the outbox mode stores the
+emails in a temporary SQLite file and delivers them with MailOutbox sender threads that
+keep their connection open.
+
+Usage:
+    poetry run python benchmarks/bench_mail_outbox.py --emails 500 --workers 4
+"""
+import argparse
+import socketserver
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from inq_service_svc.models import Base
+from inq_service_svc.services.mail_outbox import MailOutbox, enqueue_email
+from inq_service_svc.utils.email_client import SmtpConnection, build_email_message
+
+
+class SmtpStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, connect_latency: float, message_latency: float) -> None:
+        super().__init__(("127.0.0.1", 0), SmtpHandler)
+        self.connect_latency = connect_latency
+        self.message_latency = message_latency
+        self.connections = 0
+        self.messages = 0
+        self.lock = threading.Lock()
+
+
+class SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str) -> None:
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        time.sleep(server.connect_latency)
+        self.reply("220 localhost ESMTP stand-in")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250-localhost")
+                self.reply("250 8BITMIME")
+            elif command.startswith("DATA"):
+                self.reply("354 end data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline() not in (b".\r\n", b""):
+                    pass
+                time.sleep(server.message_latency)
+                with server.lock:
+                    server.messages += 1
+                self.reply("250 OK")
+            elif command.startswith("QUIT"):
+                self.reply("221 bye")
+                return
+            else:
+                # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 OK")
+
+
+def per_message(connection_factory, emails: int, workers: int) -> float:
+    def send(i: int) -> None:
+        connection = connection_factory()
+        try:
+            connection.send(build_email_message(f"c{i}@example.com", f"Re: Inquiry {i}", "Thanks for reaching out."))
+        finally:
+            connection.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(workers) as pool:
+        list(pool.map(send, range(emails)))
+    return time.perf_counter() - start
+
+
+def outbox(connection_factory, emails: int, workers: int, db_path: Path) -> float:
+    engine = create_engine(f"sqlite:///{db_path}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine)
+    with SessionLocal() as db:
+        rows = [
+            enqueue_email(db, f"c{i}@example.com", f"Re: Inquiry {i}", "Thanks for reaching out.")
+            for i in range(emails)
+        ]
+        db.commit()
+        ids = [row.id for row in rows]
+
+    mail_outbox = MailOutbox(session_factory=SessionLocal, connection_factory=connection_factory, queue_size=emails)
+    start = time.perf_counter()
+    mail_outbox.start(workers)
+    for outbound_id in ids:
+        mail_outbox.submit(outbound_id)
+    mail_outbox.join()
+    elapsed = time.perf_counter() - start
+    mail_outbox.stop()
+    print(f"  outbox stats: {mail_outbox.stats()}")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--connect-latency-ms", type=float, default=150.0)
+    parser.add_argument("--message-latency-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    server = SmtpStandIn(args.connect_latency_ms / 1000.0, args.message_latency_ms / 1000.0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    connection_factory = partial(SmtpConnection, host=host, port=port, account="", starttls=False)
+
+    try:
+        elapsed = per_message(connection_factory, args.emails, args.workers)
+        print(f"per-message connections: {args.emails / elapsed:8.1f} emails/s ({server.connections} connections)")
+
+        server.connections = 0
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed = outbox(connection_factory, args.emails, args.workers, Path(tmp) / "outbox.db")
+        print(f"outbox:                  {args.emails / elapsed:8.1f} emails/s ({server.connections} connections)")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Time StaffAssigner.pick inside a transaction with uncommitted assignments against a full scan.
+
+Each run seeds ``--staff`` staff users with random workloads and makes ``--picks`` picks in
+one transaction, recording every pick as a pending +1 delta the way a commit=False batch
+of create_inquiry calls does. Every ``--commit-every`` picks another transaction commits a
+change (a completion lowers a count) so the transaction's heap copy has to catch up. The
+full scan is the per-pick O(n) min over all staff that pick used before.
+
+Usage:
+    poetry run python benchmarks/bench_staff_assigner.py --staff 100 1000 10000 --picks 500
+"""
+import argparse
+import random
+import time
+from collections import Counter
+
+from inq_service_svc.services.staff_assigner import StaffAssigner
+
+
+def seeded(staff: int, rng: random.Random) -> StaffAssigner:
+    assigner = StaffAssigner()
+    assigner.ready = True
+    workloads = {user_id: rng.randrange(10) for user_id in range(staff)}
+    assigner.apply(workloads, {user_id: True for user_id in workloads})
+    return assigner
+
+
+def run(staff: int, picks: int, commit_every: int, seed: int) -> None:
+    timings = {}
+    for mode in ("heap", "scan"):
+        rng = random.Random(seed)
+        assigner = seeded(staff, rng)
+        pending = {"deltas": Counter(), "staff": {}, "changed": set()}
+        start = time.perf_counter()
+        for i in range(picks):
+            if mode == "heap":
+                user_id = assigner.pick(pending)
+            else:
+                deltas = pending["deltas"]
+                user_id = min((count + deltas.get(uid, 0), uid) for uid, count in assigner.snapshot().items())[1]
+            pending["deltas"][user_id] += 1
+            pending["changed"].add(user_id)
+            if commit_every and i % commit_every == 0:
+                assigner.apply({rng.randrange(staff): -1}, {})
+        timings[mode] = (time.perf_counter() - start) / picks
+    print(
+        f"staff={staff:6d}  heap {timings['heap'] * 1e6:8.1f} us/pick  "
+        f"scan {timings['scan'] * 1e6:8.1f} us/pick  speedup {timings['scan'] / timings['heap']:6.1f}x"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--staff", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--picks", type=int, default=500)
+    parser.add_argument("--commit-every", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    for staff in args.staff:
+        run(staff, args.picks, args.commit_every, args.seed)
+
+
+if __name__ == "__main__":
+    main()
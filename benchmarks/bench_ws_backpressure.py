@@ -0,0 +1,103 @@
+"""Measure websocket delivery latency to healthy clients while some clients are throttled.
+
+``--connections`` fake sockets subscribe to ``all``; a ``--slow-fraction`` of them take
+``--slow-delay`` seconds per send (a client on a bad network). ``--events`` events are sent
+``--interval`` seconds apart, first with a sequential fan-out awaiting every send in turn
+(the behaviour before per-connection send queues), then through ConnectionManager.publish.
+Reported: how long the publishing call takes and the delivery latency (publish -> send
+done) seen by the healthy clients. With queues both stay flat as the slow fraction grows;
+slow clients only fall behind themselves (and lose messages per WS_QUEUE_POLICY).
+
+Usage:
+    poetry run python benchmarks/bench_ws_backpressure.py --connections 500 --slow-fraction 0 0.01 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from inq_service_svc.utils.websocket_manager import ConnectionManager
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.latencies = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.latencies.append(time.perf_counter() - float(message))
+
+
+def build_clients(connections: int, slow_fraction: float, slow_delay: float):
+    slow = int(connections * slow_fraction)
+    return [FakeWebSocket(slow_delay if i < slow else 0.0) for i in range(connections)]
+
+
+def summarize(label: str, publish_times, clients) -> None:
+    latencies = sorted(latency for client in clients if not client.delay for latency in client.latencies)
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0
+    print(
+        f"  {label:10s} publish call avg {statistics.mean(publish_times) * 1e3:8.2f} ms   "
+        f"healthy delivery p50 {statistics.median(latencies) * 1e3:8.2f} ms  p99 {p99 * 1e3:8.2f} ms"
+    )
+
+
+async def sequential(clients, events: int, interval: float) -> None:
+    publish_times = []
+    for _ in range(events):
+        start = time.perf_counter()
+        for client in clients:
+            await client.send_text(repr(start))
+        publish_times.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    summarize("sequential", publish_times, clients)
+
+
+async def queued(clients, events: int, interval: float, queue_size: int, policy: str) -> None:
+    manager = ConnectionManager(queue_size=queue_size, policy=policy, send_timeout=0)
+    for client in clients:
+        await manager.connect(client)
+    publish_times = []
+    for _ in range(events):
+        start = time.perf_counter()
+        await manager.publish(["all"], repr(start))
+        publish_times.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    # give healthy clients time to finish; slow ones are abandoned
+    await asyncio.sleep(interval * 5)
+    summarize("queued", publish_times, clients)
+    stats = manager.stats()
+    print(f"  {'':10s} dropped={stats['dropped']} evicted={stats['evicted']} queued={stats['queued']}")
+    for client in list(manager.active_connections):
+        manager.disconnect(client)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--slow-fraction", type=float, nargs="+", default=[0.0, 0.01, 0.1])
+    parser.add_argument("--slow-delay", type=float, default=0.05)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.02)
+    parser.add_argument("--queue-size", type=int, default=100)
+    parser.add_argument("--policy", default="drop_oldest")
+    args = parser.parse_args()
+
+    for fraction in args.slow_fraction:
+        print(f"connections={args.connections} slow={fraction:.0%} slow_delay={args.slow_delay}s")
+        clients = build_clients(args.connections, fraction, args.slow_delay)
+        asyncio.run(sequential(clients, args.events, args.interval))
+        clients = build_clients(args.connections, fraction, args.slow_delay)
+        asyncio.run(queued(clients, args.events, args.interval, args.queue_size, args.policy))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Count websocket frames and bytes for a burst of inquiry updates with and without a coalescing window.
+
+``--connections`` fake sockets subscribe to ``all``. Each run publishes ``--events``
+``inquiry_updated`` events spread over ``--inquiries`` inquiries ``--interval`` seconds apart
+(an import or bulk reassignment), once per ``--window`` (milliseconds; 0 sends every event
+as its own frame). Reported per connection: frames, events delivered (repeated updates of
+one inquiry collapse to the latest), bytes, and bytes after deflate, which is roughly what
+permessage-deflate puts on the wire; batched frames compress better than single events.
+
+Usage:
+    poetry run python benchmarks/bench_ws_coalesce.py --connections 100 --events 500 --window 0 25 100
+"""
+import argparse
+import asyncio
+import json
+import time
+import zlib
+
+from inq_service_svc.utils.websocket_manager import ConnectionManager, inquiry_topics
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.frames = 0
+        self.bytes = 0
+        self.deflated = 0
+        # one compression context per connection, as permessage-deflate keeps by default
+        self._deflate = zlib.compressobj(wbits=-15)
+
+    async def accept(self) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        data = message.encode("utf-8")
+        self.frames += 1
+        self.bytes += len(data)
+        self.deflated += len(self._deflate.compress(data) + self._deflate.flush(zlib.Z_SYNC_FLUSH))
+
+
+async def run(connections: int, events: int, inquiries: int, interval: float, window_ms: int) -> None:
+    manager = ConnectionManager(queue_size=events + 1, send_timeout=0, coalesce_window=window_ms / 1000.0)
+    sockets = [FakeWebSocket() for _ in range(connections)]
+    for websocket in sockets:
+        await manager.connect(websocket)
+
+    start = time.perf_counter()
+    for i in range(events):
+        inquiry_id = i % inquiries + 1
+        message = json.dumps(
+            {"event": "inquiry_updated", "inquiry_id": inquiry_id, "status": "InProgress", "assigned_user_id": i}
+        )
+        await manager.publish(inquiry_topics(inquiry_id), message, key=f"inquiry_updated:{inquiry_id}")
+        await asyncio.sleep(interval)
+    await manager.drain()
+    elapsed = time.perf_counter() - start
+
+    stats = manager.stats()
+    print(
+        f"window={window_ms:4d} ms  frames/conn {stats['frames'] / connections:7.1f}  "
+        f"events/conn {stats['sent'] / connections:7.1f}  "
+        f"bytes/conn {sum(ws.bytes for ws in sockets) / connections:9.0f}  "
+        f"deflated/conn {sum(ws.deflated for ws in sockets) / connections:8.0f}  "
+        f"send avg {stats['latency']['send']['seconds_avg'] * 1e3:6.2f} ms  total {elapsed:5.2f} s"
+    )
+    for websocket in sockets:
+        manager.disconnect(websocket)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, default=100)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--inquiries", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.001)
+    parser.add_argument("--window", type=int, nargs="+", default=[0, 25, 100])
+    args = parser.parse_args()
+
+    for window_ms in args.window:
+        asyncio.run(run(args.connections, args.events, args.inquiries, args.interval, window_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Compare websocket fan-out cost: broadcast to every connection vs publish to topic subscribers.
+
+``--connections`` fake sockets (sends are counted, not written anywhere) are connected to a
+ConnectionManager; ``--subscribers`` of them watch ``inquiry:1``, the others watch other
+inquiries. Each run sends ``--events`` ``inquiry_updated`` events for inquiry 1, once with
+``broadcast`` (the old behaviour) and once with ``publish``. Broadcast time grows with the
+number of connections; publish time stays flat as long as the subscriber count does.
+
+A second run connects every socket as a different user subscribed to ``all`` (``--admins``
+of them Admins) and counts the sends of one reassignment event published to the topics
+alone and with the two affected users as ``audience``.
+
+Usage:
+    poetry run python benchmarks/bench_ws_fanout.py --connections 100 1000 10000 --subscribers 20
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from inq_service_svc.utils.websocket_manager import ConnectionManager, inquiry_topics
+
+
+class FakeWebSocket:
+    def __init__(self) -> None:
+        self.sent = 0
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        self.sent += 1
+
+
+async def build_manager(connections: int, subscribers: int) -> ConnectionManager:
+    manager = ConnectionManager(default_topics=())
+    for i in range(connections):
+        topic = "inquiry:1" if i < subscribers else f"inquiry:{i + 2}"
+        await manager.connect(FakeWebSocket(), [topic])
+    return manager
+
+
+async def run_assignment(connections: int, admins: int, events: int) -> None:
+    sockets = [FakeWebSocket() for _ in range(connections)]
+    manager = ConnectionManager(default_topics=("all",), queue_size=events * 2 + 1)
+    for user_id, websocket in enumerate(sockets):
+        await manager.connect(websocket, user_id=user_id, role="Admin" if user_id < admins else "Staff")
+    message = json.dumps({"event": "inquiry_updated", "inquiry_id": 1, "status": "New", "assigned_user_id": admins + 1})
+    topics = inquiry_topics(1, ["New"], [admins, admins + 1])
+
+    counts = []
+    for audience in (None, [admins, admins + 1]):
+        before = sum(websocket.sent for websocket in sockets)
+        for _ in range(events):
+            await manager.publish(topics, message, audience=audience)
+        await manager.drain()
+        counts.append((sum(websocket.sent for websocket in sockets) - before) / events)
+    for websocket in sockets:
+        manager.disconnect(websocket)
+
+    print(
+        f"connections={connections:6d} admins={admins:4d} reassignment sends/event: "
+        f"topics {counts[0]:8.0f}  audience {counts[1]:6.0f}"
+    )
+
+
+async def run(connections: int, subscribers: int, events: int) -> None:
+    manager = await build_manager(connections, subscribers)
+    message = json.dumps({"event": "inquiry_updated", "inquiry_id": 1, "status": "InProgress"})
+    topics = inquiry_topics(1, ["New", "InProgress"], [3])
+
+    start = time.perf_counter()
+    for _ in range(events):
+        await manager.broadcast(message)
+    broadcast_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(events):
+        await manager.publish(topics, message)
+    publish_elapsed = time.perf_counter() - start
+
+    print(
+        f"connections={connections:6d} subscribers={subscribers:4d} "
+        f"broadcast: {broadcast_elapsed / events * 1e6:10.1f} us/event  "
+        f"publish: {publish_elapsed / events * 1e6:8.1f} us/event"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--connections", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--subscribers", type=int, default=20)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--admins", type=int, default=5)
+    args = parser.parse_args()
+
+    for connections in args.connections:
+        asyncio.run(run(connections, min(args.subscribers, connections), args.events))
+    for connections in args.connections:
+        asyncio.run(run_assignment(connections, min(args.admins, connections - 2), min(args.events, 20)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""add outbound_emails table
+
+Revision ID: 0c6e2f9a7d31
+Revises: f7b3d1e8a254
+Create Date: 2026-10-17 14:37:19.264830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0c6e2f9a7d31'
+down_revision: Union[str, None] = 'f7b3d1e8a254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'outbound_emails',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('to_email', sa.String(), nullable=False),
+        sa.Column('subject', sa.String(), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('status', sa.Enum('Pending', 'Sent', 'Failed', name='outboundemailstatus', native_enum=False), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('sent_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_outbound_emails_status_next_attempt_at', 'outbound_emails', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_outbound_emails_status_next_attempt_at', table_name='outbound_emails')
+    op.drop_table('outbound_emails')
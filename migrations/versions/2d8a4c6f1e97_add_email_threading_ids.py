@@ -0,0 +1,32 @@
+"""add email threading ids to messages and outbound_emails
+
+Revision ID: 2d8a4c6f1e97
+Revises: 0c6e2f9a7d31
+Create Date: 2026-10-17 15:12:56.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d8a4c6f1e97'
+down_revision: Union[str, None] = '0c6e2f9a7d31'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('messages', sa.Column('email_message_id', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_messages_email_message_id'), 'messages', ['email_message_id'], unique=True)
+    op.add_column('outbound_emails', sa.Column('message_id', sa.String(length=255), nullable=True))
+    op.add_column('outbound_emails', sa.Column('in_reply_to', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('outbound_emails', 'in_reply_to')
+    op.drop_column('outbound_emails', 'message_id')
+    op.drop_index(op.f('ix_messages_email_message_id'), table_name='messages')
+    op.drop_column('messages', 'email_message_id')
@@ -0,0 +1,34 @@
+"""add sender_filter_rules table
+
+Revision ID: 4e9b7a1c3d58
+Revises: 2d8a4c6f1e97
+Create Date: 2026-10-17 16:02:41.118305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e9b7a1c3d58'
+down_revision: Union[str, None] = '2d8a4c6f1e97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'sender_filter_rules',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('kind', sa.Enum('Domain', 'Address', 'Subject', 'Header', name='senderfilterkind', native_enum=False), nullable=False),
+        sa.Column('pattern', sa.String(length=1024), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('sender_filter_rules')
@@ -0,0 +1,39 @@
+"""add indexes for hot inquiry and message queries
+
+Revision ID: 5f2c9d8e7b61
+Revises: 1a3b4cf636ba
+Create Date: 2026-10-17 09:12:41.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c9d8e7b61'
+down_revision: Union[str, None] = '1a3b4cf636ba'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # assign_staff: active workload grouped per assignee
+    op.create_index('ix_inquiries_status_assigned_user_id', 'inquiries', ['status', 'assigned_user_id'], unique=False)
+    op.create_index(op.f('ix_inquiries_assigned_user_id'), 'inquiries', ['assigned_user_id'], unique=False)
+    # list_inquiries: keyset pagination with and without the status filter
+    op.create_index('ix_inquiries_created_at_id', 'inquiries', ['created_at', 'id'], unique=False)
+    op.create_index('ix_inquiries_status_created_at_id', 'inquiries', ['status', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_inquiries_customer_email'), 'inquiries', ['customer_email'], unique=False)
+    # selectinload(Inquiry.messages) on the detail endpoint
+    op.create_index(op.f('ix_messages_inquiry_id'), 'messages', ['inquiry_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_messages_inquiry_id'), table_name='messages')
+    op.drop_index(op.f('ix_inquiries_customer_email'), table_name='inquiries')
+    op.drop_index('ix_inquiries_status_created_at_id', table_name='inquiries')
+    op.drop_index('ix_inquiries_created_at_id', table_name='inquiries')
+    op.drop_index(op.f('ix_inquiries_assigned_user_id'), table_name='inquiries')
+    op.drop_index('ix_inquiries_status_assigned_user_id', table_name='inquiries')
@@ -0,0 +1,35 @@
+"""add classification_source to inquiries
+
+Revision ID: 6c2e8f4a1b93
+Revises: 9a1d5e3f7c20
+Create Date: 2026-10-17 18:42:51.208734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c2e8f4a1b93'
+down_revision: Union[str, None] = '9a1d5e3f7c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing labels stay NULL: LLM answers cannot be told apart from fallbacks and local
+    # classifier answers, so they are not used for training
+    op.add_column(
+        'inquiries',
+        sa.Column(
+            'classification_source',
+            sa.Enum('LLM', 'Staff', 'Local', 'Fallback', name='classificationsource', native_enum=False),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('inquiries', 'classification_source')
@@ -0,0 +1,45 @@
+"""add staff_workloads counters
+
+Revision ID: 8b41e0c6d2a7
+Revises: 5f2c9d8e7b61
+Create Date: 2026-10-17 10:03:18.220941
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b41e0c6d2a7'
+down_revision: Union[str, None] = '5f2c9d8e7b61'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('staff_workloads',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('active_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index('ix_staff_workloads_active_count_user_id', 'staff_workloads', ['active_count', 'user_id'], unique=False)
+    # backfill one counter row per existing user from the current backlog; the status
+    # column (native_enum=False) stores enum names, so On-Hold is stored as 'On_Hold'
+    op.execute(
+        """
+        INSERT INTO staff_workloads (user_id, active_count)
+        SELECT users.id,
+               (SELECT count(inquiries.id) FROM inquiries
+                WHERE inquiries.assigned_user_id = users.id
+                  AND inquiries.status IN ('New', 'On_Hold'))
+        FROM users
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_staff_workloads_active_count_user_id', table_name='staff_workloads')
+    op.drop_table('staff_workloads')
@@ -0,0 +1,37 @@
+"""add classification_status to inquiries
+
+Revision ID: c3e7a19f4b52
+Revises: 8b41e0c6d2a7
+Create Date: 2026-10-17 11:20:07.614382
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e7a19f4b52'
+down_revision: Union[str, None] = '8b41e0c6d2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # existing rows were classified synchronously
+    op.add_column(
+        'inquiries',
+        sa.Column(
+            'classification_status',
+            sa.Enum('Pending', 'Classified', name='classificationstatus', native_enum=False),
+            nullable=False,
+            server_default='Classified',
+        ),
+    )
+    op.create_index(op.f('ix_inquiries_classification_status'), 'inquiries', ['classification_status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inquiries_classification_status'), table_name='inquiries')
+    op.drop_column('inquiries', 'classification_status')
@@ -0,0 +1,35 @@
+"""add classification_cache table
+
+Revision ID: d1f4b8a2c960
+Revises: c3e7a19f4b52
+Create Date: 2026-10-17 12:02:44.180356
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f4b8a2c960'
+down_revision: Union[str, None] = 'c3e7a19f4b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'classification_cache',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('category', sa.String(), nullable=False),
+        sa.Column('urgency', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+    op.create_index(op.f('ix_classification_cache_created_at'), 'classification_cache', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_classification_cache_created_at'), table_name='classification_cache')
+    op.drop_table('classification_cache')
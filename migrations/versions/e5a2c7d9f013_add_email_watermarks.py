@@ -0,0 +1,32 @@
+"""add email_watermarks table
+
+Revision ID: e5a2c7d9f013
+Revises: d1f4b8a2c960
+Create Date: 2026-10-17 13:21:08.537412
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a2c7d9f013'
+down_revision: Union[str, None] = 'd1f4b8a2c960'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'email_watermarks',
+        sa.Column('folder', sa.String(), nullable=False),
+        sa.Column('uid_validity', sa.BigInteger(), nullable=True),
+        sa.Column('last_uid', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('folder'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('email_watermarks')
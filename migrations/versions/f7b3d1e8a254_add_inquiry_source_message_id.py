@@ -0,0 +1,28 @@
+"""add inquiries.source_message_id
+
+Revision ID: f7b3d1e8a254
+Revises: e5a2c7d9f013
+Create Date: 2026-10-17 13:58:41.902115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3d1e8a254'
+down_revision: Union[str, None] = 'e5a2c7d9f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('inquiries', sa.Column('source_message_id', sa.String(length=255), nullable=True))
+    op.create_index(op.f('ix_inquiries_source_message_id'), 'inquiries', ['source_message_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_inquiries_source_message_id'), table_name='inquiries')
+    op.drop_column('inquiries', 'source_message_id')
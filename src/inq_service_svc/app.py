@@ -1,11 +1,38 @@
+import asyncio
 from fastapi import FastAPI
 import logging
 from contextlib import asynccontextmanager
+from datetime import datetime
 
 # scheduler and job imports
-from inq_service_svc.config import EMAIL_POLLING_INTERVAL
+from inq_service_svc.config import (
+    EMAIL_POLLING_INTERVAL,
+    WORKLOAD_RECONCILE_INTERVAL,
+    STAFF_ASSIGNER_ENABLED,
+    STAFF_ASSIGNER_RESYNC_INTERVAL,
+    CLASSIFICATION_WORKERS,
+    CLASSIFICATION_SWEEP_INTERVAL,
+    EMAIL_IDLE_ENABLED,
+    EMAIL_OUTBOX_ENABLED,
+    EMAIL_OUTBOX_WORKERS,
+    EMAIL_OUTBOX_SWEEP_INTERVAL,
+    SCHEDULER_LEASE_RENEW_INTERVAL,
+)
 from inq_service_svc.utils.scheduler import init_scheduler, shutdown_scheduler
 from inq_service_svc.services.email_processor import process_incoming_emails
+from inq_service_svc.services.email_listener import build_email_listener
+from inq_service_svc.services.email_normalizer import email_normalizer
+from inq_service_svc.services.leader_lease import leader_lease, leader_only, process_leader_lease_renewal
+from inq_service_svc.services.mail_outbox import mail_outbox, process_outbound_email_retries
+from inq_service_svc.services.workload_service import process_workload_reconciliation
+from inq_service_svc.services.staff_assigner import process_staff_assigner_resync
+from inq_service_svc.services.classification_worker import (
+    classification_deferred,
+    classification_worker,
+    process_pending_classifications,
+)
+from inq_service_svc.utils.websocket_backplane import build_backplane
+from inq_service_svc.utils.websocket_manager import manager as websocket_manager
 
 logger = logging.getLogger(__name__)
 
@@ -13,36 +40,134 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan: start scheduler and register recurring email polling job."""
+    email_listener = None
+    follow_leadership = None
     try:
         try:
             scheduler = init_scheduler()
+            # every process competes for the lease; jobs wrapped in leader_only run in the holder only
+            await asyncio.to_thread(leader_lease.renew)
+            scheduler.add_job(
+                process_leader_lease_renewal,
+                "interval",
+                seconds=SCHEDULER_LEASE_RENEW_INTERVAL,
+                id="leader_lease_renewal",
+                replace_existing=True,
+            )
             # register job idempotently
             scheduler.add_job(
-                process_incoming_emails,
+                leader_only(process_incoming_emails),
                 "interval",
                 minutes=EMAIL_POLLING_INTERVAL,
                 id="email_polling",
                 replace_existing=True,
             )
             logger.info("Scheduler initialized and email polling job registered with interval %s minutes", EMAIL_POLLING_INTERVAL)
+            scheduler.add_job(
+                leader_only(process_workload_reconciliation),
+                "interval",
+                minutes=WORKLOAD_RECONCILE_INTERVAL,
+                id="workload_reconcile",
+                replace_existing=True,
+            )
+            if STAFF_ASSIGNER_ENABLED:
+                # seed before serving requests, then resync periodically
+                process_staff_assigner_resync()
+                scheduler.add_job(
+                    process_staff_assigner_resync,
+                    "interval",
+                    minutes=STAFF_ASSIGNER_RESYNC_INTERVAL,
+                    id="staff_assigner_resync",
+                    replace_existing=True,
+                )
+            if EMAIL_IDLE_ENABLED:
+                # push ingestion; the polling job above stays as a fallback. Only the leader
+                # keeps an IDLE connection, handed over when leadership moves.
+                email_listener = build_email_listener()
+                listener = email_listener
+
+                def follow_leadership(is_leader: bool) -> None:
+                    if is_leader:
+                        listener.start()
+                    else:
+                        listener.stop()
+
+                leader_lease.on_change(follow_leadership)
+                if leader_lease.is_leader:
+                    email_listener.start()
+            if EMAIL_OUTBOX_ENABLED:
+                mail_outbox.start(EMAIL_OUTBOX_WORKERS)
+                # first sweep right away to send emails left pending by a previous run
+                scheduler.add_job(
+                    process_outbound_email_retries,
+                    "interval",
+                    minutes=EMAIL_OUTBOX_SWEEP_INTERVAL,
+                    id="mail_outbox_sweep",
+                    replace_existing=True,
+                    next_run_time=datetime.now(),
+                )
+            # relay websocket events to the connections of the other worker processes
+            backplane = build_backplane()
+            if backplane is not None:
+                await websocket_manager.start_backplane(backplane)
+                logger.info("Websocket events relayed through the %s backplane", backplane.name)
+            if classification_deferred():
+                await classification_worker.start(CLASSIFICATION_WORKERS)
+                # first sweep right away to pick up inquiries left pending by a previous run
+                scheduler.add_job(
+                    process_pending_classifications,
+                    "interval",
+                    minutes=CLASSIFICATION_SWEEP_INTERVAL,
+                    id="classification_sweep",
+                    replace_existing=True,
+                    next_run_time=datetime.now(),
+                )
         except Exception as e:
             logger.error(e, exc_info=True)
             # re-raise so startup fails visibly
             raise
         yield
     finally:
+        if follow_leadership is not None:
+            leader_lease.remove_on_change(follow_leadership)
+        if email_listener is not None:
+            try:
+                await asyncio.to_thread(email_listener.stop)
+            except Exception as e:
+                logger.error(e, exc_info=True)
+        try:
+            await asyncio.to_thread(mail_outbox.stop)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+        try:
+            await asyncio.to_thread(email_normalizer.shutdown)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+        try:
+            await classification_worker.stop()
+        except Exception as e:
+            logger.error(e, exc_info=True)
+        try:
+            await websocket_manager.stop_backplane()
+        except Exception as e:
+            logger.error(e, exc_info=True)
         try:
             await shutdown_scheduler()
             logger.info("Scheduler shutdown complete")
         except Exception as e:
             logger.error(e, exc_info=True)
+        try:
+            # let another process take over the leader-only jobs right away
+            await asyncio.to_thread(leader_lease.release)
+        except Exception as e:
+            logger.error(e, exc_info=True)
 
 
 # Create FastAPI app instance for the service with lifespan handling
 app = FastAPI(debug=True, title="inq_service_svc", lifespan=lifespan)
 
 # Import and register routers directly. Keep app file minimal.
-from inq_service_svc.routers import auth_router, users_router, inquiries_router, websocket_router
+from inq_service_svc.routers import auth_router, users_router, inquiries_router, websocket_router, metrics_router
 
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 # users_router is expected to be present; include it directly.
@@ -56,3 +181,7 @@ if inquiries_router is not None:
 # websocket router mounted under /api so WS endpoint becomes /api/ws
 if websocket_router is not None:
     app.include_router(websocket_router, prefix="/api", tags=["websocket"])
+
+# operational metrics (Admin only)
+if metrics_router is not None:
+    app.include_router(metrics_router, prefix="/api/metrics", tags=["metrics"])
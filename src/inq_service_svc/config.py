@@ -6,6 +6,38 @@ load_dotenv()
 
 # Basic configuration loaded from environment with safe defaults for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///:memory:")
+# Async driver URL used by the API routers. Derived from DATABASE_URL when unset
+# (sqlite -> sqlite+aiosqlite, postgresql -> postgresql+asyncpg).
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+
+# Database connection pool (applied to server databases; SQLite keeps its default pool)
+try:
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    DB_POOL_SIZE = 5
+
+try:
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    DB_MAX_OVERFLOW = 10
+
+try:
+    # seconds to wait for a free connection before raising
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    DB_POOL_TIMEOUT = 30.0
+
+try:
+    # seconds after which a pooled connection is replaced; -1 disables recycling
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    DB_POOL_RECYCLE = 1800
+
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").strip().lower() in ("1", "true", "yes", "on")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 OPENAI_MODEL_NAME = os.getenv("OPENAI_MODEL_NAME", "gpt-4o")
 
@@ -31,6 +63,8 @@ except Exception as e:
 
 # Comma separated list of blacklisted sender domains
 EMAIL_DOMAIN_BLACKLIST: str = os.getenv("EMAIL_DOMAIN_BLACKLIST", "")
+# Optional rule file for the sender filter (services/sender_filter.py), reloaded when it changes
+EMAIL_SENDER_FILTER_FILE: str = os.getenv("EMAIL_SENDER_FILTER_FILE", "")
 
 # New: polling interval for background email processing in minutes
 try:
@@ -38,3 +72,294 @@ try:
 except Exception as e:
     logging.error(e, exc_info=True)
     EMAIL_POLLING_INTERVAL = 5
+
+# Messages fetched per IMAP request; a run keeps fetching chunks until the backlog is drained
+try:
+    EMAIL_FETCH_BATCH_SIZE: int = int(os.getenv("EMAIL_FETCH_BATCH_SIZE", "50"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_FETCH_BATCH_SIZE = 50
+
+# Upper bound of chunks fetched in one run so a run cannot hold the ingestion lock indefinitely
+try:
+    EMAIL_FETCH_MAX_BATCHES: int = int(os.getenv("EMAIL_FETCH_MAX_BATCHES", "100"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_FETCH_MAX_BATCHES = 100
+
+# Email body normalization (services/email_normalizer.py): stored content is capped at
+# EMAIL_BODY_MAX_CHARS; longer bodies are spooled to EMAIL_SPOOL_DIR when set
+try:
+    EMAIL_BODY_MAX_CHARS: int = int(os.getenv("EMAIL_BODY_MAX_CHARS", "20000"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_BODY_MAX_CHARS = 20000
+
+EMAIL_SPOOL_DIR: str = os.getenv("EMAIL_SPOOL_DIR", "")
+
+# Processes converting HTML bodies of large batches (0 = always in the ingestion thread)
+try:
+    EMAIL_PARSE_WORKERS: int = int(os.getenv("EMAIL_PARSE_WORKERS", "2"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_PARSE_WORKERS = 2
+
+# Batches with fewer body characters than this are normalized without the process pool
+try:
+    EMAIL_PARSE_OFFLOAD_MIN_BYTES: int = int(os.getenv("EMAIL_PARSE_OFFLOAD_MIN_BYTES", "262144"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_PARSE_OFFLOAD_MIN_BYTES = 262144
+
+# Bloom filter sizing for the ingested Message-ID pre-filter (services/email_dedup.py)
+try:
+    EMAIL_DEDUP_BLOOM_CAPACITY: int = int(os.getenv("EMAIL_DEDUP_BLOOM_CAPACITY", "1000000"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_DEDUP_BLOOM_CAPACITY = 1000000
+
+try:
+    EMAIL_DEDUP_BLOOM_ERROR_RATE: float = float(os.getenv("EMAIL_DEDUP_BLOOM_ERROR_RATE", "0.01"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_DEDUP_BLOOM_ERROR_RATE = 0.01
+
+# Long-lived IMAP IDLE connection reacting to new mail within seconds (services/email_listener.py).
+# The polling job stays registered as a fallback.
+EMAIL_IDLE_ENABLED: bool = os.getenv("EMAIL_IDLE_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Seconds before IDLE is re-issued; RFC 2177 asks for less than 29 minutes
+try:
+    EMAIL_IDLE_TIMEOUT: float = float(os.getenv("EMAIL_IDLE_TIMEOUT", "300"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_IDLE_TIMEOUT = 300.0
+
+# Upper bound in seconds for the reconnect backoff
+try:
+    EMAIL_IDLE_BACKOFF_MAX: float = float(os.getenv("EMAIL_IDLE_BACKOFF_MAX", "300"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_IDLE_BACKOFF_MAX = 300.0
+
+# Outbound mail queue for staff replies (services/mail_outbox.py). When disabled, replies are
+# sent with one SMTP connection per message from a request background task.
+EMAIL_OUTBOX_ENABLED: bool = os.getenv("EMAIL_OUTBOX_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Sender threads, each keeping one authenticated SMTP connection open
+try:
+    EMAIL_OUTBOX_WORKERS: int = int(os.getenv("EMAIL_OUTBOX_WORKERS", "2"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_OUTBOX_WORKERS = 2
+
+# In-memory queue bound; emails beyond it stay in outbound_emails for the retry sweep
+try:
+    EMAIL_OUTBOX_QUEUE_SIZE: int = int(os.getenv("EMAIL_OUTBOX_QUEUE_SIZE", "1000"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_OUTBOX_QUEUE_SIZE = 1000
+
+try:
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "8"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 8
+
+# Retry delay in seconds, doubled per failed attempt up to EMAIL_OUTBOX_BACKOFF_MAX
+try:
+    EMAIL_OUTBOX_BACKOFF_INITIAL: float = float(os.getenv("EMAIL_OUTBOX_BACKOFF_INITIAL", "30"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_OUTBOX_BACKOFF_INITIAL = 30.0
+
+try:
+    EMAIL_OUTBOX_BACKOFF_MAX: float = float(os.getenv("EMAIL_OUTBOX_BACKOFF_MAX", "3600"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_OUTBOX_BACKOFF_MAX = 3600.0
+
+# Interval in minutes between sweeps queueing due retries and emails left by a restart
+try:
+    EMAIL_OUTBOX_SWEEP_INTERVAL: int = int(os.getenv("EMAIL_OUTBOX_SWEEP_INTERVAL", "1"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    EMAIL_OUTBOX_SWEEP_INTERVAL = 1
+
+# Keyset pagination for GET /api/inquiries
+try:
+    INQUIRY_PAGE_SIZE_DEFAULT: int = int(os.getenv("INQUIRY_PAGE_SIZE_DEFAULT", "50"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    INQUIRY_PAGE_SIZE_DEFAULT = 50
+
+try:
+    INQUIRY_PAGE_SIZE_MAX: int = int(os.getenv("INQUIRY_PAGE_SIZE_MAX", "200"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    INQUIRY_PAGE_SIZE_MAX = 200
+
+# Maximum inquiries accepted by one POST /api/inquiries/bulk request
+try:
+    INQUIRY_BULK_MAX_ITEMS: int = int(os.getenv("INQUIRY_BULK_MAX_ITEMS", "500"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    INQUIRY_BULK_MAX_ITEMS = 500
+
+# Leader election for cluster-wide jobs (email polling, IMAP IDLE, workload reconciliation):
+# only the process holding the scheduler lease runs them
+SCHEDULER_LEADER_ELECTION: bool = os.getenv("SCHEDULER_LEADER_ELECTION", "true").strip().lower() in ("1", "true", "yes", "on")
+
+# Seconds a leader lease stays valid without renewal (failover time after a crash)
+try:
+    SCHEDULER_LEASE_TTL: int = int(os.getenv("SCHEDULER_LEASE_TTL", "30"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    SCHEDULER_LEASE_TTL = 30
+
+# Seconds between lease renewals; must be well below SCHEDULER_LEASE_TTL
+try:
+    SCHEDULER_LEASE_RENEW_INTERVAL: int = int(os.getenv("SCHEDULER_LEASE_RENEW_INTERVAL", "10"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    SCHEDULER_LEASE_RENEW_INTERVAL = 10
+
+# Interval in minutes between staff workload counter reconciliation runs
+try:
+    WORKLOAD_RECONCILE_INTERVAL: int = int(os.getenv("WORKLOAD_RECONCILE_INTERVAL", "15"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    WORKLOAD_RECONCILE_INTERVAL = 15
+
+# In-process least-loaded staff assigner (services/staff_assigner.py)
+STAFF_ASSIGNER_ENABLED: bool = os.getenv("STAFF_ASSIGNER_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+
+try:
+    STAFF_ASSIGNER_RESYNC_INTERVAL: int = int(os.getenv("STAFF_ASSIGNER_RESYNC_INTERVAL", "5"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    STAFF_ASSIGNER_RESYNC_INTERVAL = 5
+
+# "sync" classifies inquiries before they are stored; "deferred" stores them with a pending
+# classification and fills category/urgency in a background worker
+CLASSIFICATION_MODE: str = os.getenv("CLASSIFICATION_MODE", "sync").strip().lower()
+
+try:
+    CLASSIFICATION_WORKERS: int = int(os.getenv("CLASSIFICATION_WORKERS", "2"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    CLASSIFICATION_WORKERS = 2
+
+# Interval in minutes between sweeps re-queueing inquiries still pending classification
+try:
+    CLASSIFICATION_SWEEP_INTERVAL: int = int(os.getenv("CLASSIFICATION_SWEEP_INTERVAL", "5"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    CLASSIFICATION_SWEEP_INTERVAL = 5
+
+# Classification cache keyed by a hash of the normalized title and content
+try:
+    CLASSIFICATION_CACHE_SIZE: int = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "10000"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    CLASSIFICATION_CACHE_SIZE = 10000
+
+# Seconds a cached classification stays valid; 0 disables the cache
+try:
+    CLASSIFICATION_CACHE_TTL: int = int(os.getenv("CLASSIFICATION_CACHE_TTL", "86400"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    CLASSIFICATION_CACHE_TTL = 86400
+
+# Also store classifications in the classification_cache table so they survive restarts
+CLASSIFICATION_CACHE_PERSIST: bool = os.getenv("CLASSIFICATION_CACHE_PERSIST", "false").strip().lower() in ("1", "true", "yes", "on")
+
+# Inquiries classified per LLM request during email ingestion
+try:
+    CLASSIFICATION_BATCH_SIZE: int = int(os.getenv("CLASSIFICATION_BATCH_SIZE", "10"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    CLASSIFICATION_BATCH_SIZE = 10
+
+# LLM requests (batches) in flight at once when classifying fetched emails
+try:
+    CLASSIFICATION_CONCURRENCY: int = int(os.getenv("CLASSIFICATION_CONCURRENCY", "4"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    CLASSIFICATION_CONCURRENCY = 4
+
+# Local naive Bayes classifier answering before the LLM (services/local_classifier.py)
+LOCAL_CLASSIFIER_ENABLED: bool = os.getenv("LOCAL_CLASSIFIER_ENABLED", "false").strip().lower() in ("1", "true", "yes", "on")
+LOCAL_CLASSIFIER_MODEL_PATH: str = os.getenv("LOCAL_CLASSIFIER_MODEL_PATH", "local_classifier.json")
+
+# Minimum posterior probability (for both category and urgency) to skip the LLM
+try:
+    LOCAL_CLASSIFIER_THRESHOLD: float = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.9"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    LOCAL_CLASSIFIER_THRESHOLD = 0.9
+
+# Labeled inquiries every category and urgency needs before a model is saved or used
+try:
+    LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS: int = int(os.getenv("LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS", "20"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS = 20
+
+# Held-out accuracy of the answers above the threshold required to save a trained model
+try:
+    LOCAL_CLASSIFIER_MIN_ACCURACY: float = float(os.getenv("LOCAL_CLASSIFIER_MIN_ACCURACY", "0.95"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    LOCAL_CLASSIFIER_MIN_ACCURACY = 0.95
+
+# Topics a /ws connection is subscribed to until it subscribes/unsubscribes itself
+WS_DEFAULT_TOPICS: str = os.getenv("WS_DEFAULT_TOPICS", "all")
+
+# Maximum number of topics one /ws connection may subscribe to
+try:
+    WS_MAX_SUBSCRIPTIONS: int = int(os.getenv("WS_MAX_SUBSCRIPTIONS", "100"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    WS_MAX_SUBSCRIPTIONS = 100
+
+# Messages queued per websocket connection before WS_QUEUE_POLICY applies
+try:
+    WS_SEND_QUEUE_SIZE: int = int(os.getenv("WS_SEND_QUEUE_SIZE", "100"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    WS_SEND_QUEUE_SIZE = 100
+
+# What a full websocket send queue does with a new message: drop_oldest, coalesce or disconnect
+WS_QUEUE_POLICY: str = os.getenv("WS_QUEUE_POLICY", "drop_oldest").strip().lower()
+
+# Seconds one websocket send may take before the client is evicted as too slow; 0 waits forever
+try:
+    WS_SEND_TIMEOUT: float = float(os.getenv("WS_SEND_TIMEOUT", "10"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    WS_SEND_TIMEOUT = 10.0
+
+# Relay websocket events between worker processes: "" (none), memory, unix or postgres
+WS_BACKPLANE: str = os.getenv("WS_BACKPLANE", "")
+WS_BACKPLANE_UNIX_DIR: str = os.getenv("WS_BACKPLANE_UNIX_DIR", "/tmp/inq_service_svc_ws")
+WS_BACKPLANE_CHANNEL: str = os.getenv("WS_BACKPLANE_CHANNEL", "inq_ws_events")
+# DSN of the LISTEN/NOTIFY connection; empty derives it from DATABASE_URL
+WS_BACKPLANE_DSN: str = os.getenv("WS_BACKPLANE_DSN", "")
+
+# Milliseconds a websocket event waits for others to share its frame (a JSON array); 0 sends each alone
+try:
+    WS_COALESCE_WINDOW_MS: int = int(os.getenv("WS_COALESCE_WINDOW_MS", "0"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    WS_COALESCE_WINDOW_MS = 0
+
+# Most events sent in one batched websocket frame
+try:
+    WS_BATCH_MAX_EVENTS: int = int(os.getenv("WS_BATCH_MAX_EVENTS", "50"))
+except Exception as e:
+    logging.error(e, exc_info=True)
+    WS_BATCH_MAX_EVENTS = 50
+
+# Offer permessage-deflate compression to websocket clients
+WS_PER_MESSAGE_DEFLATE: bool = os.getenv("WS_PER_MESSAGE_DEFLATE", "true").strip().lower() in ("1", "true", "yes", "on")
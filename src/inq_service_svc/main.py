@@ -1,6 +1,7 @@
 import logging
 
 import uvicorn
+from inq_service_svc import config
 from inq_service_svc.app import app
 
 
@@ -10,7 +11,7 @@ logger = logging.getLogger(__name__)
 
 
 def main():
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host="0.0.0.0", port=8000, ws_per_message_deflate=config.WS_PER_MESSAGE_DEFLATE)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,40 @@
-from .base import Base, get_db
-from .enums import UserRole, InquiryStatus, MessageSenderType
+from .base import Base, get_db, get_async_db
+from .enums import (
+    UserRole,
+    InquiryStatus,
+    MessageSenderType,
+    ClassificationStatus,
+    ClassificationSource,
+    OutboundEmailStatus,
+    SenderFilterKind,
+)
 from .user import User
 from .inquiry import Inquiry, Message
+from .workload import StaffWorkload
+from .classification_cache import ClassificationCacheEntry
+from .email_watermark import EmailWatermark
+from .outbound_email import OutboundEmail
+from .sender_filter_rule import SenderFilterRule
+from .scheduler_lease import SchedulerLease
 
 __all__ = [
     "Base",
     "get_db",
+    "get_async_db",
     "User",
     "Inquiry",
     "Message",
+    "StaffWorkload",
+    "ClassificationCacheEntry",
+    "EmailWatermark",
+    "OutboundEmail",
+    "SenderFilterRule",
+    "SchedulerLease",
     "UserRole",
     "InquiryStatus",
     "MessageSenderType",
+    "ClassificationStatus",
+    "ClassificationSource",
+    "OutboundEmailStatus",
+    "SenderFilterKind",
 ]
@@ -1,19 +1,66 @@
+from typing import Any, AsyncIterator, Dict
+
 from sqlalchemy import Column, PrimaryKeyConstraint, String
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import scoped_session, sessionmaker, Session
+from sqlalchemy.orm import sessionmaker, Session
 
-from inq_service_svc.config import DATABASE_URL
+from inq_service_svc.config import DATABASE_URL, ASYNC_DATABASE_URL
+from .pool import engine_options, instrument_engine, describe_pool
 
 Base = declarative_base()
 
-engine = create_engine(DATABASE_URL)
+# async drivers substituted for the sync ones when ASYNC_DATABASE_URL is not configured
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Return ``url`` with its driver swapped for the matching asyncio driver.
+
+    URLs that already name an async driver are returned unchanged.
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if parsed.get_driver_name() in ("aiosqlite", "asyncpg") or backend not in _ASYNC_DRIVERS:
+        return url
+    return parsed.set(drivername=_ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+# Engine and session factory are created once per process and shared by requests and jobs
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+pool_stats = instrument_engine(engine)
 SessionLocal = sessionmaker(bind=engine)
 
+# Async engine used by the API routers so requests waiting on the database do not hold
+# a threadpool slot. Background jobs keep using the sync engine above.
+_async_url = ASYNC_DATABASE_URL or to_async_url(DATABASE_URL)
+async_engine = create_async_engine(_async_url, **engine_options(_async_url, is_async=True))
+async_pool_stats = instrument_engine(async_engine.sync_engine)
+# expire_on_commit=False: attributes stay loaded after commit, avoiding implicit IO on access
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
 
 def get_db() -> Session:
-    session = scoped_session(sessionmaker(bind=engine))
+    session = SessionLocal()
     try:
         yield session
     finally:
-        session.close()
\ No newline at end of file
+        session.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Return connection pool sizing, in-use and checkout-wait figures for both engines."""
+    return {
+        "sync": describe_pool(engine, pool_stats),
+        "async": describe_pool(async_engine.sync_engine, async_pool_stats),
+    }
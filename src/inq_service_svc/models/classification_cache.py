@@ -0,0 +1,21 @@
+from sqlalchemy import Column, DateTime, String
+
+from .base import Base
+
+
+class ClassificationCacheEntry(Base):
+    """Persistent tier of the classification cache (services/classification_cache.py).
+
+    Keyed by the sha256 of the normalized inquiry title and content so a result survives
+    restarts and is shared between processes.
+    """
+
+    __tablename__ = "classification_cache"
+
+    key = Column(String(64), primary_key=True)
+    category = Column(String, nullable=False)
+    urgency = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        return f"<ClassificationCacheEntry(key='{self.key}', category='{self.category}', urgency='{self.urgency}')>"
@@ -0,0 +1,21 @@
+from sqlalchemy import BigInteger, Column, String
+
+from .base import Base
+
+
+class EmailWatermark(Base):
+    """Highest IMAP UID already ingested from a mailbox folder.
+
+    ``last_uid`` is only meaningful for the recorded ``uid_validity``; when the server
+    reports a different UIDVALIDITY the folder's UIDs were reassigned and ingestion
+    restarts from the first UID (see utils/email_client.py).
+    """
+
+    __tablename__ = "email_watermarks"
+
+    folder = Column(String, primary_key=True)
+    uid_validity = Column(BigInteger, nullable=True)
+    last_uid = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<EmailWatermark(folder='{self.folder}', uid_validity={self.uid_validity}, last_uid={self.last_uid})>"
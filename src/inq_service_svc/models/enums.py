@@ -13,6 +13,47 @@ class InquiryStatus(str, Enum):
     Completed = "Completed"
 
 
+# Statuses that count toward a staff member's active workload
+ACTIVE_INQUIRY_STATUSES = (InquiryStatus.New, InquiryStatus.On_Hold)
+
+
+class ClassificationStatus(str, Enum):
+    Pending = "Pending"
+    Classified = "Classified"
+
+
+class ClassificationSource(str, Enum):
+    # answered by the OpenAI model (directly or from the classification cache)
+    LLM = "LLM"
+    # set or corrected by a staff member
+    Staff = "Staff"
+    # answered by the local classifier
+    Local = "Local"
+    # DEFAULT_CLASSIFICATION stored because classification failed
+    Fallback = "Fallback"
+
+
+# Label sources the local classifier may learn from; its own answers and fallbacks are excluded
+TRUSTED_CLASSIFICATION_SOURCES = (ClassificationSource.LLM, ClassificationSource.Staff)
+
+
+class OutboundEmailStatus(str, Enum):
+    Pending = "Pending"
+    Sent = "Sent"
+    Failed = "Failed"
+
+
+class SenderFilterKind(str, Enum):
+    # sender domain and all of its subdomains
+    Domain = "Domain"
+    # exact sender address
+    Address = "Address"
+    # regular expression searched in the subject
+    Subject = "Subject"
+    # "<Header-Name>:<regular expression>" searched in that header's values
+    Header = "Header"
+
+
 class MessageSenderType(str, Enum):
     Customer = "Customer"
     Staff = "Staff"
@@ -1,24 +1,61 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy import Enum as SAEnum
+from sqlalchemy.dialects.sqlite import DATETIME as SQLiteDateTime
 
 from .base import Base
-from .enums import InquiryStatus, MessageSenderType
+from .enums import ClassificationSource, ClassificationStatus, InquiryStatus, MessageSenderType
+
+# SQLite's CURRENT_TIMESTAMP (used by func.now()) has second resolution. Store bound values
+# in the same format so keyset comparisons on created_at match server-generated rows.
+CreatedAt = DateTime().with_variant(
+    SQLiteDateTime(
+        storage_format="%(year)04d-%(month)02d-%(day)02d %(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
 
 
 class Inquiry(Base):
     __tablename__ = "inquiries"
+    __table_args__ = (
+        # assign_staff: active (New/On-Hold) workload grouped per assignee
+        Index("ix_inquiries_status_assigned_user_id", "status", "assigned_user_id"),
+        # list_inquiries: keyset pagination with and without the status filter
+        Index("ix_inquiries_created_at_id", "created_at", "id"),
+        Index("ix_inquiries_status_created_at_id", "status", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
-    customer_email = Column(String, nullable=False)
+    customer_email = Column(String, nullable=False, index=True)
     customer_name = Column(String, nullable=True)
-    status = Column(SAEnum(InquiryStatus, native_enum=False), nullable=False, default=InquiryStatus.New)
+    # active_history: load the previous value on change so staff workload counters can be adjusted
+    # even when the attribute was expired (e.g. after a commit)
+    status = column_property(
+        Column(SAEnum(InquiryStatus, native_enum=False), nullable=False, default=InquiryStatus.New),
+        active_history=True,
+    )
     category = Column(String, nullable=True)
     urgency = Column(String, nullable=True)
-    assigned_user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    # Pending while category/urgency are filled in by the deferred classification worker
+    classification_status = Column(
+        SAEnum(ClassificationStatus, native_enum=False),
+        nullable=False,
+        default=ClassificationStatus.Classified,
+        index=True,
+    )
+    # where category/urgency came from; None while pending and for rows classified before it was recorded
+    classification_source = Column(SAEnum(ClassificationSource, native_enum=False), nullable=True)
+    assigned_user_id = column_property(
+        Column(Integer, ForeignKey("users.id"), nullable=True, index=True),
+        active_history=True,
+    )
+    # RFC 5322 Message-ID (or a content digest) of the email the inquiry was created from;
+    # unique so an email ingested twice cannot become two inquiries
+    source_message_id = Column(String(255), nullable=True, unique=True, index=True)
+    created_at = Column(CreatedAt, default=func.now())
 
     assigned_user = relationship("User", back_populates="inquiries")
     messages = relationship("Message", back_populates="inquiry", cascade="all, delete-orphan")
@@ -31,10 +68,13 @@ class Message(Base):
     __tablename__ = "messages"
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    inquiry_id = Column(Integer, ForeignKey("inquiries.id"), nullable=False)
+    inquiry_id = Column(Integer, ForeignKey("inquiries.id"), nullable=False, index=True)
     content = Column(Text, nullable=False)
     sender_type = Column(SAEnum(MessageSenderType, native_enum=False), nullable=False)
     timestamp = Column(DateTime, default=func.now())
+    # Message-ID of the email carrying this message: the staff reply sent to the customer or
+    # an ingested customer follow-up. Replies referencing it are threaded into the inquiry.
+    email_message_id = Column(String(255), nullable=True, unique=True, index=True)
 
     inquiry = relationship("Inquiry", back_populates="messages")
 
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text, func
+from sqlalchemy import Enum as SAEnum
+
+from .base import Base
+from .enums import OutboundEmailStatus
+
+
+class OutboundEmail(Base):
+    """Durable outbound mail queue (services/mail_outbox.py).
+
+    A row is written in the same transaction as the change that triggers the email and
+    stays Pending until a sender worker delivers it. ``next_attempt_at`` schedules
+    retries and doubles as a claim lease while a worker is sending.
+    """
+
+    __tablename__ = "outbound_emails"
+    __table_args__ = (
+        # retry sweep: due Pending rows, oldest first
+        Index("ix_outbound_emails_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    # threading headers, kept so every retry sends the same Message-ID
+    message_id = Column(String(255), nullable=True)
+    in_reply_to = Column(String(255), nullable=True)
+    status = Column(
+        SAEnum(OutboundEmailStatus, native_enum=False), nullable=False, default=OutboundEmailStatus.Pending
+    )
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+    sent_at = Column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<OutboundEmail(id={self.id}, to_email='{self.to_email}', status='{self.status}')>"
@@ -0,0 +1,159 @@
+import logging
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from inq_service_svc import config
+
+_logger = logging.getLogger(__name__)
+
+
+class PoolStats:
+    """Thread-safe counters describing connection pool usage.
+
+    ``in_use`` and ``peak_in_use`` are maintained from pool checkout/checkin events.
+    Checkout wait times are recorded by the Instrumented*QueuePool classes.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.checkouts = 0
+        self.wait_count = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record_checkout(self) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+    def record_checkin(self) -> None:
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def record_wait(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.wait_count += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            avg = self.wait_seconds_total / self.wait_count if self.wait_count else 0.0
+            return {
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "checkouts": self.checkouts,
+                "wait_count": self.wait_count,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_avg": avg,
+                "wait_seconds_max": self.wait_seconds_max,
+                "timeouts": self.timeouts,
+            }
+
+
+class _CheckoutWaitTiming:
+    """Pool mixin that records how long each checkout waited for a connection.
+
+    The wait includes time spent blocked on an exhausted pool and the time to open
+    a new connection when the pool grows into its overflow.
+    """
+
+    stats: PoolStats
+
+    def __init__(self, *args: Any, stats: PoolStats | None = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = stats if stats is not None else PoolStats()
+
+    def recreate(self):
+        new_pool = super().recreate()
+        new_pool.stats = self.stats
+        return new_pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            self.stats.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return conn
+
+
+class InstrumentedQueuePool(_CheckoutWaitTiming, QueuePool):
+    """QueuePool recording checkout waits in ``stats``."""
+
+
+class InstrumentedAsyncQueuePool(_CheckoutWaitTiming, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool (used by async engines) recording checkout waits in ``stats``."""
+
+
+def engine_options(url: str, is_async: bool = False) -> Dict[str, Any]:
+    """Return create_engine keyword arguments for ``url`` based on the pool settings in config.
+
+    SQLite keeps SQLAlchemy's default pool since pool sizing does not apply to an
+    in-process database. Pass ``is_async=True`` for create_async_engine, which needs
+    an asyncio-aware pool.
+    """
+    options: Dict[str, Any] = {
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    if make_url(url).get_backend_name() == "sqlite":
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=config.DB_POOL_SIZE,
+        max_overflow=config.DB_MAX_OVERFLOW,
+        pool_timeout=config.DB_POOL_TIMEOUT,
+    )
+    return options
+
+
+def instrument_engine(engine: Engine) -> PoolStats:
+    """Attach checkout/checkin listeners to ``engine`` and return its PoolStats."""
+    pool = engine.pool
+    stats = getattr(pool, "stats", None)
+    if not isinstance(stats, PoolStats):
+        stats = PoolStats()
+
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        stats.record_checkout()
+
+    def _on_checkin(dbapi_connection, connection_record) -> None:
+        stats.record_checkin()
+
+    event.listen(engine, "checkout", _on_checkout)
+    event.listen(engine, "checkin", _on_checkin)
+    return stats
+
+
+def describe_pool(engine: Engine, stats: PoolStats) -> Dict[str, Any]:
+    """Return pool sizing and usage figures for ``engine`` as a JSON-serializable dict."""
+    pool = engine.pool
+    info: Dict[str, Any] = {"pool_class": type(pool).__name__}
+    try:
+        if isinstance(pool, QueuePool):
+            info.update(
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                checked_in=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+    except Exception as e:
+        _logger.error(e, exc_info=True)
+    info.update(stats.snapshot())
+    return info
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, String
+
+from .base import Base
+
+
+class SchedulerLease(Base):
+    """Time-limited lease naming the process that runs cluster-wide jobs (services/leader_lease.py).
+
+    The holder extends ``expires_at`` while it is alive; any process may take the lease over
+    once it has expired.
+    """
+
+    __tablename__ = "scheduler_leases"
+
+    name = Column(String(64), primary_key=True)
+    holder = Column(String(255), nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SchedulerLease(name='{self.name}', holder='{self.holder}', expires_at={self.expires_at})>"
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, Integer, String, func
+from sqlalchemy import Enum as SAEnum
+
+from .base import Base
+from .enums import SenderFilterKind
+
+
+class SenderFilterRule(Base):
+    """Rule for skipping incoming emails, managed at runtime (see services/sender_filter.py).
+
+    Rows are compiled together with EMAIL_DOMAIN_BLACKLIST and EMAIL_SENDER_FILTER_FILE and
+    picked up by the next ingestion run without a restart.
+    """
+
+    __tablename__ = "sender_filter_rules"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    kind = Column(SAEnum(SenderFilterKind, native_enum=False), nullable=False)
+    pattern = Column(String(1024), nullable=False)
+    created_at = Column(DateTime, default=func.now())
+    # part of the reload fingerprint, so edited rules are picked up too
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+    def __repr__(self) -> str:
+        return f"<SenderFilterRule(id={self.id}, kind='{self.kind}', pattern='{self.pattern}')>"
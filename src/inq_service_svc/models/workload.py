@@ -0,0 +1,189 @@
+import logging
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import Column, ForeignKey, Index, Integer, event, inspect, insert, literal, select, update
+from sqlalchemy.orm import Session
+
+from .base import Base
+from .enums import ACTIVE_INQUIRY_STATUSES, InquiryStatus, UserRole
+from .inquiry import Inquiry
+from .user import User
+
+_logger = logging.getLogger(__name__)
+
+# session.info key accumulating flushed workload deltas and staff membership changes until
+# the transaction ends, for listeners that mirror the counters outside the database.
+# "changed" collects the users whose delta changed since a reader last consumed it.
+PENDING_CHANGES_KEY = "pending_workload_changes"
+
+WorkloadCommitHook = Callable[[Dict[int, int], Dict[int, bool]], None]
+_commit_hooks: List[WorkloadCommitHook] = []
+
+
+def on_workload_commit(hook: WorkloadCommitHook) -> WorkloadCommitHook:
+    """Register ``hook(deltas, staff_changes)`` to run after each commit that changed workloads.
+
+    ``deltas`` maps user id to the change in active count and ``staff_changes`` maps user id
+    to whether the user is now Staff. Hooks must not raise or touch the session.
+    """
+    _commit_hooks.append(hook)
+    return hook
+
+
+class StaffWorkload(Base):
+    """Number of active (New/On-Hold) inquiries assigned to each user.
+
+    Maintained incrementally in the same transaction as the inquiry changes (see
+    _track_workload_changes) so assignment is an indexed min lookup instead of a
+    GROUP BY over the backlog. reconcile_staff_workloads corrects any drift.
+    """
+
+    __tablename__ = "staff_workloads"
+    __table_args__ = (Index("ix_staff_workloads_active_count_user_id", "active_count", "user_id"),)
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    active_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<StaffWorkload(user_id={self.user_id}, active_count={self.active_count})>"
+
+
+def _is_active(status: Optional[InquiryStatus]) -> bool:
+    # status is None for a pending insert relying on the column default (New)
+    return status is None or status in ACTIVE_INQUIRY_STATUSES
+
+
+def _previous(obj: object, attr: str):
+    """Return the value ``attr`` had before the current flush."""
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(obj, attr)
+
+
+def collect_workload_deltas(session: Session) -> Dict[int, int]:
+    """Compute per-user active workload changes implied by the session's pending inquiry changes."""
+    deltas: Counter = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Inquiry) and obj.assigned_user_id is not None and _is_active(obj.status):
+            deltas[obj.assigned_user_id] += 1
+
+    for obj in session.dirty:
+        if not isinstance(obj, Inquiry) or not session.is_modified(obj):
+            continue
+        old_user = _previous(obj, "assigned_user_id")
+        old_active = _is_active(_previous(obj, "status"))
+        if old_user is not None and old_active:
+            deltas[old_user] -= 1
+        if obj.assigned_user_id is not None and _is_active(obj.status):
+            deltas[obj.assigned_user_id] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Inquiry):
+            old_user = _previous(obj, "assigned_user_id")
+            if old_user is not None and _is_active(_previous(obj, "status")):
+                deltas[old_user] -= 1
+
+    return {user_id: delta for user_id, delta in deltas.items() if delta}
+
+
+def collect_staff_changes(session: Session) -> Dict[int, bool]:
+    """Return ``{user_id: is_staff}`` for users whose Staff membership changes in this flush."""
+    changes: Dict[int, bool] = {}
+    for obj in session.new:
+        if isinstance(obj, User) and obj.role == UserRole.Staff:
+            changes[obj.id] = True
+    for obj in session.dirty:
+        if isinstance(obj, User) and session.is_modified(obj):
+            was_staff = _previous(obj, "role") == UserRole.Staff
+            is_staff = obj.role == UserRole.Staff
+            if was_staff != is_staff:
+                changes[obj.id] = is_staff
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changes[obj.id] = False
+    return changes
+
+
+def apply_workload_deltas(connection, deltas: Dict[int, int], ensure_user_ids: Iterable[int] = ()) -> None:
+    """Add ``deltas`` to the stored counters, creating missing rows for the affected users.
+
+    A missing row is only created for a user that still exists; the counter of a deleted user
+    is removed with it by the foreign key cascade.
+    """
+    for user_id in set(deltas) | set(ensure_user_ids):
+        delta = deltas.get(user_id, 0)
+        result = connection.execute(
+            update(StaffWorkload)
+            .where(StaffWorkload.user_id == user_id)
+            .values(active_count=StaffWorkload.active_count + delta)
+        )
+        if result.rowcount == 0:
+            connection.execute(
+                insert(StaffWorkload).from_select(
+                    ["user_id", "active_count"],
+                    select(User.id, literal(max(delta, 0))).where(User.id == user_id),
+                )
+            )
+
+
+def _pending_changes(session: Session) -> Dict[str, Any]:
+    return session.info.setdefault(PENDING_CHANGES_KEY, {"deltas": Counter(), "staff": {}, "changed": set()})
+
+
+def record_workload_deltas(session: Session, deltas: Dict[int, int]) -> None:
+    """Apply ``deltas`` for inquiries written without the unit of work (e.g. bulk inserts).
+
+    The counters are updated in the session's transaction and the deltas are published to
+    on_workload_commit hooks when it commits, as for changes picked up by a flush.
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    pending = _pending_changes(session)
+    pending["deltas"].update(deltas)
+    pending["changed"].update(deltas)
+    apply_workload_deltas(session.connection(), deltas)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_workload_changes(session: Session, flush_context) -> None:
+    # after_flush still exposes the pre-flush new/dirty/deleted sets and attribute history,
+    # and foreign keys assigned through relationships have been synced by now
+    deltas = collect_workload_deltas(session)
+    # unassigning the inquiries of a deleted user is not a change to any remaining counter
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            deltas.pop(obj.id, None)
+    new_user_ids = [obj.id for obj in session.new if isinstance(obj, User)]
+    staff_changes = collect_staff_changes(session)
+    if staff_changes or deltas:
+        pending = _pending_changes(session)
+        pending["deltas"].update(deltas)
+        pending["changed"].update(deltas)
+        pending["staff"].update(staff_changes)
+    if not deltas and not new_user_ids:
+        return
+    apply_workload_deltas(session.connection(), deltas, new_user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_changes(session: Session) -> None:
+    pending = session.info.pop(PENDING_CHANGES_KEY, None)
+    if not pending:
+        return
+    deltas = {user_id: delta for user_id, delta in pending["deltas"].items() if delta}
+    for hook in _commit_hooks:
+        try:
+            hook(deltas, pending["staff"])
+        except Exception as e:
+            _logger.error(e, exc_info=True)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session: Session) -> None:
+    session.info.pop(PENDING_CHANGES_KEY, None)
@@ -2,10 +2,12 @@ from .auth import auth_router
 from .users import users_router
 from .inquiries import inquiries_router
 from .websocket import websocket_router
+from .metrics import metrics_router
 
 __all__ = [
     "auth_router",
     "users_router",
     "inquiries_router",
     "websocket_router",
+    "metrics_router",
 ]
@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 import inq_service_svc.utils.security as security
-from inq_service_svc.models import User, get_db
+from inq_service_svc.models import User, get_async_db
+from inq_service_svc.models.enums import UserRole
 from inq_service_svc.schemas.auth import Token, LoginRequest
 
 logger = logging.getLogger(__name__)
@@ -18,7 +20,7 @@ auth_router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_async_db)) -> User:
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -39,7 +41,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         raise credential_exception
 
     try:
-        user = db.execute(select(User).where(User.email == email)).scalar_one_or_none()
+        user = (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -50,8 +52,15 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     return user
 
 
+def get_current_admin(current_user: User = Depends(get_current_user)) -> User:
+    """Dependency that only admits authenticated Admin users (403 otherwise)."""
+    if current_user.role != UserRole.Admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+    return current_user
+
+
 @auth_router.post("/login", response_model=Token)
-async def login(request: LoginRequest, db: Session = Depends(get_db)) -> Token:
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)) -> Token:
     credential_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -59,7 +68,7 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)) -> Token:
     )
 
     try:
-        user = db.execute(select(User).where(User.email == request.email)).scalar_one_or_none()
+        user = (await db.execute(select(User).where(User.email == request.email))).scalar_one_or_none()
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -68,7 +77,8 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)) -> Token:
         raise credential_exception
 
     try:
-        verified = security.verify_password(request.password, user.hashed_password)
+        # password hashing is CPU bound; keep it off the event loop
+        verified = await asyncio.to_thread(security.verify_password, request.password, user.hashed_password)
     except Exception as e:
         logger.error(e, exc_info=True)
         # treat verification errors as credential issues
@@ -2,16 +2,21 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
-from sqlalchemy import select, update as sa_update
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from sqlalchemy.exc import IntegrityError
 
-from inq_service_svc.models import Inquiry, get_db, User, Message
-from inq_service_svc.models.enums import InquiryStatus, MessageSenderType
+from inq_service_svc import config
+from inq_service_svc.models import Inquiry, get_async_db, User, Message
+from inq_service_svc.models.enums import ClassificationSource, ClassificationStatus, InquiryStatus, MessageSenderType
+from inq_service_svc.schemas.classification import ALLOWED_CATEGORIES, ALLOWED_URGENCIES
 from inq_service_svc.schemas.inquiry import (
+    InquiryBulkCreate,
+    InquiryBulkCreateResponse,
     InquiryCreate,
     InquiryResponse,
     InquiryUpdate,
@@ -20,44 +25,64 @@ from inq_service_svc.schemas.inquiry import (
     MessageResponse,
 )
 from inq_service_svc.services import inquiry_service
-from inq_service_svc.utils.websocket_manager import manager
-from inq_service_svc.utils.email_client import send_email
+from inq_service_svc.services.mail_outbox import enqueue_email, mail_outbox
+from inq_service_svc.utils.websocket_manager import inquiry_topics, manager
+from inq_service_svc.utils.email_client import new_message_id, send_email
+from inq_service_svc.utils.pagination import encode_cursor, decode_cursor
 from inq_service_svc.routers.auth import get_current_user
 
 logger = logging.getLogger(__name__)
 
 inquiries_router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @inquiries_router.get("/", response_model=List[InquiryResponse])
-def list_inquiries(
+async def list_inquiries(
+    response: Response,
     status: Optional[InquiryStatus] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> List[Inquiry]:
-    """List inquiries. Optionally filter by status. Requires authentication."""
-    try:
-        stmt = select(Inquiry)
-        if status is not None:
-            stmt = stmt.where(Inquiry.status == status)
+    """List one page of inquiries ordered by (created_at, id). Requires authentication.
+
+    Optionally filter by status. When more rows exist, the opaque token for the next
+    page is returned in the X-Next-Cursor header; pass it back as ``cursor``.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    page_size = min(limit or config.INQUIRY_PAGE_SIZE_DEFAULT, config.INQUIRY_PAGE_SIZE_MAX)
 
-        inquiries = db.execute(stmt).scalars().all()
-        return inquiries
+    try:
+        inquiries, next_key = await db.run_sync(inquiry_service.list_inquiries_page, status, after, page_size)
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+    if next_key is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*next_key)
+
+    return inquiries
+
 
 @inquiries_router.get("/{inquiry_id}", response_model=InquiryDetailResponse)
-def get_inquiry_detail(
+async def get_inquiry_detail(
     inquiry_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> Inquiry:
     """Retrieve full inquiry detail including messages. Requires authentication."""
     try:
         stmt = select(Inquiry).where(Inquiry.id == inquiry_id).options(selectinload(Inquiry.messages))
-        inquiry = db.execute(stmt).scalar_one_or_none()
+        inquiry = (await db.execute(stmt)).scalar_one_or_none()
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -69,15 +94,15 @@ def get_inquiry_detail(
 
 
 @inquiries_router.post("/", response_model=InquiryResponse, status_code=status.HTTP_201_CREATED)
-def create_inquiry(
+async def create_inquiry(
     payload: InquiryCreate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ) -> Inquiry:
-    """Create a new inquiry, classify it, assign staff, persist, and broadcast event."""
+    """Create a new inquiry, classify it, assign staff, persist, and publish event."""
     try:
         try:
-            inquiry = inquiry_service.create_inquiry(db, payload)
+            inquiry = await inquiry_service.create_inquiry_async(db, payload)
         except HTTPException:
             # let HTTP exceptions bubble
             raise
@@ -85,11 +110,16 @@ def create_inquiry(
             logger.error(e, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
 
-        # schedule broadcast of new inquiry event
+        # schedule publishing of new inquiry event
         try:
             message = json.dumps({"event": "new_inquiry", "inquiry_id": inquiry.id})
-            # manager.broadcast is async; BackgroundTasks can accept callables including coroutines
-            background_tasks.add_task(manager.broadcast, message)
+            topics = inquiry_topics(
+                inquiry.id, [getattr(inquiry.status, "value", inquiry.status)], [inquiry.assigned_user_id]
+            )
+            # an assigned inquiry only concerns its assignee (and admins)
+            audience = [inquiry.assigned_user_id] if inquiry.assigned_user_id is not None else None
+            # manager.publish is async; BackgroundTasks can accept callables including coroutines
+            background_tasks.add_task(manager.publish, topics, message, audience=audience)
         except Exception as e:
             logger.error(e, exc_info=True)
 
@@ -101,17 +131,67 @@ def create_inquiry(
         raise HTTPException(status_code=500, detail="Internal server error")
 
 
+async def _publish_new_inquiries(rows: List[Tuple[int, Optional[str], Optional[int]]]) -> None:
+    for inquiry_id, status_value, assigned_user_id in rows:
+        await manager.publish(
+            inquiry_topics(inquiry_id, [status_value], [assigned_user_id]),
+            json.dumps({"event": "new_inquiry", "inquiry_id": inquiry_id}),
+            audience=[assigned_user_id] if assigned_user_id is not None else None,
+        )
+
+
+@inquiries_router.post("/bulk", response_model=InquiryBulkCreateResponse, status_code=status.HTTP_201_CREATED)
+async def create_inquiries_bulk(
+    payload: InquiryBulkCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user),
+) -> InquiryBulkCreateResponse:
+    """Import several inquiries in one transaction and publish one event per inquiry.
+
+    Classification and staff assignment work as for single creation. Requires authentication.
+    """
+    if not payload.inquiries:
+        raise HTTPException(status_code=400, detail="No inquiries given")
+    if len(payload.inquiries) > config.INQUIRY_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413, detail=f"At most {config.INQUIRY_BULK_MAX_ITEMS} inquiries per request"
+        )
+
+    try:
+        inquiry_ids = await inquiry_service.create_inquiries_async(db, payload.inquiries)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+    # event topics need each inquiry's assignee and status, read back in one query
+    try:
+        rows = (
+            await db.execute(
+                select(Inquiry.id, Inquiry.status, Inquiry.assigned_user_id)
+                .where(Inquiry.id.in_(inquiry_ids))
+                .order_by(Inquiry.id)
+            )
+        ).all()
+        events = [(row.id, getattr(row.status, "value", row.status), row.assigned_user_id) for row in rows]
+        background_tasks.add_task(_publish_new_inquiries, events)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+
+    return InquiryBulkCreateResponse(ids=inquiry_ids)
+
+
 @inquiries_router.patch("/{inquiry_id}", response_model=InquiryResponse)
-def update_inquiry(
+async def update_inquiry(
     inquiry_id: int,
     payload: InquiryUpdate,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> Inquiry:
-    """Partially update inquiry status and/or assignment and broadcast the change."""
+    """Partially update inquiry status, assignment and/or classification and publish the change."""
     try:
-        inquiry = db.get(Inquiry, inquiry_id)
+        inquiry = await db.get(Inquiry, inquiry_id)
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -129,7 +209,7 @@ def update_inquiry(
             assigned_val = update_data.get("assigned_user_id")
             if assigned_val is not None:
                 try:
-                    user = db.execute(select(User).where(User.id == assigned_val)).scalar_one_or_none()
+                    user = (await db.execute(select(User).where(User.id == assigned_val))).scalar_one_or_none()
                 except Exception as e:
                     logger.error(e, exc_info=True)
                     raise HTTPException(status_code=500, detail="Internal server error")
@@ -155,44 +235,64 @@ def update_inquiry(
                     raise HTTPException(status_code=400, detail="Invalid status value")
                 values["status"] = status_enum
 
+        # a staff correction of the classification; the local classifier trains on these labels
+        for field, allowed in (("category", ALLOWED_CATEGORIES), ("urgency", ALLOWED_URGENCIES)):
+            if field in update_data:
+                if update_data.get(field) not in allowed:
+                    raise HTTPException(status_code=400, detail=f"Invalid {field} value")
+                values[field] = update_data[field]
+        labels = {"category", "urgency"} & set(values)
+        if labels:
+            if inquiry.classification_status == ClassificationStatus.Pending and len(labels) < 2:
+                raise HTTPException(status_code=400, detail="Pending inquiries need both category and urgency")
+            values["classification_status"] = ClassificationStatus.Classified
+            values["classification_source"] = ClassificationSource.Staff
+
         # If there is nothing to update, return current inquiry (ensure fresh state)
         if not values:
             try:
-                db.refresh(inquiry)
+                await db.refresh(inquiry)
             except Exception as e:
                 logger.error(e, exc_info=True)
             return inquiry
 
-        # Perform an UPDATE statement to ensure persistence across sessions
+        # subscribers of the previous status/assignee learn that the inquiry left them
+        previous_status = getattr(inquiry.status, "value", inquiry.status)
+        previous_assignee = inquiry.assigned_user_id
+
+        # Apply through the ORM so staff workload counters are updated in the same transaction
         try:
-            stmt = sa_update(Inquiry).where(Inquiry.id == inquiry_id).values(**values)
-            db.execute(stmt)
-            db.commit()
+            for key, value in values.items():
+                setattr(inquiry, key, value)
+            await db.commit()
         except IntegrityError as e:
             logger.error(e, exc_info=True)
             try:
-                db.rollback()
+                await db.rollback()
             except Exception as ex:
                 logger.error(ex, exc_info=True)
             raise HTTPException(status_code=400, detail="Invalid assignment or data")
         except Exception as e:
             logger.error(e, exc_info=True)
             try:
-                db.rollback()
+                await db.rollback()
             except Exception as ex:
                 logger.error(ex, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
 
-        # refresh the in-memory inquiry instance from DB to return and broadcast
+        # refresh the in-memory inquiry instance from DB to return and publish
         try:
-            db.refresh(inquiry)
+            await db.refresh(inquiry)
         except Exception as e:
             logger.error(e, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
 
-        # schedule websocket broadcast; failures should not break the request
+        # schedule websocket publish; failures should not break the request
         try:
             status_str = getattr(inquiry.status, "value", str(inquiry.status))
+            topics = inquiry_topics(
+                inquiry.id, [previous_status, status_str], [previous_assignee, inquiry.assigned_user_id]
+            )
             message = json.dumps(
                 {
                     "event": "inquiry_updated",
@@ -201,7 +301,13 @@ def update_inquiry(
                     "assigned_user_id": inquiry.assigned_user_id,
                 }
             )
-            background_tasks.add_task(manager.broadcast, message)
+            # an assignment change only concerns the previous and new assignee (and admins)
+            audience = None
+            if "assigned_user_id" in values and previous_assignee != inquiry.assigned_user_id:
+                audience = [previous_assignee, inquiry.assigned_user_id]
+            background_tasks.add_task(
+                manager.publish, topics, message, key=f"inquiry_updated:{inquiry.id}", audience=audience
+            )
         except Exception as e:
             logger.error(e, exc_info=True)
 
@@ -214,17 +320,17 @@ def update_inquiry(
 
 
 @inquiries_router.post("/{inquiry_id}/reply", response_model=MessageResponse)
-def reply_inquiry(
+async def reply_inquiry(
     inquiry_id: int,
     payload: ReplyRequest,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> Message:
     """Create a staff Message reply for an inquiry, mark inquiry Completed, and notify via email and websocket."""
     try:
         try:
-            inquiry = db.get(Inquiry, inquiry_id)
+            inquiry = await db.get(Inquiry, inquiry_id)
         except Exception as e:
             logger.error(e, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
@@ -232,42 +338,82 @@ def reply_inquiry(
         if inquiry is None:
             raise HTTPException(status_code=404, detail="Inquiry not found")
 
+        # threading headers: the customer's reply to this email is appended to the inquiry
+        email_message_id = new_message_id()
+        source_message_id = inquiry.source_message_id
+        in_reply_to = source_message_id if source_message_id and source_message_id.startswith("<") else None
+
         message = Message(
             content=payload.content,
             inquiry_id=inquiry_id,
             sender_type=MessageSenderType.Staff,
+            email_message_id=email_message_id,
         )
 
         # Update inquiry status
+        previous_status = getattr(inquiry.status, "value", inquiry.status)
         try:
             inquiry.status = InquiryStatus.Completed
         except Exception as e:
             logger.error(e, exc_info=True)
 
+        # with the outbox the email is stored in the same transaction as the reply
+        subject = f"Re: {inquiry.title}"
+        outbound = None
+        if config.EMAIL_OUTBOX_ENABLED:
+            try:
+                outbound = enqueue_email(
+                    db, inquiry.customer_email, subject, payload.content, email_message_id, in_reply_to
+                )
+            except Exception as e:
+                logger.error(e, exc_info=True)
+
         # persist message and inquiry status
         try:
             db.add(message)
-            db.commit()
-            db.refresh(message)
+            await db.commit()
+            await db.refresh(message)
         except Exception as e:
             logger.error(e, exc_info=True)
             try:
-                db.rollback()
+                await db.rollback()
             except Exception as ex:
                 logger.error(ex, exc_info=True)
             raise HTTPException(status_code=500, detail="Internal server error")
 
-        # schedule email sending as background task
+        # hand the email to the outbox senders, or schedule sending as background task
         try:
-            subject = f"Re: {inquiry.title}"
-            background_tasks.add_task(send_email, inquiry.customer_email, subject, payload.content)
+            if config.EMAIL_OUTBOX_ENABLED:
+                # not queued when the outbox is not running; the retry sweep picks it up later
+                if outbound is not None:
+                    mail_outbox.submit(outbound.id)
+            else:
+                background_tasks.add_task(
+                    send_email,
+                    inquiry.customer_email,
+                    subject,
+                    payload.content,
+                    message_id=email_message_id,
+                    in_reply_to=in_reply_to,
+                )
         except Exception as e:
             logger.error(e, exc_info=True)
 
-        # schedule websocket broadcast about inquiry update
+        # schedule websocket publish about inquiry update
         try:
-            payload_msg = json.dumps({"event": "inquiry_updated", "inquiry_id": inquiry.id, "status": "Completed"})
-            background_tasks.add_task(manager.broadcast, payload_msg)
+            # carries the full state, like the PATCH event it may replace in a send queue
+            payload_msg = json.dumps(
+                {
+                    "event": "inquiry_updated",
+                    "inquiry_id": inquiry.id,
+                    "status": "Completed",
+                    "assigned_user_id": inquiry.assigned_user_id,
+                }
+            )
+            topics = inquiry_topics(
+                inquiry.id, [previous_status, InquiryStatus.Completed.value], [inquiry.assigned_user_id]
+            )
+            background_tasks.add_task(manager.publish, topics, payload_msg, key=f"inquiry_updated:{inquiry.id}")
         except Exception as e:
             logger.error(e, exc_info=True)
 
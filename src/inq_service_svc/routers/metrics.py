@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from inq_service_svc.models import User
+from inq_service_svc.models.base import get_pool_stats
+from inq_service_svc.routers.auth import get_current_admin
+from inq_service_svc.services.classification_cache import classification_cache
+from inq_service_svc.services.mail_outbox import mail_outbox
+from inq_service_svc.utils.websocket_manager import manager
+
+logger = logging.getLogger(__name__)
+
+metrics_router = APIRouter()
+
+
+@metrics_router.get("/db-pool")
+def db_pool_metrics(current_user: User = Depends(get_current_admin)) -> Dict[str, Any]:
+    """Return database connection pool usage (in-use counts and checkout waits). Admin only."""
+    try:
+        return get_pool_stats()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get("/classification-cache")
+def classification_cache_metrics(current_user: User = Depends(get_current_admin)) -> Dict[str, Any]:
+    """Return classification cache size and hit/miss/eviction counters. Admin only."""
+    try:
+        return classification_cache.stats()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get("/mail-outbox")
+def mail_outbox_metrics(current_user: User = Depends(get_current_admin)) -> Dict[str, Any]:
+    """Return outbound mail queue depth and sent/retried/failed counters. Admin only."""
+    try:
+        return mail_outbox.stats()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
+
+
+@metrics_router.get("/websocket")
+def websocket_metrics(current_user: User = Depends(get_current_admin)) -> Dict[str, Any]:
+    """Return websocket connections, send queue depths and dropped/coalesced/evicted counters. Admin only."""
+    try:
+        return manager.stats()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        raise HTTPException(status_code=500, detail="Internal server error")
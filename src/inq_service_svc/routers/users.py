@@ -1,13 +1,14 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from inq_service_svc.models import User, get_db
+from inq_service_svc.models import User, get_async_db
 from inq_service_svc.models.enums import UserRole
 import inq_service_svc.utils.security as security
 from inq_service_svc.schemas.user import UserCreate, UserResponse, UserUpdate
@@ -24,15 +25,15 @@ def _require_admin(current_user: User) -> None:
 
 
 @users_router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     payload: UserCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> User:
     _require_admin(current_user)
 
     try:
-        existing = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
+        existing = (await db.execute(select(User).where(User.email == payload.email))).scalar_one_or_none()
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -41,11 +42,11 @@ def create_user(
         raise HTTPException(status_code=400, detail="Email already exists")
 
     try:
-        hashed = security.get_password_hash(payload.password)
+        hashed = await asyncio.to_thread(security.get_password_hash, payload.password)
         user = User(email=payload.email, hashed_password=hashed, name=payload.name, role=payload.role)
         db.add(user)
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
     except Exception as e:
         logger.error(e, exc_info=True)
@@ -53,14 +54,14 @@ def create_user(
 
 
 @users_router.get("/", response_model=List[UserResponse])
-def list_users(
-    db: Session = Depends(get_db),
+async def list_users(
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> List[User]:
     _require_admin(current_user)
 
     try:
-        users = db.execute(select(User)).scalars().all()
+        users = (await db.execute(select(User))).scalars().all()
         return users
     except Exception as e:
         logger.error(e, exc_info=True)
@@ -68,16 +69,16 @@ def list_users(
 
 
 @users_router.patch("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     payload: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ) -> User:
     _require_admin(current_user)
 
     try:
-        user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -87,13 +88,13 @@ def update_user(
 
     try:
         if payload.email is not None and payload.email != user.email:
-            duplicate = db.execute(select(User).where(User.email == payload.email)).scalar_one_or_none()
+            duplicate = (await db.execute(select(User).where(User.email == payload.email))).scalar_one_or_none()
             if duplicate is not None and duplicate.id != user.id:
                 raise HTTPException(status_code=400, detail="Email already exists")
             user.email = payload.email
 
         if payload.password is not None:
-            user.hashed_password = security.get_password_hash(payload.password)
+            user.hashed_password = await asyncio.to_thread(security.get_password_hash, payload.password)
 
         if payload.name is not None:
             user.name = payload.name
@@ -101,8 +102,8 @@ def update_user(
         if payload.role is not None:
             user.role = payload.role
 
-        db.commit()
-        db.refresh(user)
+        await db.commit()
+        await db.refresh(user)
         return user
     except HTTPException:
         raise
@@ -112,15 +113,15 @@ def update_user(
 
 
 @users_router.delete("/{user_id}")
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user: User = Depends(get_current_user),
 ):
     _require_admin(current_user)
 
     try:
-        user = db.execute(select(User).where(User.id == user_id)).scalar_one_or_none()
+        user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     except Exception as e:
         logger.error(e, exc_info=True)
         raise HTTPException(status_code=500, detail="Internal server error")
@@ -129,8 +130,8 @@ def delete_user(
         raise HTTPException(status_code=404, detail="User not found")
 
     try:
-        db.delete(user)
-        db.commit()
+        await db.delete(user)
+        await db.commit()
         return {"detail": "User deleted"}
     except Exception as e:
         logger.error(e, exc_info=True)
@@ -1,21 +1,110 @@
 from __future__ import annotations
 
+import json
 import logging
-from fastapi import APIRouter
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, Depends, status
 from fastapi.websockets import WebSocket, WebSocketDisconnect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from inq_service_svc.models import User, get_async_db
+import inq_service_svc.utils.security as security
 from inq_service_svc.utils.websocket_manager import manager
 
 logger = logging.getLogger(__name__)
 
 websocket_router = APIRouter()
 
+_ACTIONS = ("subscribe", "unsubscribe")
+
+
+def _control_message(text: str) -> Optional[Dict[str, Any]]:
+    """Return a subscribe/unsubscribe request, or None for text that is not one."""
+    if not text.startswith("{"):
+        return None
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return None
+    if not isinstance(data, dict) or data.get("action") not in _ACTIONS:
+        return None
+    return data
+
+
+def _handle_control(websocket: WebSocket, data: Dict[str, Any]) -> str:
+    topics = data.get("topics")
+    if isinstance(topics, str):
+        topics = [topics]
+    if not isinstance(topics, list):
+        return json.dumps({"event": "error", "detail": "topics must be a list of strings"})
+    try:
+        if data["action"] == "subscribe":
+            current = manager.subscribe(websocket, topics)
+        else:
+            current = manager.unsubscribe(websocket, topics)
+    except ValueError as e:
+        return json.dumps({"event": "error", "detail": str(e)})
+    return json.dumps({"event": "subscriptions", "topics": sorted(current)})
+
+
+def _access_token(websocket: WebSocket) -> Optional[str]:
+    """Token from the ``token`` query parameter (browsers cannot set headers) or a Bearer header."""
+    token = websocket.query_params.get("token")
+    if token:
+        return token
+    scheme, _, value = websocket.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and value:
+        return value.strip()
+    return None
+
+
+async def _authenticate(websocket: WebSocket, db: AsyncSession) -> Optional[Tuple[int, str]]:
+    """Return (user id, role) of the connection's access token, or None when it is not valid."""
+    payload = security.decode_access_token(_access_token(websocket) or "")
+    email = payload.get("sub") if payload else None
+    if not email:
+        return None
+    try:
+        row = (await db.execute(select(User.id, User.role).where(User.email == email))).first()
+    finally:
+        # release the connection; the session is not used for the rest of the websocket's life
+        await db.close()
+    if row is None:
+        return None
+    return row.id, getattr(row.role, "value", row.role)
+
 
 @websocket_router.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket) -> None:
-    """Simple websocket endpoint: accepts connection, echoes messages, handles ping/pong."""
+async def websocket_endpoint(websocket: WebSocket, db: AsyncSession = Depends(get_async_db)) -> None:
+    """Websocket endpoint: topic subscriptions, ping/pong, and echo of any other message.
+
+    Requires an access token (``?token=`` or an ``Authorization: Bearer`` header); connections
+    without a valid one are rejected with close code 1008. ``?topics=inquiry:1,status:New``
+    replaces the default subscriptions at connect time; ``{"action": "subscribe"|"unsubscribe",
+    "topics": [...]}`` changes them afterwards.
+    """
     try:
-        await manager.connect(websocket)
+        try:
+            identity = await _authenticate(websocket, db)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            identity = None
+        if identity is None:
+            logger.warning("Rejecting websocket connection: missing or invalid access token")
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+        user_id, role = identity
+
+        raw_topics = websocket.query_params.get("topics")
+        topics = None if raw_topics is None else [topic for topic in raw_topics.split(",") if topic.strip()]
+        try:
+            await manager.connect(websocket, topics, user_id=user_id, role=role)
+        except ValueError as e:
+            logger.warning("Rejecting websocket connection: %s", e)
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
         while True:
             try:
                 text = await websocket.receive_text()
@@ -28,13 +117,16 @@ async def websocket_endpoint(websocket: WebSocket) -> None:
                 manager.disconnect(websocket)
                 break
 
-            # keep-alive / echo semantics
+            # subscription control, keep-alive / echo semantics; replies queue behind pending events
             try:
-                if text == "ping":
-                    await websocket.send_text("pong")
+                control = _control_message(text)
+                if control is not None:
+                    await manager.send(websocket, _handle_control(websocket, control))
+                elif text == "ping":
+                    await manager.send(websocket, "pong")
                 else:
                     # echo back the received message
-                    await websocket.send_text(text)
+                    await manager.send(websocket, text)
             except Exception as e:
                 logger.error(e, exc_info=True)
                 manager.disconnect(websocket)
@@ -1,4 +1,5 @@
 from .auth import Token, TokenData, LoginRequest
+from .classification import ClassificationResult, BatchClassificationResult
 from .inquiry import (
     InquiryCreate,
     InquiryResponse,
@@ -18,4 +19,6 @@ __all__ = [
     "MessageResponse",
     "InquiryDetailResponse",
     "ReplyRequest",
+    "ClassificationResult",
+    "BatchClassificationResult",
 ]
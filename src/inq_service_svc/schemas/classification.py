@@ -0,0 +1,41 @@
+from typing import List
+
+from pydantic import BaseModel, PrivateAttr
+
+from inq_service_svc.models.enums import ClassificationSource
+
+ALLOWED_CATEGORIES = ["Billing", "Technical", "General", "Account"]
+ALLOWED_URGENCIES = ["Low", "Medium", "High"]
+
+
+class ClassificationResult(BaseModel):
+    category: str
+    urgency: str
+    # private, so it is not part of the response schema sent to the LLM
+    _source: ClassificationSource = PrivateAttr(default=ClassificationSource.LLM)
+
+    @property
+    def source(self) -> ClassificationSource:
+        """Where the label came from; stored with the inquiry."""
+        return self._source
+
+    def from_source(self, source: ClassificationSource) -> "ClassificationResult":
+        """Return a copy of this result labelled as coming from ``source``."""
+        result = self.model_copy()
+        result._source = source
+        return result
+
+
+DEFAULT_CLASSIFICATION = ClassificationResult(category="General", urgency="Medium").from_source(
+    ClassificationSource.Fallback
+)
+
+
+class BatchClassificationItem(BaseModel):
+    index: int
+    category: str
+    urgency: str
+
+
+class BatchClassificationResult(BaseModel):
+    results: List[BatchClassificationItem]
@@ -5,7 +5,7 @@ from typing import Optional, List
 
 from pydantic import BaseModel, EmailStr, ConfigDict
 
-from inq_service_svc.models.enums import InquiryStatus, MessageSenderType
+from inq_service_svc.models.enums import ClassificationStatus, InquiryStatus, MessageSenderType
 
 
 class InquiryCreate(BaseModel):
@@ -15,6 +15,15 @@ class InquiryCreate(BaseModel):
     customer_name: Optional[str] = None
 
 
+class InquiryBulkCreate(BaseModel):
+    inquiries: List[InquiryCreate]
+
+
+class InquiryBulkCreateResponse(BaseModel):
+    # ids of the created inquiries, in request order
+    ids: List[int]
+
+
 class InquiryResponse(BaseModel):
     id: int
     title: str
@@ -24,6 +33,7 @@ class InquiryResponse(BaseModel):
     status: InquiryStatus
     category: Optional[str]
     urgency: Optional[str]
+    classification_status: ClassificationStatus = ClassificationStatus.Classified
     assigned_user_id: Optional[int]
     created_at: datetime
 
@@ -39,6 +49,9 @@ class InquiryUpdate(BaseModel):
 
     status: Optional[InquiryStatus] = None
     assigned_user_id: Optional[int] = None
+    # staff correction of the classification (one of ALLOWED_CATEGORIES / ALLOWED_URGENCIES)
+    category: Optional[str] = None
+    urgency: Optional[str] = None
 
     model_config = ConfigDict()
 
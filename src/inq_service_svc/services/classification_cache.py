@@ -0,0 +1,181 @@
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import ClassificationCacheEntry
+from inq_service_svc.models.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# (category, urgency)
+CachedClassification = Tuple[str, str]
+
+_WHITESPACE = re.compile(r"\s+")
+# numbers (ticket ids, amounts, reset codes) vary between otherwise identical notices
+_DIGITS = re.compile(r"\d+")
+
+
+def _normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    text = _DIGITS.sub("0", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def classification_cache_key(title: str, content: str) -> str:
+    """Return the sha256 hex digest of the normalized title and content.
+
+    Normalization folds case and Unicode forms, collapses whitespace and replaces digit
+    runs so auto-generated messages differing only in numbers share one entry.
+    """
+    raw = _normalize(title) + "\x1f" + _normalize(content)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class ClassificationCache:
+    """Two-tier cache of classification results.
+
+    The first tier is an in-memory LRU of at most ``max_size`` entries, each valid for
+    ``ttl`` seconds. With ``persist`` enabled, misses fall back to the
+    classification_cache table, and stored results are written to it as well. Counters
+    of hits per tier, misses, evictions and expirations are exposed by ``stats``.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        ttl: float = 86400,
+        persist: bool = False,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.persist = persist
+        self.session_factory = session_factory
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, CachedClassification]]" = OrderedDict()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0 and self.max_size > 0
+
+    def clear(self) -> None:
+        """Drop the in-memory entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._reset_counters()
+
+    def get(self, key: str) -> Optional[CachedClassification]:
+        if not self.enabled:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+        value = self._load(key) if self.persist else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.db_hits += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: CachedClassification) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, value)
+        if self.persist:
+            self._store(key, value)
+
+    def _remember(self, key: str, value: CachedClassification) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _load(self, key: str) -> Optional[CachedClassification]:
+        session = None
+        try:
+            session = self.session_factory()
+            entry = session.get(ClassificationCacheEntry, key)
+            if entry is None or entry.created_at < _utcnow() - timedelta(seconds=self.ttl):
+                return None
+            return entry.category, entry.urgency
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            return None
+        finally:
+            if session is not None:
+                session.close()
+
+    def _store(self, key: str, value: CachedClassification) -> None:
+        session = None
+        try:
+            session = self.session_factory()
+            session.merge(
+                ClassificationCacheEntry(key=key, category=value[0], urgency=value[1], created_at=_utcnow())
+            )
+            session.commit()
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.db_hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "persist": self.persist,
+                "hits": self.hits,
+                "db_hits": self.db_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_ratio": (self.hits + self.db_hits) / lookups if lookups else 0.0,
+            }
+
+
+# Module-level cache used by classify_inquiry
+classification_cache = ClassificationCache(
+    max_size=config.CLASSIFICATION_CACHE_SIZE,
+    ttl=config.CLASSIFICATION_CACHE_TTL,
+    persist=config.CLASSIFICATION_CACHE_PERSIST,
+)
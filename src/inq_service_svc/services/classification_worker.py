@@ -0,0 +1,202 @@
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import Inquiry
+from inq_service_svc.models.base import SessionLocal
+from inq_service_svc.models.enums import ClassificationStatus
+from inq_service_svc.services.classifier import classify_inquiry
+from inq_service_svc.utils.websocket_manager import inquiry_topics, manager
+
+logger = logging.getLogger(__name__)
+
+CLASSIFIED_EVENT = "inquiry_classified"
+
+
+def classification_deferred() -> bool:
+    """Return True when inquiries are stored first and classified by the background worker."""
+    return config.CLASSIFICATION_MODE == "deferred"
+
+
+def build_pending_classification_query(limit: int = 500) -> Select:
+    """Build the query selecting ids of inquiries still pending classification, oldest first."""
+    return (
+        select(Inquiry.id)
+        .where(Inquiry.classification_status == ClassificationStatus.Pending)
+        .order_by(Inquiry.id.asc())
+        .limit(limit)
+    )
+
+
+def classify_pending_inquiry(db: Session, inquiry_id: int) -> Optional[Dict[str, Any]]:
+    """Classify a pending inquiry and store the result.
+
+    The session's transaction is ended before the LLM call so no connection is held while
+    waiting on it. The update only applies while the inquiry is still pending, so an inquiry
+    picked up twice is stored once. Returns the event payload to publish, or None when
+    the inquiry does not exist or was already classified.
+    """
+    row = db.execute(
+        select(Inquiry.title, Inquiry.content).where(
+            Inquiry.id == inquiry_id,
+            Inquiry.classification_status == ClassificationStatus.Pending,
+        )
+    ).first()
+    db.rollback()
+    if row is None:
+        return None
+
+    # classify_inquiry returns the default classification on errors
+    result = classify_inquiry(row.title, row.content)
+
+    try:
+        updated = db.execute(
+            update(Inquiry)
+            .where(
+                Inquiry.id == inquiry_id,
+                Inquiry.classification_status == ClassificationStatus.Pending,
+            )
+            .values(
+                category=result.category,
+                urgency=result.urgency,
+                classification_status=ClassificationStatus.Classified,
+                classification_source=result.source,
+            )
+        )
+        db.commit()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        try:
+            db.rollback()
+        except Exception as ex:
+            logger.error(ex, exc_info=True)
+        raise
+
+    if updated.rowcount == 0:
+        return None
+    return {
+        "event": CLASSIFIED_EVENT,
+        "inquiry_id": inquiry_id,
+        "category": result.category,
+        "urgency": result.urgency,
+    }
+
+
+class ClassificationWorker:
+    """Background classification of inquiries created with a pending classification.
+
+    Runs ``concurrency`` tasks on the application's event loop. Each task takes an inquiry
+    id from the queue, classifies it in a worker thread with its own session and publishes
+    an ``inquiry_classified`` websocket event. ``submit`` may be called from any thread.
+    Ids submitted while the worker is not running are left pending for the sweep job.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal) -> None:
+        self.session_factory = session_factory
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._queued: Set[int] = set()
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    async def start(self, concurrency: int = 2) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._queued = set()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(max(concurrency, 1))]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = None
+        self._queue = None
+
+    async def join(self) -> None:
+        """Wait until every submitted inquiry has been processed."""
+        if self._queue is not None:
+            await self._queue.join()
+
+    def submit(self, inquiry_id: int) -> bool:
+        """Queue ``inquiry_id`` for classification. Returns False when the worker is not running."""
+        loop = self._loop
+        if loop is None or not self.running:
+            return False
+        try:
+            on_loop = asyncio.get_running_loop() is loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._enqueue(inquiry_id)
+        else:
+            loop.call_soon_threadsafe(self._enqueue, inquiry_id)
+        return True
+
+    def _enqueue(self, inquiry_id: int) -> None:
+        if self._queue is None or inquiry_id in self._queued:
+            return
+        self._queued.add(inquiry_id)
+        self._queue.put_nowait(inquiry_id)
+
+    def _classify(self, inquiry_id: int) -> Optional[Dict[str, Any]]:
+        session = self.session_factory()
+        try:
+            return classify_pending_inquiry(session, inquiry_id)
+        finally:
+            session.close()
+
+    async def _run(self) -> None:
+        queue = self._queue
+        while True:
+            inquiry_id = await queue.get()
+            try:
+                payload = await asyncio.to_thread(self._classify, inquiry_id)
+                if payload is not None:
+                    await manager.publish(inquiry_topics(inquiry_id), json.dumps(payload))
+            except Exception as e:
+                logger.error(e, exc_info=True)
+            finally:
+                self._queued.discard(inquiry_id)
+                queue.task_done()
+
+
+# Module-level worker started by the application lifespan in deferred mode
+classification_worker = ClassificationWorker()
+
+
+def process_pending_classifications() -> None:
+    """Scheduled job: queue inquiries left pending (e.g. submitted before a restart)."""
+    if not classification_worker.running:
+        return
+
+    session = None
+    try:
+        session = classification_worker.session_factory()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return
+
+    try:
+        inquiry_ids = session.execute(build_pending_classification_query()).scalars().all()
+        for inquiry_id in inquiry_ids:
+            classification_worker.submit(inquiry_id)
+        if inquiry_ids:
+            logger.info("Queued %s inquiries pending classification", len(inquiry_ids))
+    except Exception as e:
+        logger.error(e, exc_info=True)
+    finally:
+        try:
+            session.close()
+        except Exception as e:
+            logger.error(e, exc_info=True)
@@ -1,26 +1,25 @@
-from typing import Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
 import logging
 
-from pydantic import BaseModel
-
+from inq_service_svc import config
 from inq_service_svc.utils.openai_client import (
     get_openai_client,
     get_openai_model_name,
 )
+from inq_service_svc.schemas.classification import (
+    ALLOWED_CATEGORIES,
+    ALLOWED_URGENCIES,
+    BatchClassificationResult,
+    ClassificationResult,
+    DEFAULT_CLASSIFICATION,
+)
+from inq_service_svc.services.classification_cache import classification_cache, classification_cache_key
+from inq_service_svc.services.local_classifier import classify_locally
 
 _logger = logging.getLogger(__name__)
 
-ALLOWED_CATEGORIES = ["Billing", "Technical", "General", "Account"]
-ALLOWED_URGENCIES = ["Low", "Medium", "High"]
-
-
-class ClassificationResult(BaseModel):
-    category: str
-    urgency: str
-
-
-DEFAULT_CLASSIFICATION = ClassificationResult(category="General", urgency="Medium")
-
 
 def _build_prompt(title: str, content: str) -> str:
     # strict instructions: only choose from provided lists and return JSON with category and urgency
@@ -37,6 +36,32 @@ def _build_prompt(title: str, content: str) -> str:
     return instruction.format(title=title, content=content)
 
 
+def _build_batch_prompt(items: Sequence[Tuple[str, str]]) -> str:
+    # same rules as _build_prompt; inquiries are passed as JSON so their text cannot break the list
+    instruction = (
+        "You are an assistant that classifies customer inquiries.\n"
+        "Classify EACH inquiry in the JSON array below.\n"
+        "Respond ONLY with a JSON object with a single key results: an array containing one object per inquiry "
+        "with exactly three keys: index (the inquiry's index), category and urgency.\n"
+        "category must be one of the following: ['Billing', 'Technical', 'General', 'Account'].\n"
+        "urgency must be one of the following: ['Low', 'Medium', 'High'].\n"
+        "Do NOT include any additional text, explanation, or fields.\n"
+        "Return valid JSON only.\n\n"
+        "Inquiries: {inquiries}\n"
+    )
+    inquiries = [{"index": i, "title": title, "content": content} for i, (title, content) in enumerate(items)]
+    return instruction.format(inquiries=json.dumps(inquiries, ensure_ascii=False))
+
+
+def _is_allowed(category: Any, urgency: Any) -> bool:
+    return (
+        isinstance(category, str)
+        and isinstance(urgency, str)
+        and category in ALLOWED_CATEGORIES
+        and urgency in ALLOWED_URGENCIES
+    )
+
+
 def _extract_parsed(response: Any) -> Optional[Any]:
     # Try several common shapes returned by OpenAI parse helper
     try:
@@ -59,10 +84,10 @@ def _extract_parsed(response: Any) -> Optional[Any]:
         return None
 
 
-def classify_inquiry(title: str, content: str) -> ClassificationResult:
+def _classify_with_llm(title: str, content: str) -> Optional[ClassificationResult]:
     """Classify an inquiry using the configured OpenAI model.
 
-    Returns ClassificationResult. On any error or invalid response, returns DEFAULT_CLASSIFICATION.
+    Returns None on any error or invalid response.
     """
     prompt = _build_prompt(title, content)
     try:
@@ -77,7 +102,7 @@ def classify_inquiry(title: str, content: str) -> ClassificationResult:
 
         parsed = _extract_parsed(response)
         if parsed is None:
-            return DEFAULT_CLASSIFICATION
+            return None
 
         # parsed may be a pydantic model instance or a dict-like
         if isinstance(parsed, ClassificationResult):
@@ -88,22 +113,137 @@ def classify_inquiry(title: str, content: str) -> ClassificationResult:
                 result = ClassificationResult.model_validate(parsed)  # type: ignore[attr-defined]
             except Exception as e:
                 _logger.error(e, exc_info=True)
-                return DEFAULT_CLASSIFICATION
+                return None
 
         # Validate allowed values strictly
-        if (
-            not isinstance(result.category, str)
-            or not isinstance(result.urgency, str)
-            or result.category not in ALLOWED_CATEGORIES
-            or result.urgency not in ALLOWED_URGENCIES
-        ):
+        if not _is_allowed(result.category, result.urgency):
             _logger.warning(
                 "OpenAI returned out-of-bound classification: %s",
                 result,
             )
-            return DEFAULT_CLASSIFICATION
+            return None
 
         return result
     except Exception as e:
         logging.error(e, exc_info=True)
+        return None
+
+
+def classify_inquiry(title: str, content: str) -> ClassificationResult:
+    """Classify an inquiry, reusing the cached result for identical normalized text.
+
+    When enabled, the local classifier answers confident cases before the LLM is called.
+    Returns ClassificationResult. On any error or invalid response, returns DEFAULT_CLASSIFICATION,
+    which is not cached.
+    """
+    key = classification_cache_key(title, content)
+    cached = classification_cache.get(key)
+    if cached is not None:
+        return ClassificationResult(category=cached[0], urgency=cached[1])
+
+    local = classify_locally(title, content)
+    if local is not None:
+        return local
+
+    result = _classify_with_llm(title, content)
+    if result is None:
         return DEFAULT_CLASSIFICATION
+
+    classification_cache.put(key, (result.category, result.urgency))
+    return result
+
+
+def _classify_batch_with_llm(items: Sequence[Tuple[str, str]]) -> List[Optional[ClassificationResult]]:
+    """Classify ``items`` (title, content) in one structured-output request.
+
+    Returns one entry per item, None where the response has no valid classification for it.
+    """
+    results: List[Optional[ClassificationResult]] = [None] * len(items)
+    try:
+        client = get_openai_client()
+        model_name = get_openai_model_name()
+        response = client.with_options(max_retries=3).beta.chat.completions.parse(
+            model=model_name,
+            messages=[{"role": "user", "content": _build_batch_prompt(items)}],
+            response_format=BatchClassificationResult,
+        )
+
+        parsed = _extract_parsed(response)
+        if parsed is None:
+            return results
+        if not isinstance(parsed, BatchClassificationResult):
+            parsed = BatchClassificationResult.model_validate(parsed)
+
+        for item in parsed.results:
+            if not 0 <= item.index < len(items) or results[item.index] is not None:
+                continue
+            if not _is_allowed(item.category, item.urgency):
+                _logger.warning("OpenAI returned out-of-bound classification: %s", item)
+                continue
+            results[item.index] = ClassificationResult(category=item.category, urgency=item.urgency)
+    except Exception as e:
+        _logger.error(e, exc_info=True)
+    return results
+
+
+def _classify_chunk(items: Sequence[Tuple[str, str]]) -> List[Optional[ClassificationResult]]:
+    try:
+        return _classify_batch_with_llm(items) if len(items) > 1 else [_classify_with_llm(*items[0])]
+    except Exception as e:
+        # a failed request only affects its own chunk
+        _logger.error(e, exc_info=True)
+        return [None] * len(items)
+
+
+def classify_inquiries(
+    batch: Sequence[Tuple[str, str]],
+    batch_size: Optional[int] = None,
+    concurrency: Optional[int] = None,
+) -> List[ClassificationResult]:
+    """Classify several (title, content) inquiries with one LLM request per ``batch_size`` items.
+
+    Cached results and confident local classifier answers are reused and identical
+    inquiries are sent once. Up to ``concurrency`` requests run at the same time, so the
+    wall time is roughly that of the slowest request rather than the sum. Returns results
+    in input order; items missing or invalid in the response get DEFAULT_CLASSIFICATION.
+    ``batch_size`` defaults to CLASSIFICATION_BATCH_SIZE and ``concurrency`` to
+    CLASSIFICATION_CONCURRENCY.
+    """
+    size = max(batch_size or config.CLASSIFICATION_BATCH_SIZE, 1)
+    workers = max(concurrency or config.CLASSIFICATION_CONCURRENCY, 1)
+    results: List[ClassificationResult] = [DEFAULT_CLASSIFICATION] * len(batch)
+
+    # cache key -> positions in batch still needing the LLM
+    pending: Dict[str, List[int]] = {}
+    for position, (title, content) in enumerate(batch):
+        key = classification_cache_key(title, content)
+        if key in pending:
+            pending[key].append(position)
+            continue
+        cached = classification_cache.get(key)
+        if cached is not None:
+            results[position] = ClassificationResult(category=cached[0], urgency=cached[1])
+            continue
+        local = classify_locally(title, content)
+        if local is not None:
+            results[position] = local
+        else:
+            pending[key] = [position]
+
+    keys = list(pending)
+    chunks = [keys[start:start + size] for start in range(0, len(keys), size)]
+    chunk_items = [[batch[pending[key][0]] for key in chunk] for chunk in chunks]
+    if len(chunks) > 1 and workers > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            chunk_results = list(pool.map(_classify_chunk, chunk_items))
+    else:
+        chunk_results = [_classify_chunk(items) for items in chunk_items]
+
+    for chunk, classified in zip(chunks, chunk_results):
+        for key, result in zip(chunk, classified):
+            if result is None:
+                continue
+            classification_cache.put(key, (result.category, result.urgency))
+            for position in pending[key]:
+                results[position] = result
+    return results
@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import math
+import threading
+from typing import Any, Dict, Iterable, Optional, Sequence, Set
+
+from sqlalchemy import select, union
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import Inquiry, Message
+
+logger = logging.getLogger(__name__)
+
+# longest Message-ID stored verbatim (inquiries.source_message_id is String(255))
+MAX_MESSAGE_ID_LENGTH = 255
+
+
+def _header(msg: Any, name: str) -> str:
+    headers = getattr(msg, "headers", None) or {}
+    values = headers.get(name) or ()
+    if isinstance(values, str):
+        values = (values,)
+    return str(values[0]).strip() if values else ""
+
+
+def message_key(msg: Any) -> str:
+    """Return the key identifying a fetched email across runs and replicas.
+
+    The RFC 5322 Message-ID when the message has one (hashed when it does not fit the
+    column), else a sha256 digest of sender, date, subject and body.
+    """
+    message_id = _header(msg, "message-id")
+    if message_id:
+        if len(message_id) <= MAX_MESSAGE_ID_LENGTH:
+            return message_id
+        return "sha256:" + hashlib.sha256(message_id.encode("utf-8")).hexdigest()
+
+    parts = [
+        getattr(msg, "from_", "") or "",
+        getattr(msg, "date_str", "") or "",
+        getattr(msg, "subject", "") or "",
+        getattr(msg, "text", "") or getattr(msg, "html", "") or "",
+    ]
+    return "sha256:" + hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (no false negatives, tunable false positives)."""
+
+    def __init__(self, capacity: int, error_rate: float) -> None:
+        capacity = max(capacity, 1)
+        error_rate = min(max(error_rate, 1e-9), 0.5)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str) -> Iterable[int]:
+        # double hashing: position_i = h1 + i * h2
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class IngestedMessageFilter:
+    """Find which fetched emails were already stored as an inquiry or a follow-up message.
+
+    A Bloom filter seeded from inquiries.source_message_id and messages.email_message_id
+    answers "definitely new" for most keys without a query; the remaining candidates are
+    checked with one ``IN`` lookup per batch. The filter is filled lazily on first use and only grows, so keys
+    inserted by other replicas can be missed here; the unique indexes on both columns
+    still reject those inserts.
+    """
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.01) -> None:
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._bloom: Optional[BloomFilter] = None
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.skipped_lookups = 0
+        self.db_lookups = 0
+        self.false_positives = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._bloom = None
+            self._reset_counters()
+
+    def _ensure_loaded(self, db: Session) -> BloomFilter:
+        with self._lock:
+            if self._bloom is not None:
+                return self._bloom
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        stmt = union(
+            select(Inquiry.source_message_id).where(Inquiry.source_message_id.is_not(None)),
+            select(Message.email_message_id).where(Message.email_message_id.is_not(None)),
+        )
+        for key in db.execute(stmt).scalars():
+            bloom.add(key)
+        with self._lock:
+            if self._bloom is None:
+                self._bloom = bloom
+                logger.info("Loaded %s ingested message ids into the dedup filter", bloom.count)
+            return self._bloom
+
+    def find_ingested(self, db: Session, keys: Sequence[str]) -> Set[str]:
+        """Return the subset of ``keys`` already stored as a source or message email id."""
+        if not keys:
+            return set()
+        bloom = self._ensure_loaded(db)
+        with self._lock:
+            candidates = [key for key in set(keys) if key in bloom]
+            self.skipped_lookups += len(set(keys)) - len(candidates)
+        if not candidates:
+            return set()
+
+        stmt = union(
+            select(Inquiry.source_message_id).where(Inquiry.source_message_id.in_(candidates)),
+            select(Message.email_message_id).where(Message.email_message_id.in_(candidates)),
+        )
+        found = set(db.execute(stmt).scalars())
+        with self._lock:
+            self.db_lookups += len(candidates)
+            self.false_positives += len(candidates) - len(found)
+        return found
+
+    def add(self, key: str) -> None:
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(key)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "loaded": self._bloom is not None,
+                "entries": self._bloom.count if self._bloom is not None else 0,
+                "skipped_lookups": self.skipped_lookups,
+                "db_lookups": self.db_lookups,
+                "false_positives": self.false_positives,
+            }
+
+
+# Module-level filter used by email ingestion
+ingested_message_filter = IngestedMessageFilter(
+    capacity=config.EMAIL_DEDUP_BLOOM_CAPACITY,
+    error_rate=config.EMAIL_DEDUP_BLOOM_ERROR_RATE,
+)
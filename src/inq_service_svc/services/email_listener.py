@@ -0,0 +1,147 @@
+import logging
+import random
+import threading
+from typing import Any, Callable, Optional
+
+from inq_service_svc import config
+from inq_service_svc.services.email_processor import process_incoming_emails
+from inq_service_svc.utils.email_client import open_mailbox
+
+logger = logging.getLogger(__name__)
+
+# RFC 2177: re-issue IDLE before the server's 30 minute inactivity timeout
+MAX_IDLE_TIMEOUT = 29 * 60
+
+
+def _has_new_mail(responses) -> bool:
+    # untagged "* <n> EXISTS" (new message) or "* <n> RECENT"
+    return any(b"EXISTS" in line or b"RECENT" in line for line in responses or ())
+
+
+def _supports_idle(mailbox: Any) -> bool:
+    capabilities = getattr(getattr(mailbox, "client", None), "capabilities", ()) or ()
+    return "IDLE" in {str(capability).upper() for capability in capabilities}
+
+
+class EmailIdleListener:
+    """Keep one IMAP connection open in IDLE and process new mail as soon as it arrives.
+
+    Runs in a daemon thread. After connecting it processes anything already unread, then
+    waits in IDLE for up to ``idle_timeout`` seconds at a time, re-issuing IDLE as a keep-alive.
+    New mail is fetched on the same connection by ``on_new_mail(mailbox)``. Connection errors
+    reconnect after an exponential backoff with jitter capped at ``backoff_max``. If the
+    server does not advertise IDLE the listener exits and the polling job remains the only
+    ingestion path.
+
+    ``mailbox_factory`` returns a logged-in imap-tools MailBox; tests inject a stand-in.
+    """
+
+    def __init__(
+        self,
+        mailbox_factory: Callable[[], Any] = open_mailbox,
+        on_new_mail: Callable[[Any], None] = process_incoming_emails,
+        idle_timeout: float = 300.0,
+        backoff_initial: float = 1.0,
+        backoff_max: float = 300.0,
+    ) -> None:
+        self.mailbox_factory = mailbox_factory
+        self.on_new_mail = on_new_mail
+        self.idle_timeout = min(max(idle_timeout, 1.0), MAX_IDLE_TIMEOUT)
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.idle_supported: Optional[bool] = None
+        self.reconnects = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mailbox: Any = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        if self.running and not self._stop.is_set():
+            return
+        if self.running:
+            logger.warning("Previous IMAP IDLE loop is still stopping; starting a new one")
+        # each run gets its own event: clearing a shared one would revive a run that did not stop yet
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, args=(self._stop,), name="email-idle-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        mailbox = self._mailbox
+        if mailbox is not None:
+            # closing the socket wakes a thread blocked in IDLE
+            try:
+                mailbox.client.shutdown()
+            except Exception as e:
+                logger.debug("Closing IDLE connection failed: %s", e)
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                logger.warning("IMAP IDLE loop did not stop within %ss; it exits after the current run", timeout)
+            else:
+                self._thread = None
+
+    def run(self, stop: Optional[threading.Event] = None) -> None:
+        """Connect/IDLE/reconnect loop; returns when ``stop`` is set or when IDLE is unsupported."""
+        stop = stop if stop is not None else self._stop
+        delay = self.backoff_initial
+        while not stop.is_set():
+            mailbox = None
+            try:
+                mailbox = self.mailbox_factory()
+                if stop.is_set():
+                    break
+                self._mailbox = mailbox
+                if not _supports_idle(mailbox):
+                    self.idle_supported = False
+                    logger.warning("IMAP server does not support IDLE; relying on polling")
+                    return
+                self.idle_supported = True
+                delay = self.backoff_initial
+                self._listen(mailbox, stop)
+            except Exception as e:
+                if stop.is_set():
+                    break
+                self.reconnects += 1
+                logger.error(e, exc_info=True)
+                # full jitter so replicas do not reconnect in lockstep
+                wait = random.uniform(0, delay)
+                logger.warning("IMAP IDLE connection lost; reconnecting in %.1fs", wait)
+                stop.wait(wait)
+                delay = min(delay * 2, self.backoff_max)
+            finally:
+                self._close(mailbox)
+
+    def _listen(self, mailbox: Any, stop: threading.Event) -> None:
+        # catch up on anything that arrived while disconnected
+        self.on_new_mail(mailbox)
+        while not stop.is_set():
+            responses = mailbox.idle.wait(timeout=self.idle_timeout)
+            if stop.is_set():
+                return
+            if _has_new_mail(responses):
+                self.on_new_mail(mailbox)
+
+    def _close(self, mailbox: Any) -> None:
+        if mailbox is None:
+            return
+        # a run that outlived stop() must not drop the connection of the run started after it
+        if self._mailbox is mailbox:
+            self._mailbox = None
+        try:
+            mailbox.logout()
+        except Exception as e:
+            logger.debug("IMAP logout failed: %s", e)
+
+
+def build_email_listener() -> EmailIdleListener:
+    """Create the listener configured from EMAIL_IDLE_* settings."""
+    return EmailIdleListener(
+        idle_timeout=config.EMAIL_IDLE_TIMEOUT,
+        backoff_max=config.EMAIL_IDLE_BACKOFF_MAX,
+    )
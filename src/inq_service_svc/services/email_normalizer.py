@@ -0,0 +1,185 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from html import unescape
+from html.parser import HTMLParser
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+from inq_service_svc import config
+
+logger = logging.getLogger(__name__)
+
+# elements whose text is never shown to a reader
+_SKIPPED_TAGS = {"script", "style", "head", "title", "noscript", "template", "svg"}
+# elements that start a new line of text
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+    "section", "table", "tr", "ul",
+}
+_INLINE_SPACE = re.compile(r"[ \t\r\f\v\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+TRUNCATION_MARKER = "\n[message truncated]"
+
+
+class NormalizedBody(NamedTuple):
+    content: str
+    truncated: bool
+    # full original body written to EMAIL_SPOOL_DIR when truncated, else None
+    spool_path: Optional[str]
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag, attrs) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_startendtag(self, tag, attrs) -> None:
+        if tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag) -> None:
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in _BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data) -> None:
+        if not self._skip_depth:
+            self.parts.append(data)
+
+
+def _tidy(text: str) -> str:
+    lines = (_INLINE_SPACE.sub(" ", line).strip() for line in text.replace("\r\n", "\n").split("\n"))
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def html_to_text(html: str) -> str:
+    """Return the readable text of an HTML body: no markup, scripts or styles, one line per block."""
+    extractor = _TextExtractor()
+    try:
+        extractor.feed(html)
+        extractor.close()
+    except Exception as e:
+        # HTMLParser is lenient; fall back to dropping anything tag-like
+        logger.debug("HTML parsing failed: %s", e)
+        return _tidy(unescape(re.sub(r"<[^>]*>", " ", html)))
+    return _tidy("".join(extractor.parts))
+
+
+def normalize_body(
+    text: Optional[str],
+    html: Optional[str],
+    max_chars: int,
+    spool_dir: Optional[str] = None,
+    spool_name: Optional[str] = None,
+) -> NormalizedBody:
+    """Return the plain text content to store for an email body.
+
+    Prefers the text/plain part (kept as is) and converts the HTML part otherwise. Content longer than
+    ``max_chars`` is cut and marked; with ``spool_dir`` the full original part is first
+    written to ``<spool_dir>/<spool_name>.txt`` (or ``.html``).
+    """
+    if text and text.strip():
+        original, suffix, content = text, ".txt", text.strip()
+    elif html:
+        original, suffix, content = html, ".html", html_to_text(html)
+    else:
+        return NormalizedBody("", False, None)
+
+    if max_chars <= 0 or len(content) <= max_chars:
+        return NormalizedBody(content, False, None)
+
+    spool_path = None
+    if spool_dir and spool_name:
+        try:
+            os.makedirs(spool_dir, exist_ok=True)
+            spool_path = os.path.join(spool_dir, spool_name + suffix)
+            with open(spool_path, "w", encoding="utf-8") as f:
+                f.write(original)
+        except OSError as e:
+            logger.error(e, exc_info=True)
+            spool_path = None
+    return NormalizedBody(content[:max_chars].rstrip() + TRUNCATION_MARKER, True, spool_path)
+
+
+def spool_name(key: str) -> str:
+    """File name (without suffix) of the spooled body of the email with dedup ``key``."""
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _normalize_job(job: Tuple[Optional[str], Optional[str], int, Optional[str], Optional[str]]) -> NormalizedBody:
+    return normalize_body(*job)
+
+
+class EmailNormalizer:
+    """Run normalize_body for fetched emails, in a process pool when the batch is large.
+
+    HTML parsing is CPU bound and holds the GIL, so batches of at least ``offload_min_bytes``
+    characters are spread over ``workers`` processes and the API's event loop keeps running.
+    Smaller batches are normalized inline, where sending them to another process would cost
+    more than it saves. ``workers=0`` always normalizes inline. The pool is created on first
+    use with the "spawn" start method (forking a threaded server is unsafe) and recreated
+    after a worker crash; a failed batch falls back to inline normalization.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        offload_min_bytes: int = 262144,
+        max_chars: int = 20000,
+        spool_dir: Optional[str] = None,
+    ) -> None:
+        self.workers = workers
+        self.offload_min_bytes = offload_min_bytes
+        self.max_chars = max_chars
+        self.spool_dir = spool_dir
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def normalize(self, bodies: Sequence[Tuple[Optional[str], Optional[str], Optional[str]]]) -> List[NormalizedBody]:
+        """Normalize ``(text, html, spool_name)`` bodies; results are in input order."""
+        jobs = [(text, html, self.max_chars, self.spool_dir, name) for text, html, name in bodies]
+        size = sum(len(text or "") + len(html or "") for text, html, _ in bodies)
+        if self.workers > 0 and len(jobs) > 0 and size >= self.offload_min_bytes:
+            try:
+                return list(self._get_pool().map(_normalize_job, jobs))
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                self.shutdown(wait=False)
+        return [_normalize_job(job) for job in jobs]
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+# Module-level normalizer used by email ingestion
+email_normalizer = EmailNormalizer(
+    workers=config.EMAIL_PARSE_WORKERS,
+    offload_min_bytes=config.EMAIL_PARSE_OFFLOAD_MIN_BYTES,
+    max_chars=config.EMAIL_BODY_MAX_CHARS,
+    spool_dir=config.EMAIL_SPOOL_DIR or None,
+)
@@ -1,29 +1,100 @@
 import logging
+import threading
 from email.utils import parseaddr
-from typing import List
+from typing import List, NamedTuple, Optional, Set, Tuple
+
+from imap_tools import MailBox
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 
 from inq_service_svc import config
+from inq_service_svc.models import EmailWatermark
+from inq_service_svc.models.enums import ClassificationStatus
 from inq_service_svc.models.base import SessionLocal
 from inq_service_svc.schemas.inquiry import InquiryCreate
-from inq_service_svc.utils.email_client import fetch_emails
+from inq_service_svc.utils.email_client import UidWatermark, fetch_emails, mark_emails_seen
 from inq_service_svc.services import inquiry_service
+from inq_service_svc.services.classifier import ClassificationResult, classify_inquiries
+from inq_service_svc.services.classification_worker import classification_deferred, classification_worker
+from inq_service_svc.services.email_dedup import ingested_message_filter, message_key
+from inq_service_svc.services.email_normalizer import NormalizedBody, email_normalizer, spool_name
+from inq_service_svc.services.sender_filter import SenderFilter, sender_filters
+from inq_service_svc.services.email_threading import (
+    append_customer_message,
+    find_thread_inquiry,
+    reference_ids,
+    reply_subject,
+)
 
 logger = logging.getLogger(__name__)
 
+_run_lock = threading.Lock()
+
+FOLDER = "INBOX"
+
+
+def _classify_batch(inquiries: List[InquiryCreate]) -> List[Optional[ClassificationResult]]:
+    """Classify fetched inquiries with batched LLM requests.
+
+    Returns None entries (classify later) in deferred classification mode or on failure;
+    create_inquiry then defers or classifies the inquiry itself.
+    """
+    if not inquiries or classification_deferred():
+        return [None] * len(inquiries)
+    try:
+        return list(classify_inquiries([(i.title, i.content) for i in inquiries]))
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return [None] * len(inquiries)
+
+
+def _load_watermark(session: Session, folder: str) -> UidWatermark:
+    try:
+        row = session.get(EmailWatermark, folder)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        session.rollback()
+        return UidWatermark()
+    if row is None:
+        return UidWatermark()
+    return UidWatermark(uid_validity=row.uid_validity, last_uid=row.last_uid or 0)
+
 
-def _parse_blacklist() -> List[str]:
-    raw = getattr(config, "EMAIL_DOMAIN_BLACKLIST", "") or ""
-    parts = [p.strip().lower() for p in raw.split(",") if p.strip()]
-    return parts
+def _save_watermark(session: Session, folder: str, watermark: UidWatermark) -> None:
+    try:
+        session.merge(
+            EmailWatermark(folder=folder, uid_validity=watermark.uid_validity, last_uid=watermark.last_uid)
+        )
+        session.commit()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        session.rollback()
 
 
-def process_incoming_emails() -> None:
-    """Fetch unread emails and create inquiries for non-blacklisted senders.
+def process_incoming_emails(mailbox: Optional[MailBox] = None) -> None:
+    """Fetch unread emails and create inquiries for senders not matched by the sender filter.
 
+    Only messages above the folder's persisted UID watermark are fetched, in chunks of
+    EMAIL_FETCH_BATCH_SIZE, until the backlog is drained or EMAIL_FETCH_MAX_BATCHES chunks
+    were processed. The watermark is stored after each chunk. The inquiries of a chunk are
+    classified together (CLASSIFICATION_BATCH_SIZE per LLM request) before being created.
     Each message is handled independently; failures for one message do not stop processing.
+    Fetching leaves messages unread; a chunk is flagged as seen only after its transaction
+    committed. When a chunk cannot be written, the run stops without flagging it or storing
+    the watermark past it, so the next run fetches the same messages again.
+    ``mailbox`` is an open IMAP connection to fetch with instead of logging in for each chunk.
     Ensures DB session is closed after processing.
+
+    Runs are serialized so the polling job and the IDLE listener never fetch the same
+    unread messages concurrently.
     """
-    blacklist = _parse_blacklist()
+    with _run_lock:
+        _process_incoming_emails(mailbox)
+
+
+def _process_incoming_emails(mailbox: Optional[MailBox]) -> None:
+    batch_size = max(config.EMAIL_FETCH_BATCH_SIZE, 1)
 
     session = None
     try:
@@ -33,49 +104,292 @@ def process_incoming_emails() -> None:
         return
 
     try:
+        # recompiled only when EMAIL_DOMAIN_BLACKLIST, the rule file or the rule table changed
+        sender_filter = sender_filters.get(session)
+        watermark = _load_watermark(session, FOLDER)
+        for _ in range(max(config.EMAIL_FETCH_MAX_BATCHES, 1)):
+            try:
+                messages = fetch_emails(
+                    limit=batch_size, folder=FOLDER, only_unread=True, mailbox=mailbox, watermark=watermark
+                )
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return
+
+            if not _process_messages(session, messages, sender_filter):
+                logger.warning("Emails of the last batch were not stored; keeping the previous watermark")
+                return
+            _mark_seen(messages, mailbox)
+            _save_watermark(session, FOLDER, watermark)
+
+            if len(messages) < batch_size:
+                break
+        else:
+            logger.warning(
+                "Stopped after %s email batches; the rest is fetched next run", config.EMAIL_FETCH_MAX_BATCHES
+            )
+    finally:
         try:
-            messages = fetch_emails(limit=10, only_unread=True)
+            if session is not None:
+                session.close()
         except Exception as e:
             logger.error(e, exc_info=True)
-            return
 
-        for msg in messages:
-            try:
-                # Extract name and email robustly
-                raw_from = getattr(msg, "from_", "") or getattr(msg, "from", "")
-                name, email_addr = parseaddr(raw_from)
-                email_addr = (email_addr or "").strip()
-                domain = email_addr.split("@")[-1].lower() if "@" in email_addr else ""
-
-                if domain and domain in blacklist:
-                    logger.warning("Skipping blacklisted sender domain %s for %s", domain, email_addr)
-                    continue
-
-                title = getattr(msg, "subject", None) or "(no subject)"
-                # prefer plain text, fall back to html
-                content = getattr(msg, "text", None) or getattr(msg, "html", None) or ""
-                customer_name = name or None
-
-                inquiry_create = InquiryCreate(
-                    title=title,
-                    content=content,
+
+def _mark_seen(messages: List[object], mailbox: Optional[MailBox]) -> None:
+    """Flag a stored chunk as seen. A failure is only logged: the watermark still moves past it."""
+    uids = [msg.uid for msg in messages if getattr(msg, "uid", None)]
+    try:
+        mark_emails_seen(uids, folder=FOLDER, mailbox=mailbox)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+
+
+class _ParsedEmail(NamedTuple):
+    key: str
+    title: str
+    customer_email: str
+    customer_name: Optional[str]
+    text: Optional[str]
+    html: Optional[str]
+    references: List[str]
+
+
+class _IncomingEmail(NamedTuple):
+    key: str
+    inquiry: InquiryCreate
+    references: List[str]
+
+
+def _process_messages(session: Session, messages: List[object], sender_filter: SenderFilter) -> bool:
+    """Store the inquiries and follow-ups of one fetched chunk.
+
+    Returns False when emails of the chunk could not be written to the database (the
+    watermark must not move past them); a single malformed email does not count.
+    """
+    parsed: List[_ParsedEmail] = []
+    keys_in_batch: Set[str] = set()
+    for msg in messages:
+        try:
+            # Extract name and email robustly
+            raw_from = getattr(msg, "from_", "") or getattr(msg, "from", "")
+            name, email_addr = parseaddr(raw_from)
+            email_addr = (email_addr or "").strip()
+
+            rule = sender_filter.match(email_addr, getattr(msg, "subject", None), getattr(msg, "headers", None))
+            if rule is not None:
+                logger.warning("Skipping email from %s matching sender filter %s", email_addr, rule)
+                continue
+
+            key = message_key(msg)
+            if key in keys_in_batch:
+                continue
+            keys_in_batch.add(key)
+
+            parsed.append(
+                _ParsedEmail(
+                    key=key,
+                    title=getattr(msg, "subject", None) or "(no subject)",
                     customer_email=email_addr,
-                    customer_name=customer_name,
+                    customer_name=name or None,
+                    text=getattr(msg, "text", None),
+                    html=getattr(msg, "html", None),
+                    references=reference_ids(msg),
                 )
+            )
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            continue
 
-                try:
-                    inquiry_service.create_inquiry(session, inquiry_create)
-                except Exception as e:
-                    logger.error(e, exc_info=True)
-                    # continue to next message
-                    continue
+    # skip emails that were already stored: a chunk is fetched again when part of it could not be
+    # stored or the run stopped between its commit and the seen flag; other replicas
+    try:
+        ingested = ingested_message_filter.find_ingested(session, [email.key for email in parsed])
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        session.rollback()
+        ingested = set()
+    if ingested:
+        logger.info("Skipping %s already ingested emails", len(ingested))
+        parsed = [email for email in parsed if email.key not in ingested]
 
-            except Exception as e:
+    incoming: List[_IncomingEmail] = []
+    for email, body in zip(parsed, _normalize_bodies(parsed)):
+        if body is None:
+            continue
+        try:
+            if body.truncated:
+                logger.info("Truncated body of email %s (full body: %s)", email.key, body.spool_path)
+            inquiry = InquiryCreate(
+                title=email.title,
+                content=body.content,
+                customer_email=email.customer_email,
+                customer_name=email.customer_name,
+            )
+            incoming.append(_IncomingEmail(email.key, inquiry, email.references))
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            continue
+
+    # follow-ups to an existing inquiry are appended to it instead of becoming a new one
+    threads = [_find_thread(session, email) for email in incoming]
+    follow_ups = [(email, inquiry_id) for email, inquiry_id in zip(incoming, threads) if inquiry_id is not None]
+    new_emails = [email for email, inquiry_id in zip(incoming, threads) if inquiry_id is None]
+    # no transaction stays open while the LLM requests run
+    session.rollback()
+
+    deferred = classification_deferred()
+    classifications = _classify_batch([email.inquiry for email in new_emails])
+
+    # one transaction for the batch; each follow-up is written in its own savepoint so a failing
+    # email only undoes itself
+    stored: List[str] = []
+    pending_ids: List[int] = []
+    for email, inquiry_id in follow_ups:
+        try:
+            append_customer_message(session, inquiry_id, email.inquiry.content, email.key, commit=False)
+            stored.append(email.key)
+            logger.info("Appended email %s to inquiry %s", email.key, inquiry_id)
+        except IntegrityError:
+            logger.info("Email %s was already ingested", email.key)
+            stored.append(email.key)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+
+    if new_emails:
+        try:
+            # new inquiries are inserted together; if the insert fails (e.g. a duplicate stored
+            # by another replica) the emails are written one savepoint at a time instead
+            ids = inquiry_service.create_inquiries(
+                session,
+                [email.inquiry for email in new_emails],
+                classifications,
+                deferred=deferred,
+                source_message_ids=[email.key for email in new_emails],
+                commit=False,
+            )
+            stored.extend(email.key for email in new_emails)
+            pending_ids.extend(
+                inquiry_id for inquiry_id, result in zip(ids, classifications) if result is None and deferred
+            )
+        except Exception as e:
+            if isinstance(e, IntegrityError):
+                logger.info("Batch contains already ingested emails; storing them one by one")
+            else:
                 logger.error(e, exc_info=True)
-                continue
-    finally:
+            stored_one_by_one, pending_one_by_one = _create_one_by_one(session, new_emails, classifications)
+            stored.extend(stored_one_by_one)
+            pending_ids.extend(pending_one_by_one)
+
+    complete = True
+    try:
+        session.commit()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        session.rollback()
+        # the batch transaction is lost as a whole; write each email in its own instead
+        stored, complete = _store_each(session, follow_ups, new_emails, classifications)
+        pending_ids = []
+
+    for key in stored:
+        ingested_message_filter.add(key)
+    for inquiry_id in pending_ids:
+        # not queued when the worker is not running; the sweep job picks it up later
+        classification_worker.submit(inquiry_id)
+    return complete
+
+
+def _create_one_by_one(
+    session: Session,
+    new_emails: List[_IncomingEmail],
+    classifications: List[Optional[ClassificationResult]],
+) -> Tuple[List[str], List[int]]:
+    """Create each inquiry in its own savepoint. Returns the stored keys and pending inquiry ids."""
+    stored: List[str] = []
+    pending_ids: List[int] = []
+    for email, classification in zip(new_emails, classifications):
         try:
-            if session is not None:
-                session.close()
+            inquiry = inquiry_service.create_inquiry(
+                session, email.inquiry, classification, source_message_id=email.key, commit=False
+            )
+            stored.append(email.key)
+            if inquiry is not None and inquiry.classification_status == ClassificationStatus.Pending:
+                pending_ids.append(inquiry.id)
+        except IntegrityError:
+            # stored concurrently by another run; the unique index rejected the duplicate
+            logger.info("Email %s was already ingested", email.key)
+            stored.append(email.key)
         except Exception as e:
             logger.error(e, exc_info=True)
+            # continue to next message
+            continue
+    return stored, pending_ids
+
+
+def _normalize_bodies(parsed: List[_ParsedEmail]) -> List[Optional[NormalizedBody]]:
+    """Return the stored content of each email, None for an email whose body cannot be read.
+
+    Plain text is preferred; HTML bodies are converted to text, large batches in the process
+    pool. When the batch fails, each email is normalized on its own so only the failing one
+    is skipped.
+    """
+    jobs = [(email.text, email.html, spool_name(email.key)) for email in parsed]
+    try:
+        return list(email_normalizer.normalize(jobs))
+    except Exception as e:
+        logger.error(e, exc_info=True)
+    bodies: List[Optional[NormalizedBody]] = []
+    for email, job in zip(parsed, jobs):
+        try:
+            bodies.append(email_normalizer.normalize([job])[0])
+        except Exception as e:
+            logger.error("Skipping email %s: body could not be normalized: %s", email.key, e)
+            bodies.append(None)
+    return bodies
+
+
+def _store_each(
+    session: Session,
+    follow_ups: List[Tuple[_IncomingEmail, int]],
+    new_emails: List[_IncomingEmail],
+    classifications: List[Optional[ClassificationResult]],
+) -> Tuple[List[str], bool]:
+    """Commit each email on its own. Returns the stored keys and whether every email was stored.
+
+    Pending inquiries are submitted to the classification worker by create_inquiry itself.
+    """
+    stored: List[str] = []
+    complete = True
+    for email, inquiry_id in follow_ups:
+        try:
+            append_customer_message(session, inquiry_id, email.inquiry.content, email.key)
+            stored.append(email.key)
+        except IntegrityError:
+            logger.info("Email %s was already ingested", email.key)
+            stored.append(email.key)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            complete = False
+    for email, classification in zip(new_emails, classifications):
+        try:
+            inquiry_service.create_inquiry(session, email.inquiry, classification, source_message_id=email.key)
+            stored.append(email.key)
+        except IntegrityError:
+            logger.info("Email %s was already ingested", email.key)
+            stored.append(email.key)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            complete = False
+    return stored, complete
+
+
+def _find_thread(session: Session, email: _IncomingEmail) -> Optional[int]:
+    """Return the id of the inquiry ``email`` replies to, or None when it starts a new inquiry."""
+    if not email.references and reply_subject(email.inquiry.title) is None:
+        return None
+    try:
+        return find_thread_inquiry(session, email.references, str(email.inquiry.customer_email), email.inquiry.title)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        session.rollback()
+        return None
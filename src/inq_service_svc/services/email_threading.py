@@ -0,0 +1,124 @@
+import logging
+import re
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from inq_service_svc.models import Inquiry, Message
+from inq_service_svc.models.enums import InquiryStatus, MessageSenderType
+
+logger = logging.getLogger(__name__)
+
+_MESSAGE_ID = re.compile(r"<[^<>\s]+>")
+# "Re:", "RE[2]:", "Fwd:", "AW:" (German), "SV:" (Nordic) ... possibly repeated
+_REPLY_PREFIX = re.compile(r"^\s*(?:(?:re|fw|fwd|aw|sv|antw)\s*(?:\[\d+\])?\s*:\s*)+", re.IGNORECASE)
+
+
+def reference_ids(msg: Any) -> List[str]:
+    """Return the Message-IDs named in the In-Reply-To and References headers, newest first."""
+    headers = getattr(msg, "headers", None) or {}
+    ids: List[str] = []
+    for name in ("in-reply-to", "references"):
+        values = headers.get(name) or ()
+        if isinstance(values, str):
+            values = (values,)
+        found = [message_id for value in values for message_id in _MESSAGE_ID.findall(str(value))]
+        # References lists the thread oldest first
+        ids.extend(reversed(found) if name == "references" else found)
+    return list(dict.fromkeys(ids))
+
+
+def reply_subject(subject: Optional[str]) -> Optional[str]:
+    """Return ``subject`` without its reply/forward prefixes, or None when it has none."""
+    if not subject:
+        return None
+    stripped = _REPLY_PREFIX.sub("", subject, count=1).strip()
+    return stripped if stripped and stripped != subject.strip() else None
+
+
+def find_thread_inquiry(
+    db: Session,
+    references: Sequence[str],
+    customer_email: str,
+    subject: Optional[str],
+) -> Optional[int]:
+    """Return the id of the inquiry an incoming email continues, or None for a new inquiry.
+
+    Referenced Message-IDs are looked up in messages.email_message_id (our replies and earlier
+    follow-ups) and inquiries.source_message_id (the original email). Without a match, a
+    reply-prefixed subject matches the sender's latest inquiry with that exact title.
+    Both kinds of match only accept an inquiry whose customer_email is the sender, so a
+    forwarded thread or a guessed Message-ID cannot append to someone else's inquiry.
+    All lookups use unique or customer_email indexes.
+    """
+    if not customer_email:
+        return None
+    if references:
+        inquiry_id = db.execute(
+            select(Message.inquiry_id)
+            .join(Inquiry, Inquiry.id == Message.inquiry_id)
+            .where(Message.email_message_id.in_(references), Inquiry.customer_email == customer_email)
+            .limit(1)
+        ).scalar()
+        if inquiry_id is None:
+            inquiry_id = db.execute(
+                select(Inquiry.id)
+                .where(Inquiry.source_message_id.in_(references), Inquiry.customer_email == customer_email)
+                .limit(1)
+            ).scalar()
+        if inquiry_id is not None:
+            return inquiry_id
+
+    title = reply_subject(subject)
+    if title is None:
+        return None
+    return db.execute(
+        select(Inquiry.id)
+        .where(Inquiry.customer_email == customer_email, Inquiry.title == title)
+        .order_by(Inquiry.id.desc())
+        .limit(1)
+    ).scalar()
+
+
+def append_customer_message(
+    db: Session,
+    inquiry_id: int,
+    content: str,
+    email_message_id: Optional[str] = None,
+    commit: bool = True,
+) -> Message:
+    """Append a customer follow-up to an inquiry and commit.
+
+    A Completed inquiry is reopened as New so it reappears in the assignee's workload.
+    Storing an ``email_message_id`` that already exists raises IntegrityError. With
+    ``commit=False`` the change is flushed in a savepoint of the caller's transaction.
+    """
+
+    def _append() -> Message:
+        message = Message(
+            inquiry_id=inquiry_id,
+            content=content,
+            sender_type=MessageSenderType.Customer,
+            email_message_id=email_message_id,
+        )
+        db.add(message)
+        inquiry = db.get(Inquiry, inquiry_id)
+        if inquiry is not None and inquiry.status == InquiryStatus.Completed:
+            inquiry.status = InquiryStatus.New
+        return message
+
+    if not commit:
+        with db.begin_nested():
+            return _append()
+
+    try:
+        message = _append()
+        db.commit()
+        return message
+    except Exception:
+        try:
+            db.rollback()
+        except Exception as ex:
+            logger.error(ex, exc_info=True)
+        raise
@@ -1,59 +1,62 @@
-from typing import Optional
+import asyncio
+import heapq
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
 import logging
 
-from sqlalchemy import select, func
+from sqlalchemy import Select, func, insert, select, literal, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from inq_service_svc.models import User, Inquiry
-from inq_service_svc.models.enums import UserRole, InquiryStatus
+from inq_service_svc.models import User, Inquiry, StaffWorkload
+from inq_service_svc.models.enums import UserRole, InquiryStatus, ClassificationStatus
+from inq_service_svc.models.workload import PENDING_CHANGES_KEY, record_workload_deltas
 
 from inq_service_svc.schemas.inquiry import InquiryCreate
 from inq_service_svc.services.classifier import (
+    classify_inquiries,
     classify_inquiry,
     DEFAULT_CLASSIFICATION,
     ClassificationResult,
 )
+from inq_service_svc.services.staff_assigner import staff_assigner
+from inq_service_svc.services.classification_worker import classification_deferred, classification_worker
 
 logger = logging.getLogger(__name__)
 
 
+def build_workload_query() -> Select:
+    """Build the query selecting the Staff user id with the lowest active workload.
+
+    Reads the incrementally maintained staff_workloads counters through their
+    (active_count, user_id) index. Ties are broken by user.id.
+    """
+    return (
+        select(StaffWorkload.user_id, StaffWorkload.active_count.label("workload"))
+        .join(User, User.id == StaffWorkload.user_id)
+        .where(User.role == UserRole.Staff)
+        .order_by(StaffWorkload.active_count.asc(), StaffWorkload.user_id.asc())
+        .limit(1)
+    )
+
+
 def assign_staff(db: Session) -> Optional[int]:
     """Return the staff user id with the minimum active workload or None.
 
     Workload counts inquiries assigned to the user with status New or On-Hold.
     Only users with role == UserRole.Staff are considered. Ties broken by user.id.
     Returns None when no staff users exist or on error.
+
+    When the in-memory staff assigner is enabled and loaded it answers without a query.
     """
     try:
-        # Active statuses to count
-        active_statuses = [InquiryStatus.New, InquiryStatus.On_Hold]
-
-        # Subquery: count active inquiries per assigned_user_id
-        subq = (
-            select(
-                Inquiry.assigned_user_id.label("user_id"),
-                func.count(Inquiry.id).label("workload"),
-            )
-            .where(
-                Inquiry.status.in_(active_statuses),
-                Inquiry.assigned_user_id != None,
-            )
-            .group_by(Inquiry.assigned_user_id)
-            .subquery()
-        )
-
-        # Outer select users (only Staff) and coalesce workload to 0 for users with no active inquiries
-        workload_col = func.coalesce(subq.c.workload, 0)
-
-        stmt = (
-            select(User.id, workload_col.label("workload"))
-            .outerjoin(subq, User.id == subq.c.user_id)
-            .where(User.role == UserRole.Staff)
-            .order_by(workload_col.asc(), User.id.asc())
-            .limit(1)
-        )
+        if staff_assigner.ready:
+            # include assignments flushed earlier in this (not yet committed) transaction
+            pending = db.info.get(PENDING_CHANGES_KEY)
+            return staff_assigner.pick(pending)
 
-        row = db.execute(stmt).first()
+        row = db.execute(build_workload_query()).first()
         if not row:
             return None
 
@@ -65,19 +68,81 @@ def assign_staff(db: Session) -> Optional[int]:
         return None
 
 
-def create_inquiry(db: Session, inquiry_data: InquiryCreate) -> Inquiry:
+def build_workload_snapshot_query() -> Select:
+    """Build the query selecting every Staff user id with its active workload."""
+    return (
+        select(User.id, func.coalesce(StaffWorkload.active_count, 0))
+        .outerjoin(StaffWorkload, StaffWorkload.user_id == User.id)
+        .where(User.role == UserRole.Staff)
+    )
+
+
+def load_workload_snapshot(db: Session) -> Dict[int, int]:
+    """Return ``{staff user id: active workload}`` as seen by this session's transaction."""
+    pending = db.info.get(PENDING_CHANGES_KEY)
+    if staff_assigner.ready:
+        return staff_assigner.snapshot(pending["deltas"] if pending else None)
+    return {int(user_id): int(count) for user_id, count in db.execute(build_workload_snapshot_query())}
+
+
+def plan_assignments(workloads: Dict[int, int], count: int) -> List[Optional[int]]:
+    """Assign ``count`` new inquiries one after another to the least loaded staff user.
+
+    Gives the same sequence as calling assign_staff once per inquiry with each assignment
+    committed in between (ties broken by user id). Returns None entries when there is no staff.
+    """
+    if not workloads:
+        return [None] * count
+    heap = [(load, user_id) for user_id, load in workloads.items()]
+    heapq.heapify(heap)
+    assigned: List[Optional[int]] = []
+    for _ in range(count):
+        load, user_id = heap[0]
+        assigned.append(user_id)
+        heapq.heapreplace(heap, (load + 1, user_id))
+    return assigned
+
+
+def _classify(inquiry_data: InquiryCreate) -> ClassificationResult:
+    # classification may fail but returns default result
+    try:
+        return classify_inquiry(inquiry_data.title, inquiry_data.content)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return DEFAULT_CLASSIFICATION
+
+
+def create_inquiry(
+    db: Session,
+    inquiry_data: InquiryCreate,
+    classification: Optional[ClassificationResult] = None,
+    deferred: Optional[bool] = None,
+    source_message_id: Optional[str] = None,
+    commit: bool = True,
+) -> Inquiry:
     """Create and persist a new Inquiry, including classification and staff assignment.
 
     This function encapsulates the business logic of creating an inquiry. It does not
-    perform side-effects like websocket broadcasting or sending emails.
+    perform side-effects like websocket broadcasting or sending emails. Callers that
+    already classified the inquiry pass ``classification`` to skip the LLM call.
+
+    With ``deferred`` (default: CLASSIFICATION_MODE == "deferred") and no classification
+    given, the inquiry is stored with a pending classification and handed to the
+    classification worker.
+
+    ``source_message_id`` identifies the email the inquiry was created from; storing an
+    id that already exists raises IntegrityError.
+
+    With ``commit=False`` the inquiry is flushed inside a savepoint of the caller's
+    transaction, so a failure only undoes this inquiry. The caller commits and then
+    submits pending inquiries to the classification worker.
     """
     try:
-        # classification may fail but returns default result
-        try:
-            classification: ClassificationResult = classify_inquiry(inquiry_data.title, inquiry_data.content)
-        except Exception as e:
-            logger.error(e, exc_info=True)
-            classification = DEFAULT_CLASSIFICATION
+        if deferred is None:
+            deferred = classification_deferred()
+        pending = classification is None and deferred
+        if classification is None and not pending:
+            classification = _classify(inquiry_data)
 
         # assignment may fail and return None
         try:
@@ -92,11 +157,20 @@ def create_inquiry(db: Session, inquiry_data: InquiryCreate) -> Inquiry:
             customer_email=str(inquiry_data.customer_email),
             customer_name=inquiry_data.customer_name,
             status=InquiryStatus.New,
-            category=classification.category,
-            urgency=classification.urgency,
+            category=None if pending else classification.category,
+            urgency=None if pending else classification.urgency,
+            classification_status=ClassificationStatus.Pending if pending else ClassificationStatus.Classified,
+            classification_source=None if pending else classification.source,
             assigned_user_id=assigned_user_id,
+            source_message_id=source_message_id,
         )
 
+        if not commit:
+            # a failure only rolls back this savepoint, not the caller's transaction
+            with db.begin_nested():
+                db.add(inquiry)
+            return inquiry
+
         try:
             db.add(inquiry)
             db.commit()
@@ -110,7 +184,181 @@ def create_inquiry(db: Session, inquiry_data: InquiryCreate) -> Inquiry:
             # re-raise to let callers translate to HTTP responses
             raise
 
+        if pending:
+            # not queued when the worker is not running; the sweep job picks it up later
+            classification_worker.submit(inquiry.id)
+
         return inquiry
     except Exception as e:
         logger.error(e, exc_info=True)
         raise
+
+
+def create_inquiries(
+    db: Session,
+    items: Sequence[InquiryCreate],
+    classifications: Optional[Sequence[Optional[ClassificationResult]]] = None,
+    deferred: Optional[bool] = None,
+    source_message_ids: Optional[Sequence[Optional[str]]] = None,
+    commit: bool = True,
+) -> List[int]:
+    """Create several inquiries with one bulk INSERT and return their ids in input order.
+
+    Staff are assigned for the whole batch from one workload snapshot (see plan_assignments)
+    and the staff_workloads counters are updated once per assignee. ``classifications`` and
+    ``source_message_ids`` are parallel to ``items``; items without a classification are
+    classified together with classify_inquiries, or stored as pending when ``deferred``
+    (default: CLASSIFICATION_MODE == "deferred").
+
+    Like create_inquiry, nothing is broadcast. A duplicate ``source_message_id`` raises
+    IntegrityError and no inquiry of the batch is stored. With ``commit=False`` the batch
+    is written in a savepoint of the caller's transaction and the caller submits pending
+    inquiries to the classification worker after committing.
+    """
+    if not items:
+        return []
+    if deferred is None:
+        deferred = classification_deferred()
+    results: List[Optional[ClassificationResult]] = list(classifications or [None] * len(items))
+    message_ids: List[Optional[str]] = list(source_message_ids or [None] * len(items))
+    if len(results) != len(items) or len(message_ids) != len(items):
+        raise ValueError("classifications and source_message_ids must match items")
+
+    missing = [position for position, result in enumerate(results) if result is None]
+    if missing and not deferred:
+        try:
+            classified = classify_inquiries([(items[i].title, items[i].content) for i in missing])
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            classified = [DEFAULT_CLASSIFICATION] * len(missing)
+        for position, result in zip(missing, classified):
+            results[position] = result
+
+    try:
+        if commit:
+            workloads = load_workload_snapshot(db)
+        else:
+            # a failure must not roll back the caller's transaction (e.g. follow-ups it wrote)
+            with db.begin_nested():
+                workloads = load_workload_snapshot(db)
+        assignments = plan_assignments(workloads, len(items))
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        if commit:
+            db.rollback()
+        assignments = [None] * len(items)
+
+    rows = [
+        {
+            "title": data.title,
+            "content": data.content,
+            "customer_email": str(data.customer_email),
+            "customer_name": data.customer_name,
+            "status": InquiryStatus.New,
+            "category": result.category if result is not None else None,
+            "urgency": result.urgency if result is not None else None,
+            "classification_status": (
+                ClassificationStatus.Classified if result is not None else ClassificationStatus.Pending
+            ),
+            "classification_source": result.source if result is not None else None,
+            "assigned_user_id": assigned_user_id,
+            "source_message_id": message_id,
+        }
+        for data, result, assigned_user_id, message_id in zip(items, results, assignments, message_ids)
+    ]
+
+    def _insert() -> List[int]:
+        # executemany-style INSERT ... RETURNING; bypasses the unit of work, so the workload
+        # counters the after_flush hook would maintain are recorded explicitly
+        inserted = db.execute(insert(Inquiry).returning(Inquiry.id, sort_by_parameter_order=True), rows)
+        ids = [row[0] for row in inserted]
+        record_workload_deltas(db, Counter(user_id for user_id in assignments if user_id is not None))
+        return ids
+
+    if not commit:
+        with db.begin_nested():
+            return _insert()
+
+    try:
+        ids = _insert()
+        db.commit()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        try:
+            db.rollback()
+        except Exception as ex:
+            logger.error(ex, exc_info=True)
+        raise
+
+    for inquiry_id, result in zip(ids, results):
+        if result is None:
+            # not queued when the worker is not running; the sweep job picks it up later
+            classification_worker.submit(inquiry_id)
+    return ids
+
+
+async def create_inquiry_async(db: AsyncSession, inquiry_data: InquiryCreate) -> Inquiry:
+    """Async counterpart of create_inquiry for the API routers.
+
+    The blocking LLM call runs in a worker thread; assignment and persistence reuse
+    create_inquiry through AsyncSession.run_sync so both paths share one implementation.
+    In deferred mode the LLM call is skipped and the inquiry is returned as pending.
+    """
+    if classification_deferred():
+        return await db.run_sync(create_inquiry, inquiry_data, None, True)
+    classification = await asyncio.to_thread(_classify, inquiry_data)
+    return await db.run_sync(create_inquiry, inquiry_data, classification, False)
+
+
+async def create_inquiries_async(db: AsyncSession, items: Sequence[InquiryCreate]) -> List[int]:
+    """Async counterpart of create_inquiries; the batched LLM requests run in a worker thread."""
+    if classification_deferred():
+        return await db.run_sync(create_inquiries, items, None, True)
+    try:
+        classifications = await asyncio.to_thread(classify_inquiries, [(i.title, i.content) for i in items])
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        classifications = [DEFAULT_CLASSIFICATION] * len(items)
+    return await db.run_sync(create_inquiries, items, classifications, False)
+
+
+def build_inquiry_page_query(
+    status: Optional[InquiryStatus] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 50,
+) -> Select:
+    """Build the keyset page query for inquiries ordered by (created_at, id).
+
+    ``after`` is the (created_at, id) of the last row of the previous page. One extra
+    row beyond ``limit`` is selected so callers can tell whether another page exists.
+    """
+    stmt = select(Inquiry)
+    if status is not None:
+        stmt = stmt.where(Inquiry.status == status)
+    if after is not None:
+        position = tuple_(literal(after[0], Inquiry.created_at.type), literal(after[1], Inquiry.id.type))
+        stmt = stmt.where(tuple_(Inquiry.created_at, Inquiry.id) > position)
+    return stmt.order_by(Inquiry.created_at.asc(), Inquiry.id.asc()).limit(limit + 1)
+
+
+def list_inquiries_page(
+    db: Session,
+    status: Optional[InquiryStatus] = None,
+    after: Optional[Tuple[datetime, int]] = None,
+    limit: int = 50,
+) -> Tuple[List[Inquiry], Optional[Tuple[datetime, int]]]:
+    """Return one page of inquiries and the keyset position of the next page (or None).
+
+    Seeks directly past ``after`` instead of using OFFSET, so the cost per page is
+    independent of how deep the caller has paged.
+    """
+    if limit <= 0:
+        raise ValueError("limit must be > 0")
+
+    rows = list(db.execute(build_inquiry_page_query(status, after, limit)).scalars().all())
+    if len(rows) <= limit:
+        return rows, None
+
+    page = rows[:limit]
+    last = page[-1]
+    return page, (last.created_at, last.id)
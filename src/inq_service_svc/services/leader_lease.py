@@ -0,0 +1,196 @@
+import functools
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import SchedulerLease
+from inq_service_svc.models.base import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+LeadershipCallback = Callable[[bool], None]
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def default_holder_id() -> str:
+    """Identify this process across the cluster: host, pid and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class LeaderLease:
+    """Elect one process of the cluster to run singleton jobs through a scheduler_leases row.
+
+    ``renew`` (scheduled every few seconds in every process) takes the lease when it is
+    free or expired and extends it while held, in one conditional UPDATE (or an INSERT for
+    the first holder, the primary key rejecting a concurrent one). The holder counts as
+    leader locally for at most ``ttl - margin`` seconds after its last successful renewal,
+    measured on the monotonic clock, so it stops before another process can take the
+    expired lease (wall clocks across hosts must agree within ``margin``). ``release`` ends
+    the lease on shutdown so a successor takes over at its next renewal instead of waiting
+    for the expiry.
+
+    With ``enabled=False`` (single process deployments) every process is the leader.
+    """
+
+    def __init__(
+        self,
+        name: str = "scheduler",
+        ttl: float = 30.0,
+        margin: float = 5.0,
+        session_factory: Callable[[], Session] = SessionLocal,
+        holder_id: Optional[str] = None,
+        enabled: bool = True,
+    ) -> None:
+        self.name = name
+        self.ttl = ttl
+        self.margin = min(margin, ttl / 2)
+        self.session_factory = session_factory
+        self.holder_id = holder_id or default_holder_id()
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._valid_until = 0.0
+        self._was_leader = False
+        self._callbacks: List[LeadershipCallback] = []
+        self.acquired = 0
+        self.lost = 0
+
+    @property
+    def is_leader(self) -> bool:
+        if not self.enabled:
+            return True
+        with self._lock:
+            return time.monotonic() < self._valid_until
+
+    def on_change(self, callback: LeadershipCallback) -> LeadershipCallback:
+        """Register ``callback(is_leader)``, called from ``renew`` when leadership changes."""
+        self._callbacks.append(callback)
+        return callback
+
+    def remove_on_change(self, callback: LeadershipCallback) -> None:
+        if callback in self._callbacks:
+            self._callbacks.remove(callback)
+
+    def _try_acquire(self, db: Session) -> bool:
+        now = _utcnow()
+        expires_at = now + timedelta(seconds=self.ttl)
+        result = db.execute(
+            update(SchedulerLease)
+            .where(
+                SchedulerLease.name == self.name,
+                or_(SchedulerLease.holder == self.holder_id, SchedulerLease.expires_at < now),
+            )
+            .values(holder=self.holder_id, expires_at=expires_at)
+        )
+        if result.rowcount == 0:
+            db.add(SchedulerLease(name=self.name, holder=self.holder_id, expires_at=expires_at))
+            try:
+                db.flush()
+            except IntegrityError:
+                # the row exists and another live process holds it
+                db.rollback()
+                return False
+        db.commit()
+        return True
+
+    def renew(self) -> bool:
+        """Take or extend the lease. Returns whether this process is the leader afterwards."""
+        if not self.enabled:
+            return True
+
+        started = time.monotonic()
+        held = False
+        session = None
+        try:
+            session = self.session_factory()
+            held = self._try_acquire(session)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+
+        with self._lock:
+            if held:
+                self._valid_until = started + self.ttl - self.margin
+            leader = time.monotonic() < self._valid_until
+            changed = leader != self._was_leader
+            self._was_leader = leader
+            if changed and leader:
+                self.acquired += 1
+            elif changed:
+                self.lost += 1
+
+        if changed:
+            logger.info("%s %s leadership of %s", self.holder_id, "acquired" if leader else "lost", self.name)
+            for callback in self._callbacks:
+                try:
+                    callback(leader)
+                except Exception as e:
+                    logger.error(e, exc_info=True)
+        return leader
+
+    def release(self) -> None:
+        """Give up the lease (if held) so another process can take it over immediately."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._valid_until = 0.0
+            self._was_leader = False
+
+        session = None
+        try:
+            session = self.session_factory()
+            session.execute(
+                update(SchedulerLease)
+                .where(SchedulerLease.name == self.name, SchedulerLease.holder == self.holder_id)
+                .values(expires_at=_utcnow() - timedelta(seconds=1))
+            )
+            session.commit()
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            if session is not None:
+                session.rollback()
+        finally:
+            if session is not None:
+                session.close()
+
+
+# Module-level lease deciding which process runs the cluster-wide jobs
+leader_lease = LeaderLease(
+    ttl=config.SCHEDULER_LEASE_TTL,
+    enabled=config.SCHEDULER_LEADER_ELECTION,
+)
+
+
+def leader_only(func: Callable[..., None], lease: Optional[LeaderLease] = None) -> Callable[..., None]:
+    """Wrap a scheduled job so it only runs in the process holding the lease."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs) -> None:
+        current = lease or leader_lease
+        if not current.is_leader:
+            logger.debug("Skipping %s: not the leader", func.__name__)
+            return
+        return func(*args, **kwargs)
+
+    return wrapper
+
+
+def process_leader_lease_renewal() -> None:
+    """Scheduled job: take or extend the leader lease in every process."""
+    leader_lease.renew()
@@ -0,0 +1,344 @@
+"""Local multinomial naive Bayes classifier trained on classified inquiries.
+
+Answers common, easy inquiries in-process when its confidence is above
+LOCAL_CLASSIFIER_THRESHOLD so they skip the OpenAI round trip.
+
+Usage:
+    poetry run python -m inq_service_svc.services.local_classifier train
+    poetry run python -m inq_service_svc.services.local_classifier report
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import re
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import Inquiry
+from inq_service_svc.models.base import SessionLocal
+from inq_service_svc.models.enums import TRUSTED_CLASSIFICATION_SOURCES, ClassificationSource, ClassificationStatus
+from inq_service_svc.schemas.classification import ALLOWED_CATEGORIES, ALLOWED_URGENCIES, ClassificationResult
+
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r"[a-z0-9']+")
+_DIGITS = re.compile(r"\d+")
+
+# (title, content, category, urgency)
+LabeledInquiry = Tuple[str, str, str, str]
+
+
+def tokenize(title: str, content: str) -> List[str]:
+    """Lowercase word tokens of title and content; title words are counted twice."""
+    title_tokens = _TOKEN.findall(_DIGITS.sub("0", (title or "").lower()))
+    content_tokens = _TOKEN.findall(_DIGITS.sub("0", (content or "").lower()))
+    return title_tokens * 2 + content_tokens
+
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes over token counts with Laplace smoothing."""
+
+    def __init__(self, alpha: float = 1.0) -> None:
+        self.alpha = alpha
+        self.class_counts: Dict[str, int] = {}
+        self.token_counts: Dict[str, Dict[str, int]] = {}
+        self.class_totals: Dict[str, int] = {}
+        self.vocabulary_size = 0
+
+    def fit(self, documents: Iterable[List[str]], labels: Iterable[str]) -> "NaiveBayesModel":
+        class_counts: Counter = Counter()
+        token_counts: Dict[str, Counter] = defaultdict(Counter)
+        vocabulary = set()
+        for tokens, label in zip(documents, labels):
+            class_counts[label] += 1
+            token_counts[label].update(tokens)
+            vocabulary.update(tokens)
+        self.class_counts = dict(class_counts)
+        self.token_counts = {label: dict(counts) for label, counts in token_counts.items()}
+        self.class_totals = {label: sum(counts.values()) for label, counts in token_counts.items()}
+        self.vocabulary_size = len(vocabulary)
+        return self
+
+    def predict(self, tokens: List[str]) -> Tuple[Optional[str], float]:
+        """Return the most probable label and its posterior probability."""
+        if not self.class_counts:
+            return None, 0.0
+
+        total_docs = sum(self.class_counts.values())
+        log_scores: Dict[str, float] = {}
+        for label, doc_count in self.class_counts.items():
+            counts = self.token_counts.get(label, {})
+            denominator = math.log(self.class_totals.get(label, 0) + self.alpha * (self.vocabulary_size + 1))
+            score = math.log(doc_count / total_docs)
+            for token in tokens:
+                score += math.log(counts.get(token, 0) + self.alpha) - denominator
+            log_scores[label] = score
+
+        best = max(log_scores, key=log_scores.get)
+        # softmax over the log scores, shifted for numerical stability
+        top = log_scores[best]
+        normalizer = sum(math.exp(score - top) for score in log_scores.values())
+        return best, 1.0 / normalizer
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "alpha": self.alpha,
+            "class_counts": self.class_counts,
+            "token_counts": self.token_counts,
+            "vocabulary_size": self.vocabulary_size,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NaiveBayesModel":
+        model = cls(alpha=data.get("alpha", 1.0))
+        model.class_counts = dict(data["class_counts"])
+        model.token_counts = {label: dict(counts) for label, counts in data["token_counts"].items()}
+        model.class_totals = {label: sum(counts.values()) for label, counts in model.token_counts.items()}
+        model.vocabulary_size = int(data["vocabulary_size"])
+        return model
+
+
+class LocalClassifier:
+    """Category and urgency naive Bayes models answering above a confidence threshold."""
+
+    def __init__(self, category_model: NaiveBayesModel, urgency_model: NaiveBayesModel, trained_on: int = 0) -> None:
+        self.category_model = category_model
+        self.urgency_model = urgency_model
+        self.trained_on = trained_on
+
+    @classmethod
+    def train(cls, examples: Sequence[LabeledInquiry], alpha: float = 1.0) -> "LocalClassifier":
+        documents = [tokenize(title, content) for title, content, _, _ in examples]
+        category_model = NaiveBayesModel(alpha).fit(documents, [example[2] for example in examples])
+        urgency_model = NaiveBayesModel(alpha).fit(documents, [example[3] for example in examples])
+        return cls(category_model, urgency_model, trained_on=len(examples))
+
+    def predict(self, title: str, content: str) -> Tuple[Optional[ClassificationResult], float]:
+        """Return the prediction and its confidence (the lower of the two posteriors)."""
+        tokens = tokenize(title, content)
+        category, category_confidence = self.category_model.predict(tokens)
+        urgency, urgency_confidence = self.urgency_model.predict(tokens)
+        if category is None or urgency is None:
+            return None, 0.0
+        result = ClassificationResult(category=category, urgency=urgency).from_source(ClassificationSource.Local)
+        return result, min(category_confidence, urgency_confidence)
+
+    def unusable_reason(self, min_examples_per_class: int) -> Optional[str]:
+        """Return why the model must not answer, or None when it is usable.
+
+        A model needs at least two labels and ``min_examples_per_class`` examples per label:
+        with a single label every posterior is 1.0, so it would answer every inquiry.
+        """
+        for name, model in (("category", self.category_model), ("urgency", self.urgency_model)):
+            if len(model.class_counts) < 2:
+                return f"{name} model has {len(model.class_counts)} label(s), at least 2 are needed"
+            rare = sorted(label for label, count in model.class_counts.items() if count < min_examples_per_class)
+            if rare:
+                return f"{name} labels with fewer than {min_examples_per_class} examples: {', '.join(rare)}"
+        return None
+
+    def classify(self, title: str, content: str, threshold: float) -> Optional[ClassificationResult]:
+        """Return the prediction when its confidence reaches ``threshold``, else None."""
+        result, confidence = self.predict(title, content)
+        return result if result is not None and confidence >= threshold else None
+
+    def save(self, path: str) -> None:
+        """Write the model as JSON, replacing ``path`` atomically."""
+        data = {
+            "version": 1,
+            "trained_on": self.trained_on,
+            "category": self.category_model.to_dict(),
+            "urgency": self.urgency_model.to_dict(),
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "LocalClassifier":
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            NaiveBayesModel.from_dict(data["category"]),
+            NaiveBayesModel.from_dict(data["urgency"]),
+            trained_on=data.get("trained_on", 0),
+        )
+
+
+_lock = threading.Lock()
+_loaded: Optional[LocalClassifier] = None
+_loaded_key: Optional[Tuple[str, float]] = None
+
+
+def get_local_classifier() -> Optional[LocalClassifier]:
+    """Return the model at LOCAL_CLASSIFIER_MODEL_PATH, reloading it after a retrain.
+
+    Returns None when the local classifier is disabled, no model has been trained or the
+    model has too few labels or examples (see ``LocalClassifier.unusable_reason``).
+    """
+    global _loaded, _loaded_key
+    if not config.LOCAL_CLASSIFIER_ENABLED:
+        return None
+    path = config.LOCAL_CLASSIFIER_MODEL_PATH
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+
+    with _lock:
+        if (path, mtime) != _loaded_key:
+            try:
+                model = LocalClassifier.load(path)
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                return None
+            # a rejected model is not loaded again until the file changes
+            _loaded, _loaded_key = model, (path, mtime)
+            reason = model.unusable_reason(config.LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS)
+            if reason is not None:
+                _loaded = None
+                logger.warning("Not using local classifier from %s: %s", path, reason)
+            else:
+                logger.info("Loaded local classifier from %s (%s examples)", path, model.trained_on)
+        return _loaded
+
+
+def classify_locally(title: str, content: str) -> Optional[ClassificationResult]:
+    """Return the local classifier's answer when it is confident enough, else None."""
+    model = get_local_classifier()
+    if model is None:
+        return None
+    try:
+        return model.classify(title, content, config.LOCAL_CLASSIFIER_THRESHOLD)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return None
+
+
+def build_training_query() -> Select:
+    """Build the query selecting classified inquiries with valid labels, oldest first.
+
+    Only LLM and staff labels are used: fallbacks would teach General/Medium and the model's
+    own answers would feed its mistakes back into training.
+    """
+    return (
+        select(Inquiry.id, Inquiry.title, Inquiry.content, Inquiry.category, Inquiry.urgency)
+        .where(
+            Inquiry.classification_status == ClassificationStatus.Classified,
+            Inquiry.classification_source.in_(TRUSTED_CLASSIFICATION_SOURCES),
+            Inquiry.category.in_(ALLOWED_CATEGORIES),
+            Inquiry.urgency.in_(ALLOWED_URGENCIES),
+        )
+        .order_by(Inquiry.id.asc())
+    )
+
+
+def load_examples(db: Session, holdout_every: int = 0) -> Tuple[List[LabeledInquiry], List[LabeledInquiry]]:
+    """Return (training, held-out) examples; every ``holdout_every``-th inquiry id is held out."""
+    training: List[LabeledInquiry] = []
+    held_out: List[LabeledInquiry] = []
+    for row in db.execute(build_training_query()):
+        example = (row.title, row.content, row.category, row.urgency)
+        if holdout_every > 0 and row.id % holdout_every == 0:
+            held_out.append(example)
+        else:
+            training.append(example)
+    return training, held_out
+
+
+def evaluate(model: LocalClassifier, examples: Sequence[LabeledInquiry], threshold: float) -> Dict[str, Any]:
+    """Accuracy, coverage above ``threshold`` and prediction latency on labeled examples."""
+    latencies: List[float] = []
+    category_correct = urgency_correct = both_correct = 0
+    answered = answered_correct = 0
+    for title, content, category, urgency in examples:
+        start = time.perf_counter()
+        result, confidence = model.predict(title, content)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if result is None:
+            continue
+        correct = result.category == category and result.urgency == urgency
+        category_correct += result.category == category
+        urgency_correct += result.urgency == urgency
+        both_correct += correct
+        if confidence >= threshold:
+            answered += 1
+            answered_correct += correct
+
+    total = len(examples)
+    return {
+        "examples": total,
+        "threshold": threshold,
+        "category_accuracy": category_correct / total if total else 0.0,
+        "urgency_accuracy": urgency_correct / total if total else 0.0,
+        "accuracy": both_correct / total if total else 0.0,
+        # share of inquiries that would skip the LLM, and how often those answers are right
+        "coverage": answered / total if total else 0.0,
+        "answered_accuracy": answered_correct / answered if answered else 0.0,
+        "latency_ms_mean": statistics.fmean(latencies) if latencies else 0.0,
+        "latency_ms_p95": sorted(latencies)[int(0.95 * (len(latencies) - 1))] if latencies else 0.0,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["train", "report"], help="train and save the model, or only report")
+    parser.add_argument("--model-path", default=config.LOCAL_CLASSIFIER_MODEL_PATH)
+    parser.add_argument("--threshold", type=float, default=config.LOCAL_CLASSIFIER_THRESHOLD)
+    parser.add_argument(
+        "--holdout-every", type=int, default=5, help="hold out every Nth inquiry id for the report (0: none)"
+    )
+    parser.add_argument("--min-examples-per-class", type=int, default=config.LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS)
+    parser.add_argument(
+        "--min-accuracy",
+        type=float,
+        default=config.LOCAL_CLASSIFIER_MIN_ACCURACY,
+        help="held-out answered_accuracy required to save the model",
+    )
+    args = parser.parse_args(argv)
+
+    session = SessionLocal()
+    try:
+        training, held_out = load_examples(session, args.holdout_every)
+    finally:
+        session.close()
+
+    if not training:
+        print("No classified inquiries to train on")
+        return 1
+
+    model = LocalClassifier.train(training)
+    report = evaluate(model, held_out, args.threshold)
+    print(json.dumps(report, indent=2))
+
+    if args.command == "train":
+        # the saved model also learns from the held-out examples
+        final = LocalClassifier.train(training + held_out)
+        reason = final.unusable_reason(args.min_examples_per_class)
+        if reason is not None:
+            print(f"Not saving the model: {reason}")
+            return 1
+        # naive Bayes posteriors are overconfident, so the threshold alone does not bound the error rate
+        if report["answered_accuracy"] < args.min_accuracy:
+            print(
+                f"Not saving the model: held-out answered_accuracy {report['answered_accuracy']:.3f} "
+                f"is below {args.min_accuracy}"
+            )
+            return 1
+        final.save(args.model_path)
+        print(f"Saved model trained on {len(training) + len(held_out)} inquiries to {args.model_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
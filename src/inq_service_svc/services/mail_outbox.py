@@ -0,0 +1,294 @@
+import logging
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import OutboundEmail
+from inq_service_svc.models.base import SessionLocal
+from inq_service_svc.models.enums import OutboundEmailStatus
+from inq_service_svc.utils.email_client import SmtpConnection, build_email_message
+
+logger = logging.getLogger(__name__)
+
+# close a sender's SMTP connection after this many idle seconds
+CONNECTION_IDLE_TIMEOUT = 60.0
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_email(
+    db: Any,
+    to_email: str,
+    subject: str,
+    body: str,
+    message_id: Optional[str] = None,
+    in_reply_to: Optional[str] = None,
+) -> OutboundEmail:
+    """Add a Pending outbound email to ``db`` (a Session or AsyncSession).
+
+    Nothing is sent until the caller commits, so the email is stored atomically with the
+    change that triggered it. Submit the id to ``mail_outbox`` after the commit.
+    Raises ValueError on invalid input.
+    """
+    build_email_message(to_email, subject, body, message_id, in_reply_to)
+    outbound = OutboundEmail(
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        message_id=message_id,
+        in_reply_to=in_reply_to,
+        status=OutboundEmailStatus.Pending,
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.add(outbound)
+    return outbound
+
+
+def build_due_outbound_query(now: datetime, limit: int = 500) -> Select:
+    """Build the query selecting ids of Pending emails due for a (re)try, oldest first."""
+    return (
+        select(OutboundEmail.id)
+        .where(OutboundEmail.status == OutboundEmailStatus.Pending, OutboundEmail.next_attempt_at <= now)
+        .order_by(OutboundEmail.next_attempt_at.asc(), OutboundEmail.id.asc())
+        .limit(limit)
+    )
+
+
+class MailOutbox:
+    """Deliver outbound_emails rows from a bounded queue with a pool of sender threads.
+
+    Each sender thread keeps one authenticated SMTP connection (``connection_factory``)
+    open across messages. A delivery first claims the row by pushing ``next_attempt_at``
+    ``lease`` seconds ahead, so another worker or replica does not send it concurrently
+    and a crash mid-send only delays the retry. Failed attempts are rescheduled with
+    exponential backoff and jitter; after ``max_attempts`` the row is marked Failed.
+
+    Ids that do not fit the queue, or are submitted while the outbox is not running, stay
+    Pending in the table for process_outbound_email_retries.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        connection_factory: Callable[[], Any] = SmtpConnection,
+        queue_size: int = 1000,
+        max_attempts: int = 8,
+        backoff_initial: float = 30.0,
+        backoff_max: float = 3600.0,
+        lease: float = 300.0,
+    ) -> None:
+        self.session_factory = session_factory
+        self.connection_factory = connection_factory
+        self.queue_size = queue_size
+        self.max_attempts = max_attempts
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+        self.lease = lease
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._queue: "queue.Queue[int]" = queue.Queue(maxsize=max(queue_size, 1))
+        self._queued: Set[int] = set()
+        self._threads: List[threading.Thread] = []
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.overflowed = 0
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, workers: int = 2) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._queue = queue.Queue(maxsize=max(self.queue_size, 1))
+        self._queued = set()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"mail-outbox-{i}", daemon=True) for i in range(max(workers, 1))
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self, timeout: Optional[float] = 10.0) -> None:
+        """Stop the senders; queued emails stay Pending for the next start."""
+        self._stop.set()
+        threads, self._threads = self._threads, []
+        for thread in threads:
+            thread.join(timeout)
+
+    def join(self) -> None:
+        """Wait until every submitted email has been processed."""
+        self._queue.join()
+
+    def submit(self, outbound_id: int) -> bool:
+        """Queue ``outbound_id`` for delivery. Returns False when not running or the queue is full."""
+        if not self.running:
+            return False
+        with self._lock:
+            if outbound_id in self._queued:
+                return True
+            try:
+                self._queue.put_nowait(outbound_id)
+            except queue.Full:
+                self.overflowed += 1
+                return False
+            self._queued.add(outbound_id)
+        return True
+
+    def retry_delay(self, attempts: int) -> float:
+        """Seconds before the next attempt after ``attempts`` failures (exponential, jittered)."""
+        delay = min(self.backoff_initial * 2 ** max(attempts - 1, 0), self.backoff_max)
+        return random.uniform(delay / 2, delay)
+
+    def deliver(self, db: Session, outbound_id: int, connection: Any) -> Optional[bool]:
+        """Claim and send one email. Returns True when sent, False on failure, None when not due."""
+        now = _utcnow()
+        claimed = db.execute(
+            update(OutboundEmail)
+            .where(
+                OutboundEmail.id == outbound_id,
+                OutboundEmail.status == OutboundEmailStatus.Pending,
+                OutboundEmail.next_attempt_at <= now,
+            )
+            .values(attempts=OutboundEmail.attempts + 1, next_attempt_at=now + timedelta(seconds=self.lease))
+        )
+        db.commit()
+        if claimed.rowcount == 0:
+            return None
+
+        row = db.execute(
+            select(
+                OutboundEmail.to_email,
+                OutboundEmail.subject,
+                OutboundEmail.body,
+                OutboundEmail.message_id,
+                OutboundEmail.in_reply_to,
+                OutboundEmail.attempts,
+            ).where(OutboundEmail.id == outbound_id)
+        ).one()
+        # no transaction is held while talking to the SMTP server
+        db.rollback()
+
+        error: Optional[Exception] = None
+        try:
+            connection.send(
+                build_email_message(row.to_email, row.subject, row.body, row.message_id, row.in_reply_to)
+            )
+        except Exception as e:
+            error = e
+
+        if error is None:
+            values: Dict[str, Any] = {"status": OutboundEmailStatus.Sent, "sent_at": _utcnow(), "last_error": None}
+        elif row.attempts >= self.max_attempts or isinstance(error, ValueError):
+            logger.error("Giving up on outbound email %s after %s attempts: %s", outbound_id, row.attempts, error)
+            values = {"status": OutboundEmailStatus.Failed, "last_error": str(error)}
+        else:
+            logger.warning("Outbound email %s failed (attempt %s): %s", outbound_id, row.attempts, error)
+            values = {
+                "next_attempt_at": _utcnow() + timedelta(seconds=self.retry_delay(row.attempts)),
+                "last_error": str(error),
+            }
+        db.execute(update(OutboundEmail).where(OutboundEmail.id == outbound_id).values(**values))
+        db.commit()
+
+        with self._lock:
+            if error is None:
+                self.sent += 1
+            elif values.get("status") == OutboundEmailStatus.Failed:
+                self.failed += 1
+            else:
+                self.retried += 1
+        return error is None
+
+    def _run(self) -> None:
+        connection = self.connection_factory()
+        last_used = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                try:
+                    outbound_id = self._queue.get(timeout=0.5)
+                except queue.Empty:
+                    idle = time.monotonic() - last_used
+                    if getattr(connection, "connected", False) and idle > CONNECTION_IDLE_TIMEOUT:
+                        connection.close()
+                    continue
+
+                session = None
+                try:
+                    session = self.session_factory()
+                    self.deliver(session, outbound_id, connection)
+                except Exception as e:
+                    logger.error(e, exc_info=True)
+                    if session is not None:
+                        session.rollback()
+                finally:
+                    if session is not None:
+                        session.close()
+                    with self._lock:
+                        self._queued.discard(outbound_id)
+                    self._queue.task_done()
+                    last_used = time.monotonic()
+        finally:
+            connection.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "workers": sum(thread.is_alive() for thread in self._threads),
+                "queued": self._queue.qsize(),
+                "queue_size": self.queue_size,
+                "sent": self.sent,
+                "retried": self.retried,
+                "failed": self.failed,
+                "overflowed": self.overflowed,
+            }
+
+
+# Module-level outbox started by the application lifespan when EMAIL_OUTBOX_ENABLED
+mail_outbox = MailOutbox(
+    queue_size=config.EMAIL_OUTBOX_QUEUE_SIZE,
+    max_attempts=config.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    backoff_initial=config.EMAIL_OUTBOX_BACKOFF_INITIAL,
+    backoff_max=config.EMAIL_OUTBOX_BACKOFF_MAX,
+)
+
+
+def process_outbound_email_retries() -> None:
+    """Scheduled job: queue Pending emails that are due (retries and emails left by a restart)."""
+    if not mail_outbox.running:
+        return
+
+    session = None
+    try:
+        session = mail_outbox.session_factory()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return
+
+    try:
+        outbound_ids = session.execute(build_due_outbound_query(_utcnow(), mail_outbox.queue_size)).scalars().all()
+        queued = sum(mail_outbox.submit(outbound_id) for outbound_id in outbound_ids)
+        if queued:
+            logger.info("Queued %s outbound emails for delivery", queued)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+    finally:
+        try:
+            session.close()
+        except Exception as e:
+            logger.error(e, exc_info=True)
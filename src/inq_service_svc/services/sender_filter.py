@@ -0,0 +1,256 @@
+import logging
+import os
+import re
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from inq_service_svc import config
+from inq_service_svc.models import SenderFilterRule
+from inq_service_svc.models.enums import SenderFilterKind
+
+logger = logging.getLogger(__name__)
+
+Rule = Tuple[SenderFilterKind, str]
+
+# marks a trie node whose label path is a listed domain
+_END = ""
+
+_FILE_PREFIXES = {
+    "domain:": SenderFilterKind.Domain,
+    "address:": SenderFilterKind.Address,
+    "subject:": SenderFilterKind.Subject,
+    "header:": SenderFilterKind.Header,
+}
+
+
+def _domain_labels(domain: str) -> List[str]:
+    return [label for label in domain.strip().strip(".").lower().split(".") if label]
+
+
+class SenderFilter:
+    """Compiled set of rules deciding which incoming emails are skipped.
+
+    Domains live in a trie keyed by reversed labels (``mail.spam.example`` is looked up as
+    example -> spam -> mail), so a rule matches the domain and every subdomain and a lookup
+    costs O(labels) however many domains are listed. Addresses are an exact-match set.
+    Subject and per-header regular expressions are combined into one alternation per
+    target, so each message runs one regex search per target instead of one per rule.
+    Instances are immutable; reloading builds a new one.
+    """
+
+    def __init__(self, rules: Iterable[Rule] = ()) -> None:
+        self._domains: Dict[str, Any] = {}
+        self._addresses = set()
+        subject: List[str] = []
+        headers: Dict[str, List[str]] = {}
+        self.size = 0
+
+        for kind, pattern in rules:
+            pattern = (pattern or "").strip()
+            if not pattern:
+                continue
+            if kind == SenderFilterKind.Domain:
+                labels = _domain_labels(pattern)
+                if not labels:
+                    continue
+                node = self._domains
+                for label in reversed(labels):
+                    node = node.setdefault(label, {})
+                node[_END] = True
+            elif kind == SenderFilterKind.Address:
+                self._addresses.add(pattern.lower())
+            elif kind == SenderFilterKind.Subject:
+                if not _valid_regex(pattern):
+                    continue
+                subject.append(pattern)
+            elif kind == SenderFilterKind.Header:
+                name, _, regex = pattern.partition(":")
+                if not name.strip() or not _valid_regex(regex):
+                    logger.warning("Ignoring invalid header filter rule %r", pattern)
+                    continue
+                headers.setdefault(name.strip().lower(), []).append(regex)
+            else:
+                continue
+            self.size += 1
+
+        self._subject = _combine(subject)
+        self._headers = {name: _combine(patterns) for name, patterns in headers.items()}
+
+    def _domain_listed(self, domain: str) -> Optional[str]:
+        node = self._domains
+        matched: List[str] = []
+        for label in reversed(_domain_labels(domain)):
+            node = node.get(label)
+            if node is None:
+                return None
+            matched.append(label)
+            if _END in node:
+                return ".".join(reversed(matched))
+        return None
+
+    def match(
+        self,
+        address: str,
+        subject: Optional[str] = None,
+        headers: Optional[Mapping[str, Any]] = None,
+    ) -> Optional[str]:
+        """Return a description of the first rule that matches the email, or None."""
+        address = (address or "").strip().lower()
+        if address in self._addresses:
+            return f"address {address}"
+        if "@" in address:
+            listed = self._domain_listed(address.rsplit("@", 1)[1])
+            if listed is not None:
+                return f"domain {listed}"
+        if subject and self._subject is not None and _search(self._subject, subject):
+            return "subject rule"
+        if headers and self._headers:
+            for name, regex in self._headers.items():
+                values = headers.get(name) or ()
+                if isinstance(values, str):
+                    values = (values,)
+                if any(_search(regex, str(value)) for value in values):
+                    return f"header rule for {name}"
+        return None
+
+
+def _valid_regex(pattern: str) -> bool:
+    try:
+        re.compile(pattern)
+        return True
+    except re.error as e:
+        logger.warning("Ignoring invalid filter regex %r: %s", pattern, e)
+        return False
+
+
+def _combine(patterns: Sequence[str]) -> Optional[Any]:
+    if not patterns:
+        return None
+    try:
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    except re.error:
+        # e.g. global inline flags that are only valid at the start of a pattern
+        return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+
+
+def _search(regex: Any, text: str) -> bool:
+    if isinstance(regex, list):
+        return any(part.search(text) for part in regex)
+    return regex.search(text) is not None
+
+
+def parse_rule_lines(lines: Iterable[str]) -> List[Rule]:
+    """Parse rule file lines: ``domain:``, ``address:``, ``subject:`` or ``header:Name:`` prefixes.
+
+    Lines without a prefix are addresses when they contain "@", else domains. Blank lines
+    and lines starting with "#" are ignored.
+    """
+    rules: List[Rule] = []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        prefix = line.split(":", 1)[0].lower() + ":"
+        if ":" in line and prefix in _FILE_PREFIXES:
+            rules.append((_FILE_PREFIXES[prefix], line[len(prefix):].strip()))
+        elif "@" in line:
+            rules.append((SenderFilterKind.Address, line))
+        else:
+            rules.append((SenderFilterKind.Domain, line))
+    return rules
+
+
+def blacklist_rules(raw: str) -> List[Rule]:
+    """Rules for the comma-separated EMAIL_DOMAIN_BLACKLIST."""
+    return [(SenderFilterKind.Domain, part.strip()) for part in (raw or "").split(",") if part.strip()]
+
+
+class SenderFilterStore:
+    """Hold the compiled SenderFilter and rebuild it when one of its sources changes.
+
+    Sources are EMAIL_DOMAIN_BLACKLIST, the rule file EMAIL_SENDER_FILTER_FILE and the
+    sender_filter_rules table. ``get`` compares a cheap fingerprint (the setting, the file's
+    mtime and size, the table's row count and latest id/update) and only recompiles when it
+    changed, so edits take effect on the next ingestion run without a restart.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._filter = SenderFilter()
+        self._fingerprint: Optional[Tuple[Any, ...]] = None
+        self.reloads = 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self._filter = SenderFilter()
+            self._fingerprint = None
+            self.reloads = 0
+
+    def _file_state(self, path: str) -> Optional[Tuple[int, int]]:
+        if not path:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            logger.warning("Sender filter file %s is not readable: %s", path, e)
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _table_state(self, db: Optional[Session]) -> Optional[Tuple[Any, ...]]:
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                select(
+                    func.count(SenderFilterRule.id), func.max(SenderFilterRule.id), func.max(SenderFilterRule.updated_at)
+                )
+            ).one()
+            return tuple(row)
+        except Exception as e:
+            logger.error(e, exc_info=True)
+            db.rollback()
+            return None
+
+    def get(self, db: Optional[Session] = None) -> SenderFilter:
+        """Return the current filter, recompiling it first when a source changed."""
+        raw = getattr(config, "EMAIL_DOMAIN_BLACKLIST", "") or ""
+        path = getattr(config, "EMAIL_SENDER_FILTER_FILE", "") or ""
+        file_state = self._file_state(path)
+        table_state = self._table_state(db)
+        fingerprint = (raw, path, file_state, table_state)
+        with self._lock:
+            if fingerprint == self._fingerprint:
+                return self._filter
+
+        rules = blacklist_rules(raw)
+        # A source that could not be read leaves the fingerprint unset, so the next call retries
+        complete = True
+        if file_state is not None:
+            try:
+                with open(path, encoding="utf-8") as f:
+                    rules.extend(parse_rule_lines(f))
+            except OSError as e:
+                logger.error(e, exc_info=True)
+                complete = False
+        if table_state and table_state[0]:
+            try:
+                rules.extend(db.execute(select(SenderFilterRule.kind, SenderFilterRule.pattern)).all())
+            except Exception as e:
+                logger.error(e, exc_info=True)
+                db.rollback()
+                complete = False
+
+        compiled = SenderFilter(rules)
+        with self._lock:
+            self._filter = compiled
+            self._fingerprint = fingerprint if complete else None
+            self.reloads += 1
+        logger.info("Compiled %s sender filter rules", compiled.size)
+        return compiled
+
+
+# Module-level store used by email ingestion
+sender_filters = SenderFilterStore()
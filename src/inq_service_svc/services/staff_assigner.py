@@ -0,0 +1,182 @@
+import heapq
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from inq_service_svc.models import StaffWorkload, User
+from inq_service_svc.models.base import SessionLocal
+from inq_service_svc.models.enums import UserRole
+from inq_service_svc.models.workload import on_workload_commit
+
+logger = logging.getLogger(__name__)
+
+
+def build_staff_snapshot_query() -> Select:
+    """Build the query loading every user's role and active workload counter."""
+    return select(User.id, User.role, StaffWorkload.active_count).outerjoin(
+        StaffWorkload, StaffWorkload.user_id == User.id
+    )
+
+
+class StaffAssigner:
+    """In-memory min-heap of ``(active_count, user_id)`` over Staff users.
+
+    Picks the same user as build_workload_query (lowest count, ties broken by user id)
+    without a database round trip. Entries are invalidated lazily: a change pushes a new
+    entry and stale ones are discarded when they reach the top of the heap.
+
+    The state is seeded with ``load``, kept current from committed workload changes
+    (see models.workload.on_workload_commit) and replaced by ``load`` again on a
+    schedule, which also picks up changes made outside the ORM.
+
+    A transaction with uncommitted assignments picks from its own copy of the heap, kept
+    in its pending changes and invalidated the same lazy way.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counts: Dict[int, int] = {}
+        self._staff: Set[int] = set()
+        self._heap: List[Tuple[int, int]] = []
+        # a transaction's copy of the heap is rebuilt when the generation changed; users whose
+        # count dropped or who became Staff since the copy are pushed to it from _lowered
+        self._generation = 0
+        self._lowered: List[int] = []
+        self.ready = False
+
+    def load(self, db: Session) -> int:
+        """Replace the state with counters read from the database. Returns the Staff user count."""
+        rows = db.execute(build_staff_snapshot_query()).all()
+        counts = {user_id: active_count or 0 for user_id, _, active_count in rows}
+        staff = {user_id for user_id, role, _ in rows if role == UserRole.Staff}
+        heap = [(counts[user_id], user_id) for user_id in staff]
+        heapq.heapify(heap)
+        with self._lock:
+            self._counts = counts
+            self._staff = staff
+            self._heap = heap
+            self._new_generation()
+            self.ready = True
+        return len(staff)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counts = {}
+            self._staff = set()
+            self._heap = []
+            self._new_generation()
+            self.ready = False
+
+    def _new_generation(self) -> None:
+        self._generation += 1
+        self._lowered = []
+
+    def pick(self, pending: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """Return the Staff user id with the lowest active count, or None when there is none.
+
+        ``pending`` is the caller's transaction's PENDING_CHANGES_KEY entry: its deltas were
+        flushed but not yet committed (e.g. earlier inquiries of a batch) and are added to
+        the committed counts. The first such pick copies the heap into ``pending``; later ones
+        only push entries for the users in ``pending["changed"]`` and those whose count other
+        commits lowered, so a pick costs O(log n) amortized instead of a scan over all staff.
+        """
+        with self._lock:
+            heap = self._heap
+            while heap and not self._current(heap[0]):
+                heapq.heappop(heap)
+            if not pending or not pending["deltas"]:
+                return heap[0][1] if heap else None
+
+            deltas = pending["deltas"]
+            changed = pending.get("changed") or set()
+            if pending.get("heap_generation") != self._generation:
+                pending["heap"] = list(heap)
+                pending["heap_generation"] = self._generation
+                pending["heap_lowered"] = len(self._lowered)
+                changed = deltas
+            heap = pending["heap"]
+            # entries the copy lacks: this transaction's changes and counts lowered by other commits
+            for user_id in set(changed).union(self._lowered[pending["heap_lowered"]:]):
+                if user_id in self._staff:
+                    heapq.heappush(heap, (self._counts.get(user_id, 0) + deltas.get(user_id, 0), user_id))
+            pending["changed"] = set()
+            pending["heap_lowered"] = len(self._lowered)
+
+            while heap:
+                count, user_id = heap[0]
+                if user_id not in self._staff:
+                    heapq.heappop(heap)
+                    continue
+                current = self._counts.get(user_id, 0) + deltas.get(user_id, 0)
+                if count == current:
+                    return user_id
+                if count < current:
+                    # raised by a commit after the copy was taken
+                    heapq.heapreplace(heap, (current, user_id))
+                else:
+                    # superseded by an entry pushed when the count dropped
+                    heapq.heappop(heap)
+            return None
+
+    def _current(self, entry: Tuple[int, int]) -> bool:
+        count, user_id = entry
+        return user_id in self._staff and self._counts.get(user_id, 0) == count
+
+    def snapshot(self, pending: Optional[Dict[int, int]] = None) -> Dict[int, int]:
+        """Return ``{staff user id: active count}``, including the caller's ``pending`` deltas."""
+        with self._lock:
+            pending = pending or {}
+            return {user_id: self._counts.get(user_id, 0) + pending.get(user_id, 0) for user_id in self._staff}
+
+    def apply(self, deltas: Dict[int, int], staff_changes: Dict[int, bool]) -> None:
+        """Apply committed counter deltas and Staff membership changes."""
+        with self._lock:
+            if not self.ready:
+                return
+            for user_id, delta in deltas.items():
+                self._counts[user_id] = max(self._counts.get(user_id, 0) + delta, 0)
+            for user_id, is_staff in staff_changes.items():
+                if is_staff:
+                    self._staff.add(user_id)
+                else:
+                    self._staff.discard(user_id)
+            for user_id in set(deltas) | set(staff_changes):
+                if user_id in self._staff:
+                    heapq.heappush(self._heap, (self._counts.get(user_id, 0), user_id))
+            # transactions' heap copies repair entries that are too low when they reach the top,
+            # but need a new entry for a lower count or a new staff member
+            self._lowered.extend(user_id for user_id, delta in deltas.items() if delta < 0)
+            self._lowered.extend(user_id for user_id, is_staff in staff_changes.items() if is_staff)
+            # drop stale entries once they outnumber the live ones
+            if len(self._heap) > 2 * len(self._staff) + 16:
+                self._heap = [(self._counts.get(user_id, 0), user_id) for user_id in self._staff]
+                heapq.heapify(self._heap)
+                self._new_generation()
+
+
+staff_assigner = StaffAssigner()
+on_workload_commit(staff_assigner.apply)
+
+
+def process_staff_assigner_resync() -> None:
+    """Scheduled job: reload the in-memory assigner from the workload counters."""
+    session = None
+    try:
+        session = SessionLocal()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return
+
+    try:
+        staff_count = staff_assigner.load(session)
+        logger.debug("Staff assigner resynced with %s staff users", staff_count)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+    finally:
+        try:
+            session.close()
+        except Exception as e:
+            logger.error(e, exc_info=True)
@@ -0,0 +1,98 @@
+import logging
+from typing import Dict
+
+from sqlalchemy import Select, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from inq_service_svc.models import Inquiry, StaffWorkload, User
+from inq_service_svc.models.base import SessionLocal
+from inq_service_svc.models.enums import ACTIVE_INQUIRY_STATUSES
+from inq_service_svc.services.staff_assigner import staff_assigner
+
+logger = logging.getLogger(__name__)
+
+
+def build_workload_recount_query() -> Select:
+    """Build the GROUP BY counting active (New/On-Hold) inquiries per assignee."""
+    return (
+        select(Inquiry.assigned_user_id, func.count(Inquiry.id))
+        .where(
+            Inquiry.status.in_(ACTIVE_INQUIRY_STATUSES),
+            Inquiry.assigned_user_id != None,
+        )
+        .group_by(Inquiry.assigned_user_id)
+    )
+
+
+def reconcile_staff_workloads(db: Session) -> int:
+    """Recount active workloads from inquiries and correct drifted counters.
+
+    Counter rows are locked before recounting so increments committed concurrently are
+    either included in the recount or applied on top of the corrected value. Creates
+    missing rows, removes rows of deleted users and commits. Returns the number of
+    rows inserted, updated or deleted.
+    """
+    try:
+        stored: Dict[int, int] = {
+            user_id: count
+            for user_id, count in db.execute(
+                select(StaffWorkload.user_id, StaffWorkload.active_count).with_for_update()
+            ).all()
+        }
+        actual: Dict[int, int] = {user_id: count for user_id, count in db.execute(build_workload_recount_query()).all()}
+        user_ids = set(db.execute(select(User.id)).scalars().all())
+
+        changed = 0
+        for user_id in user_ids:
+            expected = actual.get(user_id, 0)
+            if user_id not in stored:
+                db.execute(insert(StaffWorkload).values(user_id=user_id, active_count=expected))
+                changed += 1
+            elif stored[user_id] != expected:
+                logger.warning(
+                    "Correcting workload for user %s: stored %s, actual %s", user_id, stored[user_id], expected
+                )
+                db.execute(
+                    update(StaffWorkload).where(StaffWorkload.user_id == user_id).values(active_count=expected)
+                )
+                changed += 1
+
+        orphaned = set(stored) - user_ids
+        if orphaned:
+            db.execute(delete(StaffWorkload).where(StaffWorkload.user_id.in_(orphaned)))
+            changed += len(orphaned)
+
+        db.commit()
+        return changed
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        try:
+            db.rollback()
+        except Exception as ex:
+            logger.error(ex, exc_info=True)
+        raise
+
+
+def process_workload_reconciliation() -> None:
+    """Scheduled job: reconcile staff workload counters using a fresh session."""
+    session = None
+    try:
+        session = SessionLocal()
+    except Exception as e:
+        logger.error(e, exc_info=True)
+        return
+
+    try:
+        changed = reconcile_staff_workloads(session)
+        if changed:
+            logger.info("Workload reconciliation corrected %s counter rows", changed)
+            # corrections are bulk updates the commit hooks do not see
+            if staff_assigner.ready:
+                staff_assigner.load(session)
+    except Exception as e:
+        logger.error(e, exc_info=True)
+    finally:
+        try:
+            session.close()
+        except Exception as e:
+            logger.error(e, exc_info=True)
@@ -1,18 +1,96 @@
 import logging
-from typing import List
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
 
-from imap_tools import MailBox, AND
+from imap_tools import MailBox, MailMessageFlags, AND, U
 import smtplib
 from email.message import EmailMessage
+from email.utils import make_msgid
 
 from inq_service_svc import config
 
 _logger = logging.getLogger(__name__)
 
 
-def fetch_emails(limit: int = 10, folder: str = "INBOX", only_unread: bool = True) -> List[object]:
-    """Fetch recent emails from the configured IMAP server.
+def open_mailbox(folder: str = "INBOX") -> MailBox:
+    """Connect and log in to the configured IMAP server with ``folder`` selected.
 
+    The caller owns the connection and must call ``logout()`` (or use it as a context manager).
+    """
+    # MailBox(host, port).login(user, password, initial_folder=...)
+    return MailBox(config.EMAIL_IMAP_SERVER, config.EMAIL_IMAP_PORT).login(
+        config.EMAIL_ACCOUNT, config.EMAIL_PASSWORD, initial_folder=folder
+    )
+
+
+@dataclass
+class UidWatermark:
+    """Highest IMAP UID already fetched from a folder, valid for one UIDVALIDITY."""
+
+    uid_validity: Optional[int] = None
+    last_uid: int = 0
+
+
+def _advance_watermark(mailbox: MailBox, folder: str, watermark: UidWatermark) -> None:
+    # UIDs are only comparable while the folder's UIDVALIDITY is unchanged
+    uid_validity = int(mailbox.folder.status(folder, ["UIDVALIDITY"])["UIDVALIDITY"])
+    if watermark.uid_validity != uid_validity:
+        if watermark.uid_validity is not None:
+            _logger.warning(
+                "UIDVALIDITY of %s changed from %s to %s; restarting from the first UID",
+                folder,
+                watermark.uid_validity,
+                uid_validity,
+            )
+        watermark.uid_validity = uid_validity
+        watermark.last_uid = 0
+
+
+def _fetch(
+    mailbox: MailBox,
+    limit: int,
+    only_unread: bool,
+    folder: str = "INBOX",
+    watermark: Optional[UidWatermark] = None,
+) -> List[object]:
+    criteria = {}
+    if only_unread:
+        criteria["seen"] = False
+    if watermark is not None:
+        _advance_watermark(mailbox, folder, watermark)
+        if watermark.last_uid:
+            criteria["uid"] = U(watermark.last_uid + 1, "*")
+
+    # bulk: fetch all bodies of the batch with a single FETCH command
+    # mark_seen=False: BODY.PEEK[] leaves \Seen unset until the caller stored the messages
+    if criteria:
+        messages = list(mailbox.fetch(AND(**criteria), limit=limit, mark_seen=False, bulk=True))
+    else:
+        messages = list(mailbox.fetch(limit=limit, mark_seen=False, bulk=True))
+
+    if watermark is not None:
+        # "UID n:*" also matches the newest message when its UID is below n
+        messages = [m for m in messages if int(m.uid) > watermark.last_uid]
+        if messages:
+            watermark.last_uid = max(int(m.uid) for m in messages)
+    return messages
+
+
+def fetch_emails(
+    limit: int = 10,
+    folder: str = "INBOX",
+    only_unread: bool = True,
+    mailbox: Optional[MailBox] = None,
+    watermark: Optional[UidWatermark] = None,
+) -> List[object]:
+    """Fetch recent emails from the configured IMAP server, oldest first.
+
+    Messages are not flagged as seen; call ``mark_emails_seen`` once they are stored.
+    Pass an already logged-in ``mailbox`` (e.g. the IDLE listener's connection) to reuse it;
+    otherwise a connection is opened for this call and closed afterwards.
+    With a ``watermark`` only messages with a UID above ``watermark.last_uid`` are searched,
+    and the watermark is updated in place to the folder's UIDVALIDITY and the highest UID
+    returned.
     Returns a list of message objects from imap-tools.
     Raises ValueError for invalid inputs and RuntimeError on failures.
     """
@@ -22,24 +100,58 @@ def fetch_emails(limit: int = 10, folder: str = "INBOX", only_unread: bool = Tru
         raise ValueError("folder must be a non-empty string")
 
     try:
-        # MailBox(host, port).login(user, password, initial_folder=...)
+        if mailbox is not None:
+            return _fetch(mailbox, limit, only_unread, folder, watermark)
         with MailBox(config.EMAIL_IMAP_SERVER, config.EMAIL_IMAP_PORT).login(
             config.EMAIL_ACCOUNT, config.EMAIL_PASSWORD, initial_folder=folder
         ) as mailbox:
-            if only_unread:
-                messages = list(mailbox.fetch(AND(seen=False), limit=limit))
-            else:
-                messages = list(mailbox.fetch(limit=limit))
-            return messages
+            return _fetch(mailbox, limit, only_unread, folder, watermark)
     except Exception as e:
         _logger.error(e, exc_info=True)
         raise RuntimeError("Failed to fetch emails") from e
 
 
-def send_email(to_email: str, subject: str, body: str) -> None:
-    """Send an email using configured SMTP server.
+def mark_emails_seen(uids: Iterable[str], folder: str = "INBOX", mailbox: Optional[MailBox] = None) -> None:
+    """Flag the messages with ``uids`` in ``folder`` as seen.
 
-    Validates inputs and raises ValueError on invalid input, RuntimeError on send failure.
+    ``mailbox`` is reused like in ``fetch_emails``. Does nothing for an empty ``uids``.
+    Raises RuntimeError on failures.
+    """
+    uids = [str(uid) for uid in uids]
+    if not uids:
+        return
+    try:
+        if mailbox is not None:
+            mailbox.flag(uids, MailMessageFlags.SEEN, True)
+            return
+        with MailBox(config.EMAIL_IMAP_SERVER, config.EMAIL_IMAP_PORT).login(
+            config.EMAIL_ACCOUNT, config.EMAIL_PASSWORD, initial_folder=folder
+        ) as mailbox:
+            mailbox.flag(uids, MailMessageFlags.SEEN, True)
+    except Exception as e:
+        _logger.error(e, exc_info=True)
+        raise RuntimeError("Failed to flag emails as seen") from e
+
+
+def new_message_id() -> str:
+    """Return a new RFC 5322 Message-ID on the configured account's domain."""
+    account = config.EMAIL_ACCOUNT or ""
+    domain = account.rsplit("@", 1)[-1] if "@" in account else None
+    return make_msgid(domain=domain)
+
+
+def build_email_message(
+    to_email: str,
+    subject: str,
+    body: str,
+    message_id: Optional[str] = None,
+    in_reply_to: Optional[str] = None,
+) -> EmailMessage:
+    """Build a plain-text message from the configured account.
+
+    ``message_id`` and ``in_reply_to`` set the threading headers so the recipient's reply
+    can be matched to the conversation (In-Reply-To and References both name
+    ``in_reply_to``). Raises ValueError on invalid input.
     """
     if not to_email:
         raise ValueError("to_email must be provided")
@@ -52,7 +164,27 @@ def send_email(to_email: str, subject: str, body: str) -> None:
     msg["From"] = config.EMAIL_ACCOUNT
     msg["To"] = to_email
     msg["Subject"] = subject
+    if message_id:
+        msg["Message-ID"] = message_id
+    if in_reply_to:
+        msg["In-Reply-To"] = in_reply_to
+        msg["References"] = in_reply_to
     msg.set_content(body)
+    return msg
+
+
+def send_email(
+    to_email: str,
+    subject: str,
+    body: str,
+    message_id: Optional[str] = None,
+    in_reply_to: Optional[str] = None,
+) -> None:
+    """Send an email using configured SMTP server.
+
+    Validates inputs and raises ValueError on invalid input, RuntimeError on send failure.
+    """
+    msg = build_email_message(to_email, subject, body, message_id, in_reply_to)
 
     try:
         with smtplib.SMTP(config.EMAIL_SMTP_SERVER, config.EMAIL_SMTP_PORT) as smtp:
@@ -62,3 +194,76 @@ def send_email(to_email: str, subject: str, body: str) -> None:
     except Exception as e:
         _logger.error(e, exc_info=True)
         raise RuntimeError("Failed to send email") from e
+
+
+class SmtpConnection:
+    """Authenticated SMTP connection reused across messages.
+
+    Connects, runs STARTTLS and logs in on the first ``send`` and keeps the session open
+    for the following ones. A connection the server dropped (idle timeout, restart) is
+    re-established once per message. Not thread-safe: use one instance per sender thread.
+    """
+
+    def __init__(
+        self,
+        host: Optional[str] = None,
+        port: Optional[int] = None,
+        account: Optional[str] = None,
+        password: Optional[str] = None,
+        starttls: bool = True,
+        timeout: float = 30.0,
+    ) -> None:
+        self.host = host or config.EMAIL_SMTP_SERVER
+        self.port = port or config.EMAIL_SMTP_PORT
+        self.account = account if account is not None else config.EMAIL_ACCOUNT
+        self.password = password if password is not None else config.EMAIL_PASSWORD
+        self.starttls = starttls
+        self.timeout = timeout
+        self.connects = 0
+        self._smtp: Optional[smtplib.SMTP] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._smtp is not None
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.account:
+                smtp.login(self.account, self.password)
+        except Exception:
+            smtp.close()
+            raise
+        self.connects += 1
+        return smtp
+
+    def send(self, msg: EmailMessage) -> None:
+        """Send ``msg`` on the open session, connecting first when needed."""
+        for attempt in range(2):
+            if self._smtp is None:
+                self._smtp = self._connect()
+            try:
+                self._smtp.send_message(msg)
+                return
+            except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+                # the session is still usable after a rejected message
+                raise
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                self.close()
+                if attempt:
+                    raise
+            except Exception:
+                self.close()
+                raise
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception as e:
+            _logger.debug("SMTP quit failed: %s", e)
+            smtp.close()
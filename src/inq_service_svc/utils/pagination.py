@@ -0,0 +1,30 @@
+import base64
+import json
+import logging
+from datetime import datetime
+from typing import Tuple
+
+_logger = logging.getLogger(__name__)
+
+
+def encode_cursor(created_at: datetime, item_id: int) -> str:
+    """Encode a (created_at, id) keyset position into an opaque URL-safe token."""
+    raw = json.dumps([created_at.isoformat(), int(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decode a token produced by encode_cursor.
+
+    Raises ValueError when the token is malformed.
+    """
+    if not isinstance(cursor, str) or not cursor:
+        raise ValueError("cursor must be a non-empty string")
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_raw, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_raw), int(item_id)
+    except Exception as e:
+        _logger.error(e, exc_info=True)
+        raise ValueError("Invalid cursor") from e
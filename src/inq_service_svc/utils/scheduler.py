@@ -8,18 +8,23 @@ _logger = logging.getLogger(__name__)
 
 _scheduler: Optional[AsyncIOScheduler] = None
 
+# A job whose previous run is still going is skipped instead of overlapped, and ticks missed
+# meanwhile are merged into one run.
+JOB_DEFAULTS = {"max_instances": 1, "coalesce": True}
+
 
 def init_scheduler() -> AsyncIOScheduler:
     """Initialize and start a module-level AsyncIOScheduler singleton.
 
-    Idempotent: repeated calls return the same started scheduler.
+    Idempotent: repeated calls return the same started scheduler. Jobs default to
+    JOB_DEFAULTS.
     """
     global _scheduler
     if _scheduler is not None:
         return _scheduler
 
     try:
-        _scheduler = AsyncIOScheduler()
+        _scheduler = AsyncIOScheduler(job_defaults=JOB_DEFAULTS)
         _scheduler.start()
         return _scheduler
     except Exception as e:
@@ -0,0 +1,354 @@
+import abc
+import asyncio
+import glob
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy.engine import make_url
+
+from inq_service_svc import config
+
+_logger = logging.getLogger(__name__)
+
+# called with each payload received from another process
+Relay = Callable[[str], None]
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more
+PG_NOTIFY_MAX_BYTES = 7999
+
+
+class LatencyStats:
+    """Thread-safe count, average and maximum of recorded durations (seconds)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.count = 0
+        self.seconds_total = 0.0
+        self.seconds_max = 0.0
+
+    def record(self, seconds: float) -> None:
+        seconds = max(seconds, 0.0)
+        with self._lock:
+            self.count += 1
+            self.seconds_total += seconds
+            self.seconds_max = max(self.seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "seconds_avg": self.seconds_total / self.count if self.count else 0.0,
+                "seconds_max": self.seconds_max,
+            }
+
+
+class Backplane(abc.ABC):
+    """Carries websocket events between the processes of one deployment.
+
+    ``publish`` sends an opaque text payload to the other processes; each of them passes it
+    to the ``relay`` given to ``start``. Delivery is best effort: an event lost in transit
+    is not retried, the same as a message dropped from a full send queue.
+    """
+
+    name = "none"
+
+    def __init__(self) -> None:
+        self._relay: Optional[Relay] = None
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+
+    async def start(self, relay: Relay) -> None:
+        self._relay = relay
+
+    async def stop(self) -> None:
+        self._relay = None
+
+    @abc.abstractmethod
+    async def publish(self, payload: str) -> None:
+        """Send ``payload`` to the other processes."""
+
+    def _receive(self, payload: str) -> None:
+        self.received += 1
+        if self._relay is None:
+            return
+        try:
+            self._relay(payload)
+        except Exception as e:
+            self.errors += 1
+            _logger.error(e, exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.name,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+class InProcessHub:
+    """Members of one in-process backplane, standing in for the processes of a deployment."""
+
+    def __init__(self) -> None:
+        self.members: List["InProcessBackplane"] = []
+
+
+class InProcessBackplane(Backplane):
+    """Backplane between ConnectionManagers of the same process (tests, single worker)."""
+
+    name = "memory"
+
+    def __init__(self, hub: Optional[InProcessHub] = None) -> None:
+        super().__init__()
+        self.hub = hub or InProcessHub()
+
+    async def start(self, relay: Relay) -> None:
+        await super().start(relay)
+        self.hub.members.append(self)
+
+    async def stop(self) -> None:
+        if self in self.hub.members:
+            self.hub.members.remove(self)
+        await super().stop()
+
+    async def publish(self, payload: str) -> None:
+        self.published += 1
+        for member in list(self.hub.members):
+            if member is not self:
+                member._receive(payload)
+
+
+class UnixSocketBackplane(Backplane):
+    """Backplane between processes on one host through Unix datagram sockets.
+
+    Every process binds ``<directory>/<pid>-<random>.sock`` and sends each event as one
+    datagram to the other sockets in the directory. The peer list is re-read at most every
+    ``refresh_interval`` seconds; sockets refusing datagrams belong to dead processes and
+    are removed. Sends never block: a datagram a peer has no buffer space for is dropped.
+    """
+
+    name = "unix"
+
+    def __init__(self, directory: str, refresh_interval: float = 1.0) -> None:
+        super().__init__()
+        self.directory = directory
+        self.refresh_interval = refresh_interval
+        self.path: Optional[str] = None
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._peers: List[str] = []
+        self._peers_read_at = 0.0
+
+    async def start(self, relay: Relay) -> None:
+        await super().start(relay)
+        os.makedirs(self.directory, exist_ok=True)
+        self.path = os.path.join(self.directory, f"{os.getpid()}-{uuid.uuid4().hex[:8]}.sock")
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(self.path)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    async def stop(self) -> None:
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                if self._loop is not None:
+                    self._loop.remove_reader(sock.fileno())
+            finally:
+                sock.close()
+        if self.path:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+        await super().stop()
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(262144)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                self.errors += 1
+                _logger.error(e, exc_info=True)
+                return
+            self._receive(data.decode("utf-8"))
+
+    def _peer_paths(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._peers_read_at >= self.refresh_interval:
+            self._peers = [path for path in glob.glob(os.path.join(self.directory, "*.sock")) if path != self.path]
+            self._peers_read_at = now
+        return self._peers
+
+    async def publish(self, payload: str) -> None:
+        if self._sock is None:
+            return
+        self.published += 1
+        data = payload.encode("utf-8")
+        for path in list(self._peer_paths()):
+            try:
+                self._sock.sendto(data, path)
+            except BlockingIOError:
+                self.dropped += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # the process owning the socket is gone
+                self._peers.remove(path)
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except OSError as e:
+                self.errors += 1
+                _logger.error(e, exc_info=True)
+
+
+class PostgresBackplane(Backplane):
+    """Backplane between processes on any host through PostgreSQL LISTEN/NOTIFY.
+
+    One asyncpg connection per process listens on ``channel`` and sends ``pg_notify``.
+    Payloads of 8000 bytes or more cannot be sent and are dropped (counted). A watcher task
+    reconnects and listens again as soon as the connection terminates, and checks it every
+    ``health_interval`` seconds for drops asyncpg does not notice; events notified while
+    the connection is down are missed.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str = "inq_ws_events", health_interval: float = 30.0) -> None:
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self.health_interval = health_interval
+        self.reconnects = 0
+        self._conn = None
+        self._lock = asyncio.Lock()
+        self._lost = asyncio.Event()
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def _connect(self):
+        import asyncpg
+
+        conn = await asyncpg.connect(self.dsn)
+        await conn.add_listener(self.channel, self._on_notify)
+        conn.add_termination_listener(self._on_terminated)
+        self._conn = conn
+        return conn
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self._receive(payload)
+
+    def _on_terminated(self, connection) -> None:
+        if connection is self._conn:
+            self._lost.set()
+
+    async def _healthy(self) -> bool:
+        conn = self._conn
+        if conn is None or conn.is_closed():
+            return False
+        try:
+            await conn.execute("SELECT 1", timeout=self.health_interval)
+            return True
+        except Exception as e:
+            _logger.warning("Websocket backplane connection failed its health check: %s", e)
+            return False
+
+    async def _watch(self) -> None:
+        """Keep the LISTEN connection alive; a process that never publishes relies on it alone."""
+        while True:
+            try:
+                await asyncio.wait_for(self._lost.wait(), self.health_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._lost.clear()
+            # one asyncpg connection runs one statement at a time
+            async with self._lock:
+                if await self._healthy():
+                    continue
+                old, self._conn = self._conn, None
+                if old is not None:
+                    old.terminate()
+                try:
+                    await self._connect()
+                    self.reconnects += 1
+                    _logger.info("Websocket backplane listening on %s again", self.channel)
+                except Exception as e:
+                    # retried after the next health_interval
+                    self.errors += 1
+                    _logger.error(e, exc_info=True)
+
+    async def start(self, relay: Relay) -> None:
+        await super().start(relay)
+        await self._connect()
+        self._watcher = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self) -> None:
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.cancel()
+            try:
+                await watcher
+            except asyncio.CancelledError:
+                pass
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                await conn.close()
+            except Exception as e:
+                _logger.error(e, exc_info=True)
+        await super().stop()
+
+    async def publish(self, payload: str) -> None:
+        if len(payload.encode("utf-8")) > PG_NOTIFY_MAX_BYTES:
+            self.dropped += 1
+            _logger.warning("Websocket event of %s characters is too large for NOTIFY", len(payload))
+            return
+        # one asyncpg connection runs one statement at a time
+        async with self._lock:
+            try:
+                conn = self._conn
+                if conn is None or conn.is_closed():
+                    conn = await self._connect()
+                await conn.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                self.published += 1
+            except Exception as e:
+                self.errors += 1
+                _logger.error(e, exc_info=True)
+                self._conn = None
+                self._lost.set()
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats["reconnects"] = self.reconnects
+        return stats
+
+
+def postgres_dsn(url: str) -> str:
+    """Return a libpq/asyncpg DSN for a SQLAlchemy PostgreSQL URL (driver suffix removed)."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+def build_backplane(kind: Optional[str] = None) -> Optional[Backplane]:
+    """Create the backplane selected by WS_BACKPLANE, or None for a single process."""
+    kind = (config.WS_BACKPLANE if kind is None else kind).strip().lower()
+    if kind in ("", "none"):
+        return None
+    if kind == "memory":
+        return InProcessBackplane()
+    if kind == "unix":
+        return UnixSocketBackplane(config.WS_BACKPLANE_UNIX_DIR)
+    if kind == "postgres":
+        return PostgresBackplane(config.WS_BACKPLANE_DSN or postgres_dsn(config.DATABASE_URL), config.WS_BACKPLANE_CHANNEL)
+    _logger.error("Unknown WS_BACKPLANE %r; websocket events stay in this process", kind)
+    return None
@@ -1,54 +1,532 @@
+import asyncio
+import json
 import logging
-from typing import Set
+import re
+import time
+import uuid
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
+from fastapi import status
 from fastapi.websockets import WebSocket
 
+from inq_service_svc import config
+from inq_service_svc.models.enums import InquiryStatus, UserRole
+from inq_service_svc.utils.websocket_backplane import Backplane, LatencyStats
+
 _logger = logging.getLogger(__name__)
 
+# topic every event is published to, for clients that want everything
+ALL_TOPIC = "all"
+
+_TOPIC_PATTERN = re.compile(r"^(all|inquiry:\d+|assignee:\d+)$")
+# status topics carry the status value as published (status:On-Hold, not the member name)
+_STATUS_TOPICS = frozenset(f"status:{member.value}" for member in InquiryStatus)
+
+# what a full send queue does with a new message
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+DISCONNECT = "disconnect"
+QUEUE_POLICIES = (DROP_OLDEST, COALESCE, DISCONNECT)
+
+
+def parse_topics(topics: Iterable[str]) -> List[str]:
+    """Validate topic names: ``all``, ``inquiry:{id}``, ``assignee:{user_id}`` or ``status:{status}``.
+
+    Raises ValueError naming the first invalid topic.
+    """
+    parsed: List[str] = []
+    for topic in topics:
+        topic = str(topic).strip()
+        if not _TOPIC_PATTERN.match(topic) and topic not in _STATUS_TOPICS:
+            raise ValueError(f"Invalid topic: {topic!r}")
+        parsed.append(topic)
+    return parsed
+
+
+def inquiry_topics(
+    inquiry_id: int,
+    statuses: Iterable[Optional[str]] = (),
+    assignees: Iterable[Optional[int]] = (),
+) -> List[str]:
+    """Topics of an event about an inquiry, its (old and new) statuses and assignees."""
+    topics = [f"inquiry:{inquiry_id}"]
+    topics.extend(f"status:{value}" for value in statuses if value)
+    topics.extend(f"assignee:{value}" for value in assignees if value is not None)
+    return topics
+
+
+class _Item:
+    """A queued message; its text is shared by every connection the event goes to."""
+
+    __slots__ = ("key", "message", "queued_at", "batchable")
+
+    def __init__(self, key: Optional[str], message: str, batchable: bool) -> None:
+        self.key = key
+        self.message = message
+        self.queued_at = time.perf_counter()
+        # events (JSON) may share an array frame; replies are sent on their own
+        self.batchable = batchable
+
+
+class _Client:
+    """Send queue of one connection, drained by its own writer task."""
+
+    def __init__(self, websocket: WebSocket, user_id: Optional[int] = None, role: Optional[str] = None) -> None:
+        self.websocket = websocket
+        # authenticated user of the connection (None when connected without one)
+        self.user_id = user_id
+        self.role = role
+        self.queue: Deque[_Item] = deque()
+        # queued items by coalesce key, to replace an unsent event in O(1)
+        self.pending: Dict[str, _Item] = {}
+        self.wakeup = asyncio.Event()
+        # set while nothing is queued or being sent
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.writer: Optional[asyncio.Task] = None
+
 
 class ConnectionManager:
-    """Manage active WebSocket connections and broadcast messages.
+    """Manage active WebSocket connections and deliver messages to topic subscribers.
 
-    Stores connections in an in-memory set. Methods are safe and log exceptions.
+    Stores connections in an in-memory set and, for routing, a topic -> connections index
+    (with the reverse index for cleanup on disconnect). ``publish`` only touches the
+    subscribers of the event's topics, so its cost grows with the number of interested
+    clients rather than with every open dashboard. ``broadcast`` still sends to all
+    connections.
+
+    Sending never waits on a client: each connection has a send queue of at most
+    ``queue_size`` messages drained by its own writer task, and ``publish``/``broadcast``
+    only append to the queues. A slow client therefore delays nobody but itself. When its
+    queue is full, ``policy`` decides: ``drop_oldest`` discards the oldest queued message,
+    ``coalesce`` replaces a queued message with the same key (e.g. an older update of the
+    same inquiry) and otherwise drops the oldest, ``disconnect`` evicts the client. A send
+    taking longer than ``send_timeout`` seconds evicts the client too. Evicted clients are
+    closed with code 1013 (try again later) and are expected to reconnect and reload.
+
+    With a ``coalesce_window`` (seconds), a writer holds an event for up to the window and
+    sends everything queued by then, at most ``batch_max`` events, as one JSON array frame.
+    While an event waits, a newer one with the same key replaces it, so a burst of updates to
+    one inquiry reaches the client as its latest state. Events are JSON texts serialized once
+    by the publisher; a frame only joins them.
+
+    Connections are also indexed by their user's id and role. An event published with an
+    ``audience`` (the users an assignment change concerns) goes to every connection of those
+    users and to Admin connections subscribed to its topics, and to nobody else. A non-admin
+    user may only subscribe to their own ``assignee:`` topic.
+
+    With several worker processes, ``start_backplane`` connects the manager to the others:
+    each event is delivered to the local connections and published once on the backplane,
+    and events received from other processes are delivered to the local connections.
+    Latency is recorded per hop: ``publish`` (sending to the backplane), ``transport``
+    (origin publish to receipt, across wall clocks), ``relay`` (queueing a received event
+    locally) and ``send`` (queued to written to the socket).
+    Methods are safe and log exceptions.
     """
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        default_topics: Iterable[str] = (ALL_TOPIC,),
+        max_subscriptions: int = 100,
+        queue_size: int = 100,
+        policy: str = DROP_OLDEST,
+        send_timeout: float = 10.0,
+        coalesce_window: float = 0.0,
+        batch_max: int = 50,
+    ) -> None:
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown websocket queue policy {policy!r}; expected one of {QUEUE_POLICIES}")
         self.active_connections: Set[WebSocket] = set()
+        self.default_topics = parse_topics(default_topics)
+        self.max_subscriptions = max_subscriptions
+        self.queue_size = max(queue_size, 1)
+        self.policy = policy
+        self.send_timeout = send_timeout
+        self.coalesce_window = max(coalesce_window, 0.0)
+        self.batch_max = max(batch_max, 1)
+        self.topics: Dict[str, Set[WebSocket]] = {}
+        self.subscriptions: Dict[WebSocket, Set[str]] = {}
+        self._clients: Dict[WebSocket, _Client] = {}
+        self.users: Dict[int, Set[WebSocket]] = {}
+        self.roles: Dict[str, Set[WebSocket]] = {}
+        self._closing: Set[asyncio.Task] = set()
+        self.sent = 0
+        self.frames = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.collapsed = 0
+        self.evicted = 0
+        self.send_errors = 0
+        self.max_queue_depth = 0
+        # identifies this process's events on the backplane
+        self.origin = uuid.uuid4().hex
+        self.backplane: Optional[Backplane] = None
+        self.latency: Dict[str, LatencyStats] = {
+            hop: LatencyStats() for hop in ("publish", "transport", "relay", "send")
+        }
 
-    async def connect(self, websocket: WebSocket) -> None:
-        """Accept an incoming websocket connection and track it."""
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Optional[Iterable[str]] = None,
+        user_id: Optional[int] = None,
+        role: Optional[str] = None,
+    ) -> None:
+        """Accept an incoming websocket connection of user ``user_id``, track it and start its writer task.
+
+        The connection is subscribed to ``topics``, or the manager's default topics when None.
+        Invalid or forbidden topics raise ValueError before the connection is accepted.
+        """
+        initial = set(parse_topics(self.default_topics if topics is None else topics))
+        if len(initial) > self.max_subscriptions:
+            raise ValueError(f"At most {self.max_subscriptions} subscriptions per connection")
+        _check_allowed(user_id, role, initial)
         try:
             await websocket.accept()
             # Use add; websocket objects must be hashable in typical FastAPI usage
             self.active_connections.add(websocket)
+            client = _Client(websocket, user_id, role)
+            client.writer = asyncio.get_running_loop().create_task(self._write(client))
+            self._clients[websocket] = client
+            if user_id is not None:
+                self.users.setdefault(user_id, set()).add(websocket)
+            if role is not None:
+                self.roles.setdefault(role, set()).add(websocket)
+            self.subscriptions[websocket] = set()
+            self.subscribe(websocket, initial)
         except Exception as e:
             _logger.error(e, exc_info=True)
             raise
 
     def disconnect(self, websocket: WebSocket) -> None:
-        """Remove a websocket connection from tracking. No-op if not present."""
+        """Stop tracking a websocket connection: subscriptions, queue and writer. No-op if not present."""
         # set.discard does not raise; keep implementation simple
         self.active_connections.discard(websocket)
+        for topic in self.subscriptions.pop(websocket, ()):
+            self._drop(topic, websocket)
+        client = self._clients.pop(websocket, None)
+        if client is None:
+            return
+        _discard(self.users, client.user_id, websocket)
+        _discard(self.roles, client.role, websocket)
+        client.queue.clear()
+        client.pending.clear()
+        client.idle.set()
+        try:
+            current = asyncio.current_task()
+        except RuntimeError:
+            current = None
+        if client.writer is not None and client.writer is not current:
+            client.writer.cancel()
 
-    async def broadcast(self, message: str) -> None:
-        """Send text message to all active connections.
+    def _drop(self, topic: str, websocket: WebSocket) -> None:
+        _discard(self.topics, topic, websocket)
 
-        On individual send failures, log details and remove the failing connection.
+    def subscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Set[str]:
+        """Subscribe a tracked connection to topics; returns its subscriptions afterwards.
+
+        Raises ValueError for an invalid or forbidden topic or when the subscription limit would
+        be exceeded.
         """
-        to_remove = []
-        for ws in list(self.active_connections):
-            try:
-                await ws.send_text(message)
-            except Exception as e:
-                _logger.error(e, exc_info=True)
-                to_remove.append(ws)
+        current = self.subscriptions.get(websocket)
+        client = self._clients.get(websocket)
+        if current is None or client is None:
+            raise ValueError("Connection is not active")
+        new = set(parse_topics(topics)) - current
+        if len(current) + len(new) > self.max_subscriptions:
+            raise ValueError(f"At most {self.max_subscriptions} subscriptions per connection")
+        _check_allowed(client.user_id, client.role, new)
+        for topic in new:
+            self.topics.setdefault(topic, set()).add(websocket)
+        current.update(new)
+        return set(current)
+
+    def unsubscribe(self, websocket: WebSocket, topics: Iterable[str]) -> Set[str]:
+        """Unsubscribe a tracked connection from topics; returns its subscriptions afterwards."""
+        current = self.subscriptions.get(websocket)
+        if current is None:
+            return set()
+        for topic in parse_topics(topics):
+            if topic in current:
+                current.discard(topic)
+                self._drop(topic, websocket)
+        return set(current)
+
+    def subscribers(self, topics: Iterable[str]) -> Set[WebSocket]:
+        """Connections subscribed to ``all`` or to any of ``topics``."""
+        recipients = set(self.topics.get(ALL_TOPIC, ()))
+        for topic in topics:
+            subscribers = self.topics.get(topic)
+            if subscribers:
+                recipients.update(subscribers)
+        return recipients
+
+    def _enqueue(self, client: _Client, message: str, key: Optional[str], batchable: bool = True) -> None:
+        queue = client.queue
+        queued = client.pending.get(key) if key is not None else None
+        if queued is not None and self.coalesce_window > 0:
+            # the client gets the latest state in the queued event's place
+            queued.message = message
+            self.collapsed += 1
+            return
+        if len(queue) >= self.queue_size:
+            if self.policy == DISCONNECT:
+                _logger.warning("Evicting websocket client: send queue full (%s messages)", len(queue))
+                self._evict(client)
+                return
+            if self.policy == COALESCE and queued is not None:
+                queued.message = message
+                queued.queued_at = time.perf_counter()
+                self.coalesced += 1
+                return
+            _forget(client, queue.popleft())
+            self.dropped += 1
+        item = _Item(key, message, batchable)
+        queue.append(item)
+        if key is not None:
+            client.pending[key] = item
+        if len(queue) > self.max_queue_depth:
+            self.max_queue_depth = len(queue)
+        client.idle.clear()
+        client.wakeup.set()
+
+    def _next_frame(self, client: _Client) -> Tuple[str, int, float]:
+        """Take the next frame off the queue: (text, events in it, when its oldest was queued)."""
+        queue = client.queue
+        item = queue.popleft()
+        _forget(client, item)
+        if not item.batchable or self.coalesce_window <= 0:
+            return item.message, 1, item.queued_at
+        messages = [item.message]
+        while queue and queue[0].batchable and len(messages) < self.batch_max:
+            following = queue.popleft()
+            _forget(client, following)
+            messages.append(following.message)
+        if len(messages) == 1:
+            return messages[0], 1, item.queued_at
+        return "[" + ",".join(messages) + "]", len(messages), item.queued_at
 
-        for ws in to_remove:
+    async def _write(self, client: _Client) -> None:
+        websocket = client.websocket
+        while True:
+            if not client.queue:
+                client.idle.set()
+                client.wakeup.clear()
+                await client.wakeup.wait()
+                continue
+            head = client.queue[0]
+            if head.batchable and self.coalesce_window > 0:
+                # let the rest of a burst join the frame
+                delay = head.queued_at + self.coalesce_window - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+            frame, events, queued_at = self._next_frame(client)
             try:
-                self.disconnect(ws)
+                if self.send_timeout > 0:
+                    await asyncio.wait_for(websocket.send_text(frame), self.send_timeout)
+                else:
+                    await websocket.send_text(frame)
+                self.sent += events
+                self.frames += 1
+                self.latency["send"].record(time.perf_counter() - queued_at)
+            except asyncio.TimeoutError:
+                _logger.warning("Evicting websocket client: send took longer than %ss", self.send_timeout)
+                self._evict(client)
+                return
             except Exception as e:
                 _logger.error(e, exc_info=True)
+                self.send_errors += 1
+                self.disconnect(websocket)
+                return
+
+    def _evict(self, client: _Client) -> None:
+        self.evicted += 1
+        self.disconnect(client.websocket)
+        task = asyncio.get_running_loop().create_task(self._close(client.websocket))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket) -> None:
+        timeout = self.send_timeout if self.send_timeout > 0 else None
+        try:
+            await asyncio.wait_for(websocket.close(code=status.WS_1013_TRY_AGAIN_LATER), timeout)
+        except Exception as e:
+            _logger.debug("Closing evicted websocket failed: %s", e)
+
+    def recipients(self, topics: Optional[Iterable[str]], audience: Optional[Iterable[int]] = None) -> Set[WebSocket]:
+        """Connections an event goes to.
+
+        Topic subscribers (every connection for ``topics=None``); with an ``audience``, the
+        connections of those users plus the Admin connections among the subscribers.
+        """
+        subscribed = set(self._clients) if topics is None else self.subscribers(topics)
+        if audience is None:
+            return subscribed
+        recipients = subscribed & self.roles.get(UserRole.Admin.value, set())
+        for user_id in audience:
+            recipients.update(self.users.get(user_id, ()))
+        return recipients
+
+    def _fanout(
+        self, topics: Optional[List[str]], message: str, key: Optional[str], audience: Optional[List[int]] = None
+    ) -> None:
+        for websocket in self.recipients(topics, audience):
+            client = self._clients.get(websocket)
+            if client is not None:
+                self._enqueue(client, message, key)
+
+    async def _publish_remote(
+        self, topics: Optional[List[str]], message: str, key: Optional[str], audience: Optional[List[int]] = None
+    ) -> None:
+        backplane = self.backplane
+        if backplane is None:
+            return
+        envelope = json.dumps(
+            {
+                "origin": self.origin,
+                "sent_at": time.time(),
+                "topics": topics,
+                "key": key,
+                "audience": audience,
+                "message": message,
+            }
+        )
+        started = time.perf_counter()
+        try:
+            await backplane.publish(envelope)
+        except Exception as e:
+            backplane.errors += 1
+            _logger.error(e, exc_info=True)
+            return
+        self.latency["publish"].record(time.perf_counter() - started)
+
+    def _relay(self, payload: str) -> None:
+        """Deliver an event received on the backplane to the local connections."""
+        envelope = json.loads(payload)
+        if envelope.get("origin") == self.origin:
+            return
+        self.latency["transport"].record(time.time() - float(envelope.get("sent_at") or 0.0))
+        started = time.perf_counter()
+        self._fanout(envelope.get("topics"), envelope["message"], envelope.get("key"), envelope.get("audience"))
+        self.latency["relay"].record(time.perf_counter() - started)
+
+    async def start_backplane(self, backplane: Backplane) -> None:
+        """Exchange events with the other processes through ``backplane``."""
+        await backplane.start(self._relay)
+        self.backplane = backplane
+
+    async def stop_backplane(self) -> None:
+        backplane, self.backplane = self.backplane, None
+        if backplane is not None:
+            await backplane.stop()
+
+    async def send(self, websocket: WebSocket, message: str, key: Optional[str] = None) -> None:
+        """Queue a message for one connection (e.g. a reply), behind what is already queued for it."""
+        client = self._clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, message, key, batchable=False)
+
+    async def publish(
+        self,
+        topics: Iterable[str],
+        message: str,
+        key: Optional[str] = None,
+        audience: Optional[Iterable[Optional[int]]] = None,
+    ) -> None:
+        """Queue text message for the subscribers of ``topics`` (and of ``all``), once each.
+
+        With ``audience`` (user ids; None entries are ignored) only those users' connections
+        and subscribed Admin connections get it. ``key`` identifies messages superseding each
+        other (same event about the same inquiry) for the ``coalesce`` policy. Sends happen in
+        the connections' writer tasks; a failing connection is logged and removed there. With
+        a backplane the event also goes to the other processes' connections.
+        """
+        topics = list(topics)
+        if audience is not None:
+            audience = sorted({user_id for user_id in audience if user_id is not None})
+        self._fanout(topics, message, key, audience)
+        await self._publish_remote(topics, message, key, audience)
+
+    async def broadcast(self, message: str) -> None:
+        """Queue text message for all active connections (of every process), whatever they subscribed to."""
+        self._fanout(None, message, None)
+        await self._publish_remote(None, message, None)
+
+    async def drain(self) -> None:
+        """Wait until every connection's queue is sent (or the connection is gone)."""
+        await asyncio.gather(*(client.idle.wait() for client in list(self._clients.values())))
+
+    def stats(self) -> Dict[str, Any]:
+        depths = [len(client.queue) for client in self._clients.values()]
+        return {
+            "connections": len(self._clients),
+            "users": len(self.users),
+            "topics": len(self.topics),
+            "policy": self.policy,
+            "queue_size": self.queue_size,
+            "queued": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_depth_peak": self.max_queue_depth,
+            "coalesce_window": self.coalesce_window,
+            "sent": self.sent,
+            "frames": self.frames,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "collapsed": self.collapsed,
+            "evicted": self.evicted,
+            "send_errors": self.send_errors,
+            "latency": {hop: stats.snapshot() for hop, stats in self.latency.items()},
+            "backplane": self.backplane.stats() if self.backplane is not None else None,
+        }
+
+
+def _forget(client: _Client, item: _Item) -> None:
+    if item.key is not None and client.pending.get(item.key) is item:
+        del client.pending[item.key]
+
+
+def _discard(index: Dict[Any, Set[WebSocket]], name: Any, websocket: WebSocket) -> None:
+    members = index.get(name)
+    if members is None:
+        return
+    members.discard(websocket)
+    if not members:
+        del index[name]
+
+
+def _check_allowed(user_id: Optional[int], role: Optional[str], topics: Iterable[str]) -> None:
+    """Raise ValueError when a non-admin user asks for another user's ``assignee:`` topic."""
+    if user_id is None or role == UserRole.Admin.value:
+        return
+    for topic in topics:
+        if topic.startswith("assignee:") and topic != f"assignee:{user_id}":
+            raise ValueError(f"Not allowed to subscribe to {topic}")
+
+
+def _default_topics() -> List[str]:
+    try:
+        return parse_topics(topic for topic in config.WS_DEFAULT_TOPICS.split(",") if topic.strip())
+    except ValueError as e:
+        _logger.error(e, exc_info=True)
+        return [ALL_TOPIC]
+
+
+def _queue_policy() -> str:
+    if config.WS_QUEUE_POLICY in QUEUE_POLICIES:
+        return config.WS_QUEUE_POLICY
+    _logger.error("Unknown WS_QUEUE_POLICY %r; using %s", config.WS_QUEUE_POLICY, DROP_OLDEST)
+    return DROP_OLDEST
 
 
-# Module-level singleton manager used by routers to broadcast events
-manager = ConnectionManager()
+# Module-level singleton manager used by routers to publish events
+manager = ConnectionManager(
+    default_topics=_default_topics(),
+    max_subscriptions=config.WS_MAX_SUBSCRIPTIONS,
+    queue_size=config.WS_SEND_QUEUE_SIZE,
+    policy=_queue_policy(),
+    send_timeout=config.WS_SEND_TIMEOUT,
+    coalesce_window=config.WS_COALESCE_WINDOW_MS / 1000.0,
+    batch_max=config.WS_BATCH_MAX_EVENTS,
+)
@@ -1,10 +1,14 @@
+import aiosqlite
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import StaticPool, create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from inq_service_svc.app import app
-from inq_service_svc.models.base import Base, get_db
+from inq_service_svc.models.base import Base, get_db, get_async_db
+from inq_service_svc.services.classification_cache import classification_cache
+from inq_service_svc.services.email_dedup import ingested_message_filter
 
 
 # DO NOT MODIFY SECTION START
@@ -39,4 +43,62 @@ def client(session_local):
     with TestClient(app) as c:
         yield c
     app.dependency_overrides[get_db] = get_db
-# DO NOT MODIFY SECTION END
\ No newline at end of file
+# DO NOT MODIFY SECTION END
+
+
+@pytest.fixture
+def async_session_local(session_local):
+    """aiosqlite-backed async_sessionmaker over the sync fixture's in-memory database.
+
+    The in-memory database only exists on the StaticPool's single sqlite3 connection, so
+    the aiosqlite driver is handed that same connection instead of opening a new one.
+    """
+    sync_engine = session_local.kw["bind"]
+    with sync_engine.connect() as conn:
+        sqlite_conn = conn.connection.driver_connection
+
+    async def creator():
+        return await aiosqlite.Connection(lambda: sqlite_conn, 64)
+
+    async_engine = create_async_engine("sqlite+aiosqlite://", async_creator=creator, poolclass=StaticPool)
+    return async_sessionmaker(bind=async_engine, expire_on_commit=False)
+
+
+@pytest.fixture(autouse=True)
+def async_db_override(request):
+    """Route get_async_db to the same test database used by the client fixture."""
+    if "client" not in request.fixturenames:
+        yield
+        return
+
+    async_session_local = request.getfixturevalue("async_session_local")
+
+    async def override_async_session():
+        async with async_session_local() as session:
+            yield session
+
+    app.dependency_overrides[get_async_db] = override_async_session
+    yield
+    app.dependency_overrides.pop(get_async_db, None)
+
+
+@pytest.fixture
+def anyio_backend():
+    # the service runs on asyncio only (AsyncIOScheduler, aiosqlite)
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def clear_classification_cache():
+    # cached results from one test must not answer another test's classifier mock
+    classification_cache.clear()
+    yield
+    classification_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_ingested_message_filter():
+    # the dedup filter is seeded from whichever database the first test used
+    ingested_message_filter.reset()
+    yield
+    ingested_message_filter.reset()
@@ -49,37 +49,45 @@ def test_login_failure_returns_401(client, db_session):
     assert resp.status_code == 401
 
 
-def test_get_current_user_valid_token_returns_user(db_session):
+@pytest.mark.anyio
+async def test_get_current_user_valid_token_returns_user(db_session, async_session_local):
     email = "dep@example.com"
     user = create_user(db_session, email, "pw123")
 
     token = security.create_access_token({"sub": user.email}, expires_delta=timedelta(minutes=5))
     # call dependency function directly
-    result = get_current_user(token=token, db=db_session)
+    async with async_session_local() as db:
+        result = await get_current_user(token=token, db=db)
     assert result.email == email
 
 
-def test_get_current_user_invalid_token_raises_401(db_session):
-    with pytest.raises(HTTPException) as excinfo:
-        get_current_user(token="not-a-token", db=db_session)
+@pytest.mark.anyio
+async def test_get_current_user_invalid_token_raises_401(async_session_local):
+    async with async_session_local() as db:
+        with pytest.raises(HTTPException) as excinfo:
+            await get_current_user(token="not-a-token", db=db)
     assert excinfo.value.status_code == 401
 
 
-def test_get_current_user_expired_token_raises_401(db_session):
+@pytest.mark.anyio
+async def test_get_current_user_expired_token_raises_401(db_session, async_session_local):
     email = "exp@example.com"
     user = create_user(db_session, email, "pw123")
 
     token = security.create_access_token({"sub": user.email}, expires_delta=timedelta(seconds=-1))
-    with pytest.raises(HTTPException) as excinfo:
-        get_current_user(token=token, db=db_session)
+    async with async_session_local() as db:
+        with pytest.raises(HTTPException) as excinfo:
+            await get_current_user(token=token, db=db)
     assert excinfo.value.status_code == 401
 
 
-def test_get_current_user_missing_email_claim_raises_401(db_session):
+@pytest.mark.anyio
+async def test_get_current_user_missing_email_claim_raises_401(db_session, async_session_local):
     email = "no-sub@example.com"
     create_user(db_session, email, "pw123")
 
     token = security.create_access_token({"foo": "bar"}, expires_delta=timedelta(minutes=5))
-    with pytest.raises(HTTPException) as excinfo:
-        get_current_user(token=token, db=db_session)
+    async with async_session_local() as db:
+        with pytest.raises(HTTPException) as excinfo:
+            await get_current_user(token=token, db=db)
     assert excinfo.value.status_code == 401
@@ -55,8 +55,8 @@ def test_create_inquiry_success_persists_and_returns(client, db_session):
         patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
         mock_classify.return_value = ClassificationResult(category="Billing", urgency="High")
         mock_assign.return_value = 1
-        # ensure broadcast is an async mock so background tasks don't error
-        mock_manager.broadcast = AsyncMock()
+        # ensure publish is an async mock so background tasks don't error
+        mock_manager.publish = AsyncMock()
 
         resp = client.post("/api/inquiries/", json=VALID_PAYLOAD)
         assert resp.status_code == 201
@@ -75,6 +75,20 @@ def test_create_inquiry_success_persists_and_returns(client, db_session):
         assert fetched.category == "Billing"
 
 
+def test_create_inquiry_deferred_mode_returns_pending_without_classifying(client, db_session, monkeypatch):
+    monkeypatch.setattr("inq_service_svc.config.CLASSIFICATION_MODE", "deferred")
+    with patch("inq_service_svc.services.inquiry_service.classify_inquiry") as mock_classify, \
+        patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
+        mock_manager.publish = AsyncMock()
+
+        resp = client.post("/api/inquiries/", json=VALID_PAYLOAD)
+        assert resp.status_code == 201
+        data = resp.json()
+        assert data["classification_status"] == "Pending"
+        assert data["category"] is None and data["urgency"] is None
+        mock_classify.assert_not_called()
+
+
 def test_create_inquiry_invalid_email_returns_422(client):
     payload = VALID_PAYLOAD.copy()
     payload["customer_email"] = "not-an-email"
@@ -150,7 +164,7 @@ def test_patch_inquiry_update_status_success_broadcasts(client, db_session):
     db_session.refresh(inq)
 
     with patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.patch(f"/api/inquiries/{inq.id}", json={"status": "Completed"}, headers=headers)
         assert resp.status_code == 200
@@ -166,13 +180,17 @@ def test_patch_inquiry_update_status_success_broadcasts(client, db_session):
         assert fetched.status == InquiryStatus.Completed
 
         # verify broadcast called with correct payload
-        assert mock_manager.broadcast.call_count == 1
-        called_arg = mock_manager.broadcast.call_args[0][0]
+        assert mock_manager.publish.call_count == 1
+        called_arg = mock_manager.publish.call_args[0][1]
         payload = json.loads(called_arg)
         assert payload["event"] == "inquiry_updated"
         assert payload["inquiry_id"] == inq.id
         assert payload["status"] == "Completed"
         assert payload.get("assigned_user_id") == fetched.assigned_user_id
+        # subscribers of the old and the new status are both told
+        topics = mock_manager.publish.call_args[0][0]
+        assert {f"inquiry:{inq.id}", "status:New", "status:Completed"} <= set(topics)
+        assert mock_manager.publish.call_args.kwargs["audience"] is None
 
 
 def test_patch_inquiry_update_assigned_user_id_success_broadcasts(client, db_session):
@@ -192,7 +210,7 @@ def test_patch_inquiry_update_assigned_user_id_success_broadcasts(client, db_ses
     db_session.refresh(inq)
 
     with patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.patch(f"/api/inquiries/{inq.id}", json={"assigned_user_id": assignee.id}, headers=headers)
         assert resp.status_code == 200
@@ -208,12 +226,14 @@ def test_patch_inquiry_update_assigned_user_id_success_broadcasts(client, db_ses
         assert fetched.assigned_user_id == assignee.id
 
         # verify broadcast
-        assert mock_manager.broadcast.call_count == 1
-        called_arg = mock_manager.broadcast.call_args[0][0]
+        assert mock_manager.publish.call_count == 1
+        called_arg = mock_manager.publish.call_args[0][1]
         payload = json.loads(called_arg)
         assert payload["event"] == "inquiry_updated"
         assert payload["inquiry_id"] == inq.id
         assert payload["assigned_user_id"] == assignee.id
+        # only the previous (none) and new assignee, plus admins, are told
+        assert mock_manager.publish.call_args.kwargs["audience"] == [None, assignee.id]
 
 
 def test_patch_inquiry_not_found_returns_404(client, db_session):
@@ -223,11 +243,11 @@ def test_patch_inquiry_not_found_returns_404(client, db_session):
     headers = get_auth_header(client, email, pw)
 
     with patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.patch("/api/inquiries/9999", json={"status": "Completed"}, headers=headers)
         assert resp.status_code == 404
-        assert mock_manager.broadcast.call_count == 0
+        assert mock_manager.publish.call_count == 0
 
 
 def test_patch_inquiry_invalid_assigned_user_id_returns_400(client, db_session):
@@ -244,11 +264,44 @@ def test_patch_inquiry_invalid_assigned_user_id_returns_400(client, db_session):
     db_session.refresh(inq)
 
     with patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.patch(f"/api/inquiries/{inq.id}", json={"assigned_user_id": 99999}, headers=headers)
         assert resp.status_code == 400
-        assert mock_manager.broadcast.call_count == 0
+        assert mock_manager.publish.call_count == 0
+
+
+def test_patch_inquiry_classification_is_recorded_as_staff_label(client, db_session):
+    from inq_service_svc.models.enums import ClassificationSource, ClassificationStatus
+
+    email = "labeler@example.com"
+    pw = "pw123"
+    create_user(db_session, email, pw)
+    headers = get_auth_header(client, email, pw)
+    classified = Inquiry(title="T", content="c", customer_email="e@example.com", category="General", urgency="Medium")
+    pending = Inquiry(
+        title="P", content="c", customer_email="e@example.com", classification_status=ClassificationStatus.Pending
+    )
+    db_session.add_all([classified, pending])
+    db_session.commit()
+
+    with patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
+        mock_manager.publish = AsyncMock()
+
+        resp = client.patch(f"/api/inquiries/{classified.id}", json={"category": "Billing"}, headers=headers)
+        assert resp.status_code == 200
+        assert (resp.json()["category"], resp.json()["urgency"]) == ("Billing", "Medium")
+
+        resp = client.patch(f"/api/inquiries/{classified.id}", json={"urgency": "Urgent"}, headers=headers)
+        assert resp.status_code == 400
+        # a pending inquiry has no label to keep for the other field
+        resp = client.patch(f"/api/inquiries/{pending.id}", json={"category": "Billing"}, headers=headers)
+        assert resp.status_code == 400
+
+    db_session.expire_all()
+    stored = db_session.get(Inquiry, classified.id)
+    assert stored.classification_source == ClassificationSource.Staff
+    assert db_session.get(Inquiry, pending.id).classification_status == ClassificationStatus.Pending
 
 
 def test_patch_inquiry_unauthenticated_returns_401(client, db_session):
@@ -280,7 +333,7 @@ def test_patch_inquiry_update_both_fields_success_broadcasts(client, db_session)
     db_session.refresh(inq)
 
     with patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.patch(
             f"/api/inquiries/{inq.id}",
@@ -300,8 +353,8 @@ def test_patch_inquiry_update_both_fields_success_broadcasts(client, db_session)
         assert fetched.status == InquiryStatus.InProgress
         assert fetched.assigned_user_id == assignee.id
 
-        assert mock_manager.broadcast.call_count == 1
-        called_arg = mock_manager.broadcast.call_args[0][0]
+        assert mock_manager.publish.call_count == 1
+        called_arg = mock_manager.publish.call_args[0][1]
         payload = json.loads(called_arg)
         assert payload["event"] == "inquiry_updated"
         assert payload["inquiry_id"] == inq.id
@@ -381,7 +434,7 @@ def test_reply_inquiry_success_saves_message_updates_status_and_notifies(client,
     from inq_service_svc.models.enums import MessageSenderType
 
     with patch("inq_service_svc.routers.inquiries.send_email") as mock_send, patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.post(f"/api/inquiries/{inq.id}/reply", json={"content": "This is a staff reply"}, headers=headers)
         assert resp.status_code == 200
@@ -404,16 +457,51 @@ def test_reply_inquiry_success_saves_message_updates_status_and_notifies(client,
         fetched_inq = db_session.execute(stmt_inq).scalar_one()
         assert fetched_inq.status == InquiryStatus.Completed
 
-        # verify send_email called with correct args
-        mock_send.assert_called_once_with(inq.customer_email, f"Re: {inq.title}", "This is a staff reply")
+        # verify send_email called with correct args and the reply's Message-ID for threading
+        reply = next(m for m in fetched_msg if m.content == "This is a staff reply")
+        mock_send.assert_called_once_with(
+            inq.customer_email,
+            f"Re: {inq.title}",
+            "This is a staff reply",
+            message_id=reply.email_message_id,
+            in_reply_to=None,
+        )
+        assert reply.email_message_id.startswith("<")
 
         # verify websocket broadcast called
-        assert mock_manager.broadcast.call_count == 1
-        called_arg = mock_manager.broadcast.call_args[0][0]
+        assert mock_manager.publish.call_count == 1
+        called_arg = mock_manager.publish.call_args[0][1]
         payload = json.loads(called_arg)
         assert payload["event"] == "inquiry_updated"
         assert payload["inquiry_id"] == inq.id
         assert payload["status"] == "Completed"
+        assert payload["assigned_user_id"] == inq.assigned_user_id
+
+
+def test_reply_inquiry_with_outbox_stores_outbound_email(client, db_session, monkeypatch):
+    from inq_service_svc.models import OutboundEmail
+    from inq_service_svc.models.enums import OutboundEmailStatus
+
+    monkeypatch.setattr("inq_service_svc.config.EMAIL_OUTBOX_ENABLED", True)
+    email = "outboxreplier@example.com"
+    pw = "pw123"
+    create_user(db_session, email, pw)
+    headers = get_auth_header(client, email, pw)
+
+    inq = Inquiry(title="Outbox", content="orig", customer_email="custoutbox@example.com", status=InquiryStatus.New)
+    db_session.add(inq)
+    db_session.commit()
+    db_session.refresh(inq)
+
+    with patch("inq_service_svc.routers.inquiries.send_email") as mock_send, patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
+        mock_manager.publish = AsyncMock()
+        resp = client.post(f"/api/inquiries/{inq.id}/reply", json={"content": "Queued reply"}, headers=headers)
+
+    assert resp.status_code == 200
+    mock_send.assert_not_called()
+    outbound = db_session.execute(select(OutboundEmail)).scalar_one()
+    assert (outbound.to_email, outbound.subject, outbound.body) == ("custoutbox@example.com", "Re: Outbox", "Queued reply")
+    assert outbound.status == OutboundEmailStatus.Pending
 
 
 def test_reply_inquiry_not_found_returns_404_and_no_notifications(client, db_session):
@@ -423,9 +511,132 @@ def test_reply_inquiry_not_found_returns_404_and_no_notifications(client, db_ses
     headers = get_auth_header(client, email, pw)
 
     with patch("inq_service_svc.routers.inquiries.send_email") as mock_send, patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
-        mock_manager.broadcast = AsyncMock()
+        mock_manager.publish = AsyncMock()
 
         resp = client.post("/api/inquiries/999999/reply", json={"content": "No one"}, headers=headers)
         assert resp.status_code == 404
         assert mock_send.call_count == 0
-        assert mock_manager.broadcast.call_count == 0
+        assert mock_manager.publish.call_count == 0
+
+
+# Keyset pagination for GET /api/inquiries
+
+def test_list_inquiries_paginates_with_cursor(client, db_session):
+    email = "pager@example.com"
+    pw = "pw123"
+    create_user(db_session, email, pw)
+    headers = get_auth_header(client, email, pw)
+
+    db_session.add_all(
+        [Inquiry(title=f"P{i}", content="c", customer_email="p@example.com", status=InquiryStatus.New) for i in range(5)]
+    )
+    db_session.commit()
+
+    seen = []
+    resp = client.get("/api/inquiries?limit=2", headers=headers)
+    while True:
+        assert resp.status_code == 200
+        page = resp.json()
+        assert len(page) <= 2
+        seen.extend(item["id"] for item in page)
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        resp = client.get("/api/inquiries", params={"limit": 2, "cursor": cursor}, headers=headers)
+
+    # every row is returned exactly once, in (created_at, id) order
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+
+def test_list_inquiries_cursor_combined_with_status_filter(client, db_session):
+    email = "pagerstatus@example.com"
+    pw = "pw123"
+    create_user(db_session, email, pw)
+    headers = get_auth_header(client, email, pw)
+
+    for i in range(3):
+        db_session.add(Inquiry(title=f"N{i}", content="c", customer_email="n@example.com", status=InquiryStatus.New))
+        db_session.add(Inquiry(title=f"C{i}", content="c", customer_email="c@example.com", status=InquiryStatus.Completed))
+    db_session.commit()
+
+    first = client.get("/api/inquiries?status=Completed&limit=2", headers=headers)
+    assert first.status_code == 200
+    cursor = first.headers["X-Next-Cursor"]
+
+    second = client.get("/api/inquiries", params={"status": "Completed", "limit": 2, "cursor": cursor}, headers=headers)
+    assert second.status_code == 200
+    assert "X-Next-Cursor" not in second.headers
+
+    items = first.json() + second.json()
+    assert [item["title"] for item in items] == ["C0", "C1", "C2"]
+
+
+def test_list_inquiries_limit_is_capped(client, db_session, monkeypatch):
+    from inq_service_svc import config
+
+    monkeypatch.setattr(config, "INQUIRY_PAGE_SIZE_MAX", 2)
+
+    email = "pagercap@example.com"
+    pw = "pw123"
+    create_user(db_session, email, pw)
+    headers = get_auth_header(client, email, pw)
+
+    db_session.add_all(
+        [Inquiry(title=f"Cap{i}", content="c", customer_email="cap@example.com", status=InquiryStatus.New) for i in range(3)]
+    )
+    db_session.commit()
+
+    resp = client.get("/api/inquiries?limit=100", headers=headers)
+    assert resp.status_code == 200
+    assert len(resp.json()) == 2
+    assert resp.headers.get("X-Next-Cursor")
+
+
+def test_list_inquiries_invalid_cursor_returns_400(client, db_session):
+    email = "pagerbad@example.com"
+    pw = "pw123"
+    create_user(db_session, email, pw)
+    headers = get_auth_header(client, email, pw)
+
+    resp = client.get("/api/inquiries?cursor=not-a-cursor", headers=headers)
+    assert resp.status_code == 400
+    assert resp.json().get("detail") == "Invalid cursor"
+
+
+def test_create_inquiries_bulk_persists_and_broadcasts_each(client, db_session):
+    staff = create_user(db_session, "bulk@example.com")
+    headers = get_auth_header(client, "bulk@example.com", "pw123")
+    payload = {"inquiries": [dict(VALID_PAYLOAD, title=f"Bulk {i}") for i in range(3)]}
+
+    with patch("inq_service_svc.services.inquiry_service.classify_inquiries") as mock_classify, \
+        patch("inq_service_svc.routers.inquiries.manager") as mock_manager:
+        mock_classify.return_value = [ClassificationResult(category="Billing", urgency="High")] * 3
+        mock_manager.publish = AsyncMock()
+
+        resp = client.post("/api/inquiries/bulk", json=payload, headers=headers)
+
+        assert resp.status_code == 201
+        ids = resp.json()["ids"]
+        mock_classify.assert_called_once()
+        sent = [json.loads(call.args[1]) for call in mock_manager.publish.await_args_list]
+        assert sent == [{"event": "new_inquiry", "inquiry_id": inquiry_id} for inquiry_id in ids]
+        first_topics = mock_manager.publish.await_args_list[0].args[0]
+        assert {f"inquiry:{ids[0]}", "status:New", f"assignee:{staff.id}"} <= set(first_topics)
+
+    rows = db_session.execute(select(Inquiry).where(Inquiry.id.in_(ids)).order_by(Inquiry.id)).scalars().all()
+    assert [row.title for row in rows] == ["Bulk 0", "Bulk 1", "Bulk 2"]
+    assert {row.category for row in rows} == {"Billing"}
+    assert {row.assigned_user_id for row in rows} == {staff.id}
+
+
+def test_create_inquiries_bulk_rejects_oversized_and_unauthenticated(client, db_session, monkeypatch):
+    create_user(db_session, "bulk2@example.com")
+    headers = get_auth_header(client, "bulk2@example.com", "pw123")
+    monkeypatch.setattr("inq_service_svc.config.INQUIRY_BULK_MAX_ITEMS", 2)
+    payload = {"inquiries": [VALID_PAYLOAD] * 3}
+
+    assert client.post("/api/inquiries/bulk", json=payload).status_code == 401
+    assert client.post("/api/inquiries/bulk", json=payload, headers=headers).status_code == 413
+    assert client.post("/api/inquiries/bulk", json={"inquiries": []}, headers=headers).status_code == 400
+    assert db_session.query(Inquiry).count() == 0
@@ -0,0 +1,81 @@
+import pytest
+from passlib.context import CryptContext
+
+import inq_service_svc.utils.security as security
+from inq_service_svc.models import User, UserRole
+
+
+@pytest.fixture(autouse=True)
+def use_test_pwd_context(monkeypatch):
+    ctx = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+    monkeypatch.setattr(security, "pwd_context", ctx)
+    monkeypatch.setattr(security.config, "SECRET_KEY", "test-secret")
+    monkeypatch.setattr(security.config, "ALGORITHM", "HS256")
+    yield
+
+
+def create_user(db_session, email: str, password: str, role: UserRole) -> User:
+    user = User(email=email, name="Tester", role=role, hashed_password=security.get_password_hash(password))
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def get_auth_header(client, email: str, password: str) -> dict:
+    resp = client.post("/api/auth/login", json={"email": email, "password": password})
+    assert resp.status_code == 200
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_db_pool_metrics_admin_only(client, db_session):
+    create_user(db_session, "admin@example.com", "adminpass", UserRole.Admin)
+    create_user(db_session, "staff@example.com", "staffpass", UserRole.Staff)
+
+    resp = client.get("/api/metrics/db-pool", headers=get_auth_header(client, "admin@example.com", "adminpass"))
+    assert resp.status_code == 200
+    data = resp.json()
+    for engine_name in ("sync", "async"):
+        assert "pool_class" in data[engine_name]
+        assert "in_use" in data[engine_name]
+        assert "wait_seconds_max" in data[engine_name]
+
+    resp = client.get("/api/metrics/db-pool", headers=get_auth_header(client, "staff@example.com", "staffpass"))
+    assert resp.status_code == 403
+
+
+def test_db_pool_metrics_unauthenticated_returns_401(client):
+    resp = client.get("/api/metrics/db-pool")
+    assert resp.status_code == 401
+
+
+def test_classification_cache_metrics_admin_only(client, db_session):
+    create_user(db_session, "admin@example.com", "adminpass", UserRole.Admin)
+    create_user(db_session, "staff@example.com", "staffpass", UserRole.Staff)
+
+    resp = client.get(
+        "/api/metrics/classification-cache", headers=get_auth_header(client, "admin@example.com", "adminpass")
+    )
+    assert resp.status_code == 200
+    data = resp.json()
+    for key in ("size", "hits", "db_hits", "misses", "evictions", "hit_ratio"):
+        assert key in data
+
+    resp = client.get(
+        "/api/metrics/classification-cache", headers=get_auth_header(client, "staff@example.com", "staffpass")
+    )
+    assert resp.status_code == 403
+
+
+def test_websocket_metrics_admin_only(client, db_session):
+    create_user(db_session, "admin@example.com", "adminpass", UserRole.Admin)
+    create_user(db_session, "staff@example.com", "staffpass", UserRole.Staff)
+
+    resp = client.get("/api/metrics/websocket", headers=get_auth_header(client, "admin@example.com", "adminpass"))
+    assert resp.status_code == 200
+    data = resp.json()
+    for key in ("connections", "queued", "queue_depth_max", "dropped", "coalesced", "evicted"):
+        assert key in data
+
+    resp = client.get("/api/metrics/websocket", headers=get_auth_header(client, "staff@example.com", "staffpass"))
+    assert resp.status_code == 403
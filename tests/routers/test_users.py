@@ -185,3 +185,28 @@ def test_password_hashing_on_create_and_update(client, db_session):
     fetched2 = db_session.execute(stmt).scalar_one()
     assert fetched2.hashed_password != old_hash
     assert security.verify_password("newsecure", fetched2.hashed_password)
+
+
+def test_delete_staff_user_with_active_inquiries(client, db_session):
+    from sqlalchemy import text
+
+    from inq_service_svc.models import Inquiry
+    from inq_service_svc.models.workload import StaffWorkload
+
+    # SQLite only enforces the staff_workloads -> users foreign key when asked to
+    db_session.execute(text("PRAGMA foreign_keys=ON"))
+    create_user(db_session, "admin@example.com", "adminpass", role=UserRole.Admin)
+    staff_id = create_user(db_session, "staff@example.com").id
+    inquiry = Inquiry(customer_email="c@example.com", title="t", content="b", assigned_user_id=staff_id)
+    db_session.add(inquiry)
+    db_session.commit()
+    inquiry_id = inquiry.id
+    assert db_session.get(StaffWorkload, staff_id).active_count == 1
+    headers = get_auth_header(client, "admin@example.com", "adminpass")
+
+    resp = client.delete(f"/api/users/{staff_id}", headers=headers)
+
+    assert resp.status_code == 200
+    db_session.expire_all()
+    assert db_session.get(Inquiry, inquiry_id).assigned_user_id is None
+    assert db_session.get(StaffWorkload, staff_id) is None
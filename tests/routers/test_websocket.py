@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+import inq_service_svc.utils.security as security
+from inq_service_svc.models import User, UserRole
+from inq_service_svc.utils.websocket_manager import manager
+
+
+def create_user(db_session, email: str, role: UserRole = UserRole.Staff) -> User:
+    user = User(email=email, name="Tester", role=role, hashed_password="x")
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def ws_url(email: str, query: str = "") -> str:
+    token = security.create_access_token({"sub": email})
+    return f"/api/ws?token={token}{query}"
+
+
+def test_websocket_keeps_ping_and_echo(client, db_session):
+    create_user(db_session, "ws@example.com")
+    with client.websocket_connect(ws_url("ws@example.com")) as ws:
+        ws.send_text("ping")
+        assert ws.receive_text() == "pong"
+        ws.send_text("hello")
+        assert ws.receive_text() == "hello"
+
+
+def test_websocket_subscribe_and_unsubscribe(client, db_session):
+    user = create_user(db_session, "ws@example.com")
+    with client.websocket_connect(ws_url("ws@example.com", "&topics=inquiry:3")) as ws:
+        ws.send_text(json.dumps({"action": "subscribe", "topics": [f"assignee:{user.id}", "status:New"]}))
+        assert json.loads(ws.receive_text()) == {
+            "event": "subscriptions",
+            "topics": [f"assignee:{user.id}", "inquiry:3", "status:New"],
+        }
+        ws.send_text(json.dumps({"action": "unsubscribe", "topics": "inquiry:3"}))
+        assert json.loads(ws.receive_text())["topics"] == [f"assignee:{user.id}", "status:New"]
+        ws.send_text(json.dumps({"action": "subscribe", "topics": ["bogus"]}))
+        assert json.loads(ws.receive_text())["event"] == "error"
+        # staff may only follow their own assignments
+        ws.send_text(json.dumps({"action": "subscribe", "topics": [f"assignee:{user.id + 1}"]}))
+        assert "Not allowed" in json.loads(ws.receive_text())["detail"]
+        assert f"assignee:{user.id}" in manager.topics
+        assert user.id in manager.users
+
+    assert f"assignee:{user.id}" not in manager.topics
+    assert user.id not in manager.users
+
+
+def test_websocket_rejects_invalid_topics_at_connect(client, db_session):
+    create_user(db_session, "ws@example.com")
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(ws_url("ws@example.com", "&topics=nope")) as ws:
+            ws.receive_text()
+
+
+@pytest.mark.parametrize("url", ["/api/ws", "/api/ws?token=not-a-jwt"])
+def test_websocket_requires_valid_token(client, url):
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with client.websocket_connect(url) as ws:
+            ws.receive_text()
+    assert exc_info.value.code == 1008
+
+
+def test_websocket_rejects_token_of_unknown_user(client):
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(ws_url("ghost@example.com")) as ws:
+            ws.receive_text()
+
+
+def test_websocket_accepts_bearer_header(client, db_session):
+    create_user(db_session, "ws@example.com")
+    token = security.create_access_token({"sub": "ws@example.com"})
+    with client.websocket_connect("/api/ws", headers={"Authorization": f"Bearer {token}"}) as ws:
+        ws.send_text("ping")
+        assert ws.receive_text() == "pong"
@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+
+from inq_service_svc.models import ClassificationCacheEntry
+from inq_service_svc.services import classification_cache as cache_module
+from inq_service_svc.services import classifier
+from inq_service_svc.services.classification_cache import ClassificationCache, classification_cache_key
+from inq_service_svc.services.classifier import ClassificationResult, classify_inquiry
+
+
+def test_key_ignores_case_whitespace_and_numbers():
+    a = classification_cache_key("Password reset", "Your code is 123456.\n\nThanks")
+    b = classification_cache_key("password  RESET", "Your code is 987654. Thanks")
+    assert a == b
+    assert a != classification_cache_key("Password reset", "Your invoice is attached")
+    # title and content are kept apart
+    assert classification_cache_key("a b", "c") != classification_cache_key("a", "b c")
+
+
+def test_lru_eviction_and_counters():
+    cache = ClassificationCache(max_size=2, ttl=60)
+    cache.put("a", ("Billing", "Low"))
+    cache.put("b", ("Account", "High"))
+    assert cache.get("a") == ("Billing", "Low")  # a becomes most recent
+    cache.put("c", ("General", "Medium"))  # evicts b
+
+    assert cache.get("b") is None
+    assert cache.get("c") == ("General", "Medium")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (2, 1, 1, 2)
+
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = ClassificationCache(max_size=10, ttl=30)
+    cache.put("a", ("Billing", "Low"))
+    now[0] += 31
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_zero_ttl_disables_cache():
+    cache = ClassificationCache(max_size=10, ttl=0)
+    cache.put("a", ("Billing", "Low"))
+    assert cache.get("a") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_persistent_tier_survives_memory_clear(db_session, session_local, monkeypatch):
+    cache = ClassificationCache(max_size=10, ttl=3600, persist=True, session_factory=session_local)
+    cache.put("k", ("Technical", "High"))
+    assert db_session.get(ClassificationCacheEntry, "k").category == "Technical"
+
+    cache.clear()  # e.g. a restart
+    assert cache.get("k") == ("Technical", "High")
+    assert cache.get("k") == ("Technical", "High")
+    stats = cache.stats()
+    assert (stats["db_hits"], stats["hits"]) == (1, 1)
+
+    # stale rows are ignored
+    cache.clear()
+    real_now = cache_module._utcnow
+    monkeypatch.setattr(cache_module, "_utcnow", lambda: real_now() + timedelta(hours=2))
+    assert cache.get("k") is None
+
+
+def test_classify_inquiry_calls_llm_once_for_duplicate_text(monkeypatch):
+    calls = []
+
+    def fake_llm(title, content):
+        calls.append(title)
+        return ClassificationResult(category="Account", urgency="Low")
+
+    monkeypatch.setattr(classifier, "_classify_with_llm", fake_llm)
+    first = classify_inquiry("Reset your password", "Code 1111")
+    second = classify_inquiry("Reset your password", "Code 2222")
+    assert first == second == ClassificationResult(category="Account", urgency="Low")
+    assert len(calls) == 1
+
+
+def test_classify_inquiry_does_not_cache_fallback(monkeypatch):
+    results = [None, ClassificationResult(category="Billing", urgency="High")]
+    monkeypatch.setattr(classifier, "_classify_with_llm", lambda title, content: results.pop(0))
+
+    assert classify_inquiry("Invoice", "Wrong amount") == classifier.DEFAULT_CLASSIFICATION
+    assert classify_inquiry("Invoice", "Wrong amount").category == "Billing"
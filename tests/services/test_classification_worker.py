@@ -0,0 +1,103 @@
+import json
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from inq_service_svc.models import Inquiry, ClassificationSource, ClassificationStatus
+from inq_service_svc.schemas.inquiry import InquiryCreate
+from inq_service_svc.services import classification_worker as worker_module
+from inq_service_svc.services.classification_worker import (
+    ClassificationWorker,
+    classify_pending_inquiry,
+    process_pending_classifications,
+)
+from inq_service_svc.services.classifier import ClassificationResult
+from inq_service_svc.services.inquiry_service import create_inquiry
+
+
+PAYLOAD = InquiryCreate(title="Login", content="Cannot sign in", customer_email="c@example.com")
+
+
+def make_pending(db_session) -> Inquiry:
+    with patch("inq_service_svc.services.inquiry_service.classify_inquiry") as mock_classify:
+        inquiry = create_inquiry(db_session, PAYLOAD, deferred=True)
+        mock_classify.assert_not_called()
+    return inquiry
+
+
+def test_deferred_create_stores_pending_inquiry(db_session):
+    inquiry = make_pending(db_session)
+    assert inquiry.id is not None
+    assert inquiry.classification_status == ClassificationStatus.Pending
+    assert inquiry.category is None and inquiry.urgency is None
+
+
+def test_classify_pending_inquiry_stores_result_once(db_session):
+    inquiry = make_pending(db_session)
+
+    with patch.object(worker_module, "classify_inquiry") as mock_classify:
+        mock_classify.return_value = ClassificationResult(category="Account", urgency="High")
+        payload = classify_pending_inquiry(db_session, inquiry.id)
+        assert payload == {
+            "event": "inquiry_classified",
+            "inquiry_id": inquiry.id,
+            "category": "Account",
+            "urgency": "High",
+        }
+        # already classified: nothing to do
+        assert classify_pending_inquiry(db_session, inquiry.id) is None
+        mock_classify.assert_called_once_with(PAYLOAD.title, PAYLOAD.content)
+
+    db_session.expire_all()
+    stored = db_session.get(Inquiry, inquiry.id)
+    assert stored.classification_status == ClassificationStatus.Classified
+    assert (stored.category, stored.urgency) == ("Account", "High")
+    assert stored.classification_source == ClassificationSource.LLM
+
+
+def test_submit_without_running_worker_returns_false():
+    assert ClassificationWorker().submit(1) is False
+
+
+@pytest.mark.anyio
+async def test_worker_classifies_and_broadcasts(db_session, session_local, monkeypatch):
+    inquiry = make_pending(db_session)
+    worker = ClassificationWorker(session_factory=session_local)
+    monkeypatch.setattr(
+        worker_module, "classify_inquiry", lambda title, content: ClassificationResult(category="Technical", urgency="Low")
+    )
+    mock_broadcast = AsyncMock()
+    monkeypatch.setattr(worker_module.manager, "publish", mock_broadcast)
+
+    await worker.start(concurrency=2)
+    try:
+        assert worker.submit(inquiry.id) is True
+        assert worker.submit(inquiry.id) is True  # duplicate while queued is ignored
+        await worker.join()
+    finally:
+        await worker.stop()
+
+    mock_broadcast.assert_awaited_once()
+    message = json.loads(mock_broadcast.await_args.args[1])
+    assert message["event"] == "inquiry_classified"
+    assert message["inquiry_id"] == inquiry.id
+    assert message["category"] == "Technical"
+
+    db_session.expire_all()
+    assert db_session.get(Inquiry, inquiry.id).classification_status == ClassificationStatus.Classified
+
+
+def test_sweep_submits_pending_inquiries(db_session, session_local, monkeypatch):
+    pending = make_pending(db_session)
+    with patch("inq_service_svc.services.inquiry_service.classify_inquiry") as mock_classify:
+        mock_classify.return_value = ClassificationResult(category="Billing", urgency="Low")
+        create_inquiry(db_session, PAYLOAD, deferred=False)
+
+    worker = ClassificationWorker(session_factory=session_local)
+    monkeypatch.setattr(worker_module, "classification_worker", worker)
+    submitted = []
+    monkeypatch.setattr(worker, "submit", submitted.append)
+    monkeypatch.setattr(ClassificationWorker, "running", property(lambda self: True))
+
+    process_pending_classifications()
+    assert submitted == [pending.id]
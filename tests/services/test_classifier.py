@@ -1,8 +1,12 @@
+import json
+
 import pytest
 from pydantic import BaseModel
 
+from inq_service_svc.models.enums import ClassificationSource
 from inq_service_svc.services.classifier import (
     classify_inquiry,
+    classify_inquiries,
     ClassificationResult,
     DEFAULT_CLASSIFICATION,
 )
@@ -45,6 +49,7 @@ class MockClient:
         return self
 
     def parse(self, *args, **kwargs):
+        self.calls = getattr(self, "calls", 0) + 1
         if self._to_raise:
             raise self._to_raise
         return DummyResponse(self._to_return)
@@ -72,6 +77,7 @@ def test_openai_exception_returns_default(monkeypatch):
     assert isinstance(res, ClassificationResult)
     assert res.category == DEFAULT_CLASSIFICATION.category
     assert res.urgency == DEFAULT_CLASSIFICATION.urgency
+    assert res.source == ClassificationSource.Fallback
 
 
 def test_invalid_response_returns_default(monkeypatch):
@@ -85,3 +91,109 @@ def test_invalid_response_returns_default(monkeypatch):
     assert isinstance(res, ClassificationResult)
     assert res.category == DEFAULT_CLASSIFICATION.category
     assert res.urgency == DEFAULT_CLASSIFICATION.urgency
+
+
+class BatchClient(MockClient):
+    """Answers a batch request with the classification chosen by ``choose(title)`` per item."""
+
+    def __init__(self, choose):
+        super().__init__()
+        self.choose = choose
+        self.batches = []
+
+    def parse(self, *args, model=None, messages=None, response_format=None):
+        prompt = messages[0]["content"]
+        if response_format is ClassificationResult:
+            # single inquiry prompt
+            title = prompt.split("Inquiry Title: ", 1)[1].split("\n", 1)[0]
+            self.batches.append([title])
+            choice = self.choose(title)
+            return DummyResponse({"category": choice[0], "urgency": choice[1]} if choice else None)
+
+        items = json.loads(prompt.split("Inquiries: ", 1)[1])
+        self.batches.append([item["title"] for item in items])
+        results = []
+        for item in items:
+            choice = self.choose(item["title"])
+            if choice is not None:
+                results.append({"index": item["index"], "category": choice[0], "urgency": choice[1]})
+        return DummyResponse({"results": results})
+
+
+def test_classify_inquiries_batches_and_falls_back_per_item(monkeypatch):
+    choices = {
+        "a": ("Billing", "High"),
+        "b": ("Spam", "High"),  # invalid category
+        "c": None,  # missing from response
+        "d": ("Technical", "Low"),
+        "e": ("Account", "Medium"),
+    }
+    client = BatchClient(lambda title: choices[title])
+    monkeypatch.setattr("inq_service_svc.services.classifier.get_openai_client", lambda: client)
+
+    batch = [(title, "content " + title) for title in "abcde"]
+    # sequential so the request order is deterministic
+    res = classify_inquiries(batch, batch_size=2, concurrency=1)
+
+    assert client.batches == [["a", "b"], ["c", "d"], ["e"]]
+    assert [(r.category, r.urgency) for r in res] == [
+        ("Billing", "High"),
+        (DEFAULT_CLASSIFICATION.category, DEFAULT_CLASSIFICATION.urgency),
+        (DEFAULT_CLASSIFICATION.category, DEFAULT_CLASSIFICATION.urgency),
+        ("Technical", "Low"),
+        ("Account", "Medium"),
+    ]
+
+
+def test_classify_inquiries_deduplicates_and_uses_cache(monkeypatch):
+    client = BatchClient(lambda title: ("General", "Low"))
+    monkeypatch.setattr("inq_service_svc.services.classifier.get_openai_client", lambda: client)
+
+    batch = [("Reset", "code 1"), ("Reset", "code 2"), ("Other", "x")]
+    res = classify_inquiries(batch, batch_size=10)
+    assert len(res) == 3 and all(r.category == "General" for r in res)
+    assert client.batches == [["Reset", "Other"]]
+
+    # everything is cached now
+    classify_inquiries(batch, batch_size=10)
+    assert client.batches == [["Reset", "Other"]]
+
+
+def test_classify_inquiries_request_failure_returns_defaults(monkeypatch):
+    mock_client = MockClient(to_raise=RuntimeError("timeout"))
+    monkeypatch.setattr("inq_service_svc.services.classifier.get_openai_client", lambda: mock_client)
+
+    res = classify_inquiries([("x", "1"), ("y", "2")])
+    assert res == [DEFAULT_CLASSIFICATION, DEFAULT_CLASSIFICATION]
+    assert mock_client.calls == 1
+
+
+def test_classify_inquiries_runs_requests_concurrently(monkeypatch):
+    import threading
+    import time
+
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def slow_batch(items):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        if items[0][0] == "title e":
+            raise RuntimeError("request failed")
+        return [ClassificationResult(category="Technical", urgency="Low") for _ in items]
+
+    monkeypatch.setattr("inq_service_svc.services.classifier._classify_batch_with_llm", slow_batch)
+
+    # letters, not numbers: digit runs are normalized away by the cache key
+    batch = [(f"title {c}", f"content {c}") for c in "abcdefghijkl"]
+    res = classify_inquiries(batch, batch_size=2, concurrency=3)
+
+    assert max(peak) == 3
+    # the failed request only affects its own chunk
+    assert [r.category for r in res[4:6]] == [DEFAULT_CLASSIFICATION.category] * 2
+    assert all(r.category == "Technical" for r in res[:4] + res[6:])
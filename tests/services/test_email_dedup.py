@@ -0,0 +1,123 @@
+import types
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from inq_service_svc.models import Inquiry
+from inq_service_svc.schemas.inquiry import InquiryCreate
+from inq_service_svc.services import email_processor
+from inq_service_svc.services.classifier import ClassificationResult
+from inq_service_svc.services.email_dedup import BloomFilter, IngestedMessageFilter, message_key
+from inq_service_svc.services.inquiry_service import create_inquiry
+
+RESULT = ClassificationResult(category="General", urgency="Low")
+
+
+def make_msg(message_id=None, subject="Hello", text="Body", from_="Alice <alice@example.com>"):
+    headers = {"message-id": (message_id,)} if message_id else {}
+    return types.SimpleNamespace(from_=from_, subject=subject, text=text, html=None, date_str="", headers=headers)
+
+
+def store(db_session, key):
+    payload = InquiryCreate(title="T", content="C", customer_email="c@example.com")
+    return create_inquiry(db_session, payload, RESULT, source_message_id=key)
+
+
+def test_message_key_prefers_message_id_and_falls_back_to_digest():
+    assert message_key(make_msg(" <abc@mail.example.com> ")) == "<abc@mail.example.com>"
+
+    digest = message_key(make_msg())
+    assert digest.startswith("sha256:")
+    assert digest == message_key(make_msg())
+    assert digest != message_key(make_msg(text="Other body"))
+
+    long_id = "<" + "x" * 300 + "@example.com>"
+    assert len(message_key(make_msg(long_id))) <= 255
+
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"<{i}@example.com>" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"<other-{i}@example.com>" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_find_ingested_checks_only_bloom_candidates(db_session):
+    store(db_session, "<old@example.com>")
+    dedup = IngestedMessageFilter(capacity=1000, error_rate=0.001)
+
+    found = dedup.find_ingested(db_session, ["<old@example.com>", "<new@example.com>"])
+
+    assert found == {"<old@example.com>"}
+    stats = dedup.stats()
+    assert stats["entries"] == 1
+    assert stats["db_lookups"] == 1
+    assert stats["skipped_lookups"] == 1
+
+
+def test_source_message_id_is_unique(db_session):
+    store(db_session, "<dup@example.com>")
+    with pytest.raises(IntegrityError):
+        store(db_session, "<dup@example.com>")
+    assert db_session.query(Inquiry).count() == 1
+
+
+def test_process_incoming_emails_skips_already_ingested(monkeypatch, session_local):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "sync")
+    mock_classify = MagicMock(side_effect=lambda batch: [RESULT] * len(batch))
+    monkeypatch.setattr(email_processor, "classify_inquiries", mock_classify)
+    mock_mark_seen = MagicMock()
+    monkeypatch.setattr(email_processor, "mark_emails_seen", mock_mark_seen)
+
+    first = [make_msg("<1@example.com>", subject="S1"), make_msg("<2@example.com>", subject="S2")]
+    # the chunk was only partly stored, so it stays unseen and is fetched again with a new email
+    second = first + [make_msg("<3@example.com>", subject="S3"), make_msg("<3@example.com>", subject="S3")]
+    for uid, msg in enumerate(second, start=1):
+        msg.uid = str(uid)
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(side_effect=[first, second]))
+
+    # first run: the batch commit fails and only S1 is stored on its own
+    def first_run_session():
+        session = session_local()
+        commit = session.commit
+        failures = [Exception("connection lost")]
+
+        def commit_after_first_failure():
+            if failures:
+                raise failures.pop()
+            commit()
+
+        session.commit = commit_after_first_failure
+        return session
+
+    create = email_processor.inquiry_service.create_inquiry
+
+    def create_all_but_s2(db, payload, *args, **kwargs):
+        if payload.title == "S2":
+            raise Exception("database down")
+        return create(db, payload, *args, **kwargs)
+
+    monkeypatch.setattr(email_processor, "SessionLocal", first_run_session)
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiry", create_all_but_s2)
+    email_processor.process_incoming_emails()
+    mock_mark_seen.assert_not_called()
+
+    monkeypatch.setattr(email_processor, "SessionLocal", session_local)
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiry", create)
+    email_processor.process_incoming_emails()
+
+    session = session_local()
+    try:
+        rows = session.query(Inquiry.source_message_id).order_by(Inquiry.id).all()
+    finally:
+        session.close()
+    assert [r[0] for r in rows] == ["<1@example.com>", "<2@example.com>", "<3@example.com>"]
+    # the second run only classified the emails that were not stored yet
+    assert mock_classify.call_args_list[1].args[0] == [("S2", "Body"), ("S3", "Body")]
+    assert mock_mark_seen.call_args.args[0] == ["1", "2", "3", "4"]
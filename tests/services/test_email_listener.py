@@ -0,0 +1,146 @@
+import threading
+
+from inq_service_svc.services import email_listener
+from inq_service_svc.services.email_listener import EmailIdleListener
+
+
+class FakeIdle:
+    def __init__(self, mailbox):
+        self.mailbox = mailbox
+
+    def wait(self, timeout):
+        if self.mailbox.closed.is_set():
+            raise ConnectionError("socket closed")
+        if self.mailbox.script:
+            step = self.mailbox.script.pop(0)
+            if isinstance(step, Exception):
+                raise step
+            return step
+        # nothing scripted: block like a quiet IDLE until the connection is closed
+        self.mailbox.closed.wait(timeout)
+        return []
+
+
+class FakeClient:
+    def __init__(self, mailbox, capabilities):
+        self.mailbox = mailbox
+        self.capabilities = capabilities
+
+    def shutdown(self):
+        self.mailbox.closed.set()
+
+
+class FakeMailBox:
+    """IMAP stand-in: ``script`` lists what successive IDLE waits return (or raise)."""
+
+    def __init__(self, script=None, capabilities=("IMAP4REV1", "IDLE")):
+        self.script = list(script or [])
+        self.client = FakeClient(self, capabilities)
+        self.idle = FakeIdle(self)
+        self.closed = threading.Event()
+        self.logged_out = False
+
+    def logout(self):
+        self.logged_out = True
+
+
+def test_processes_on_connect_and_on_new_mail_then_reconnects(monkeypatch):
+    monkeypatch.setattr(email_listener.random, "uniform", lambda a, b: 0)
+    first = FakeMailBox(script=[[], [b"* 3 EXISTS"], [b"* 1 EXPUNGE"], ConnectionError("reset")])
+    second = FakeMailBox()
+    mailboxes = [first, second]
+    calls = []
+    done = threading.Event()
+
+    def on_new_mail(mailbox):
+        calls.append(mailbox)
+        if mailbox is second:
+            done.set()
+
+    listener = EmailIdleListener(mailbox_factory=lambda: mailboxes.pop(0), on_new_mail=on_new_mail, idle_timeout=1)
+    listener.start()
+    try:
+        assert done.wait(5)
+    finally:
+        listener.stop()
+
+    # connect catch-up + EXISTS on the first connection, catch-up after reconnect
+    assert calls == [first, first, second]
+    assert listener.reconnects == 1
+    assert listener.idle_supported is True
+    assert first.logged_out and second.logged_out
+    assert not listener.running
+
+
+def test_backoff_grows_and_is_capped(monkeypatch):
+    waits = []
+    monkeypatch.setattr(email_listener.random, "uniform", lambda a, b: b)
+
+    listener = EmailIdleListener(
+        mailbox_factory=lambda: (_ for _ in ()).throw(ConnectionError("refused")),
+        on_new_mail=lambda mailbox: None,
+        backoff_initial=1,
+        backoff_max=4,
+    )
+
+    def fake_wait(seconds):
+        waits.append(seconds)
+        if len(waits) == 5:
+            listener._stop.set()
+        return listener._stop.is_set()
+
+    monkeypatch.setattr(listener._stop, "wait", fake_wait)
+    listener.run()
+    assert waits == [1, 2, 4, 4, 4]
+
+
+def test_server_without_idle_leaves_polling_in_charge():
+    mailbox = FakeMailBox(capabilities=("IMAP4REV1",))
+    calls = []
+    listener = EmailIdleListener(mailbox_factory=lambda: mailbox, on_new_mail=calls.append)
+    listener.run()
+
+    assert listener.idle_supported is False
+    assert calls == []
+    assert mailbox.logged_out
+
+
+def test_idle_timeout_is_capped_below_30_minutes():
+    assert EmailIdleListener(idle_timeout=3600).idle_timeout == 29 * 60
+
+
+def test_restart_while_previous_run_is_stopping_does_not_revive_it():
+    first, second = FakeMailBox(), FakeMailBox()
+    mailboxes = [first, second]
+    processing, release, second_listening = threading.Event(), threading.Event(), threading.Event()
+
+    def on_new_mail(mailbox):
+        if mailbox is first:
+            # a long ingestion run keeps the first loop busy past stop()'s timeout
+            processing.set()
+            release.wait(5)
+        else:
+            second_listening.set()
+
+    listener = EmailIdleListener(mailbox_factory=lambda: mailboxes.pop(0), on_new_mail=on_new_mail, idle_timeout=1)
+    listener.start()
+    assert processing.wait(5)
+    old_thread = listener._thread
+    listener.stop(timeout=0.05)
+    assert listener.running
+
+    listener.start()
+    try:
+        assert second_listening.wait(5)
+        release.set()
+        old_thread.join(5)
+        assert not old_thread.is_alive()
+        # the first loop exited instead of reconnecting, and left the new connection open
+        assert listener.reconnects == 0
+        assert first.logged_out and not second.logged_out
+        assert listener.running
+    finally:
+        release.set()
+        listener.stop()
+    assert second.logged_out
+    assert not listener.running
@@ -0,0 +1,56 @@
+from inq_service_svc.services.email_normalizer import (
+    TRUNCATION_MARKER,
+    EmailNormalizer,
+    html_to_text,
+    normalize_body,
+    spool_name,
+)
+
+MARKETING_HTML = """
+<html><head><title>Offer</title><style>.x { color: red }</style></head>
+<body>
+  <script>track();</script>
+  <div>Hello&nbsp;there,</div>
+  <p>My   order <b>#123</b> &amp; invoice<br>are missing.</p>
+  <ul><li>First</li><li>Second</li></ul>
+</body></html>
+"""
+
+
+def test_html_to_text_keeps_readable_text_only():
+    assert html_to_text(MARKETING_HTML) == "Hello there,\n\nMy order #123 & invoice\nare missing.\n\nFirst\n\nSecond"
+
+
+def test_normalize_body_prefers_text_and_caps_length(tmp_path):
+    assert normalize_body("  Plain body \n", "<p>ignored</p>", 100).content == "Plain body"
+    assert normalize_body(None, "<p>Hi</p>", 100).content == "Hi"
+    assert normalize_body(None, None, 100).content == ""
+
+    html = "<p>" + "word " * 1000 + "</p>"
+    body = normalize_body(None, html, 50, str(tmp_path / "spool"), spool_name("<m@x>"))
+    assert body.truncated
+    assert body.content.endswith(TRUNCATION_MARKER)
+    assert len(body.content) <= 50 + len(TRUNCATION_MARKER)
+    assert body.spool_path.endswith(".html")
+    with open(body.spool_path, encoding="utf-8") as f:
+        assert f.read() == html
+
+    # without a spool directory the body is only truncated
+    assert normalize_body("x" * 100, None, 10).spool_path is None
+
+
+def test_normalizer_runs_large_batches_in_process_pool():
+    normalizer = EmailNormalizer(workers=1, offload_min_bytes=1, max_chars=1000)
+    try:
+        bodies = normalizer.normalize([(None, "<p>One</p>", "a"), ("Two", None, "b")])
+        assert normalizer._pool is not None
+    finally:
+        normalizer.shutdown()
+
+    assert [body.content for body in bodies] == ["One", "Two"]
+
+
+def test_normalizer_keeps_small_batches_inline():
+    normalizer = EmailNormalizer(workers=1, offload_min_bytes=10**6)
+    assert normalizer.normalize([(None, "<p>Hi</p>", "a")])[0].content == "Hi"
+    assert normalizer._pool is None
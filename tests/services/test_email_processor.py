@@ -1,3 +1,4 @@
+import re
 import types
 from unittest.mock import MagicMock
 
@@ -5,6 +6,9 @@ import pytest
 
 from inq_service_svc.services import email_processor
 from inq_service_svc.schemas.inquiry import InquiryCreate
+from inq_service_svc.services.classifier import ClassificationResult
+
+RESULT = ClassificationResult(category="General", urgency="Low")
 
 
 def make_msg(from_, subject=None, text=None, html=None):
@@ -25,16 +29,16 @@ def test_process_incoming_emails_creates_inquiry(monkeypatch):
     mock_sessionlocal = MagicMock(return_value=mock_session)
     monkeypatch.setattr(email_processor, "SessionLocal", mock_sessionlocal)
 
-    mock_create = MagicMock()
-    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiry", mock_create)
+    mock_create = MagicMock(return_value=[1])
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
 
     email_processor.process_incoming_emails()
 
     mock_create.assert_called_once()
     called_args = mock_create.call_args[0]
-    # first arg is session, second is InquiryCreate
+    # first arg is session, second the list of InquiryCreate
     assert called_args[0] is mock_session
-    inquiry_obj = called_args[1]
+    (inquiry_obj,) = called_args[1]
     assert isinstance(inquiry_obj, InquiryCreate)
     assert inquiry_obj.title == "Hello"
     assert inquiry_obj.content == "Body"
@@ -54,7 +58,7 @@ def test_process_incoming_emails_skips_blacklisted(monkeypatch):
     monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
 
     mock_create = MagicMock()
-    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiry", mock_create)
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
 
     mock_logger = MagicMock()
     monkeypatch.setattr(email_processor, "logger", mock_logger)
@@ -77,11 +81,15 @@ def test_process_incoming_emails_continues_on_error(monkeypatch):
     mock_session.close = MagicMock()
     monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
 
-    def side_effect_create(session, inquiry):
+    def side_effect_create(session, inquiry, classification=None, **kwargs):
         if str(inquiry.customer_email).endswith("example.com"):
             raise Exception("boom")
         return None
 
+    # the bulk insert fails as a whole, then each email is created on its own
+    monkeypatch.setattr(
+        email_processor.inquiry_service, "create_inquiries", MagicMock(side_effect=Exception("bulk boom"))
+    )
     mock_create = MagicMock(side_effect=side_effect_create)
     monkeypatch.setattr(email_processor.inquiry_service, "create_inquiry", mock_create)
 
@@ -99,18 +107,328 @@ def test_process_incoming_emails_continues_on_error(monkeypatch):
 def test_content_selection_prefers_text_then_html(monkeypatch):
     monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
 
-    msg = make_msg("C <c@ex.org>", subject="S", text=None, html="<p>Hi</p>")
+    msg = make_msg("C <c@ex.org>", subject="S", text=None, html="<style>p {}</style><p>Hi</p>")
     monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(return_value=[msg]))
 
     mock_session = MagicMock()
     mock_session.close = MagicMock()
     monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
 
+    mock_create = MagicMock(return_value=[1])
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
+
+    email_processor.process_incoming_emails()
+
+    mock_create.assert_called_once()
+    (inquiry_obj,) = mock_create.call_args[0][1]
+    # HTML-only bodies are stored as plain text
+    assert inquiry_obj.content == "Hi"
+
+
+def test_process_incoming_emails_classifies_batch_once(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "sync")
+
+    msgs = [make_msg(f"U{i} <u{i}@example.com>", subject=f"S{i}", text=f"T{i}") for i in range(3)]
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(return_value=msgs))
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=MagicMock()))
+
+    results = [ClassificationResult(category=c, urgency="Low") for c in ("Billing", "Technical", "Account")]
+    mock_classify = MagicMock(return_value=results)
+    monkeypatch.setattr(email_processor, "classify_inquiries", mock_classify)
+    mock_create = MagicMock(return_value=[1, 2, 3])
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
+
+    email_processor.process_incoming_emails()
+
+    mock_classify.assert_called_once_with([("S0", "T0"), ("S1", "T1"), ("S2", "T2")])
+    mock_create.assert_called_once()
+    assert mock_create.call_args.args[2] == results
+
+
+def test_process_incoming_emails_deferred_mode_skips_classification(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+
+    msg = make_msg("Alice <alice@example.com>", subject="Hello", text="Body")
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(return_value=[msg]))
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=MagicMock()))
+
+    mock_classify = MagicMock()
+    monkeypatch.setattr(email_processor, "classify_inquiries", mock_classify)
+    mock_create = MagicMock(return_value=[7])
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
+    mock_submit = MagicMock()
+    monkeypatch.setattr(email_processor.classification_worker, "submit", mock_submit)
+
+    email_processor.process_incoming_emails()
+
+    mock_classify.assert_not_called()
+    assert mock_create.call_args[0][2] == [None]
+    assert mock_create.call_args.kwargs["deferred"] is True
+    mock_submit.assert_called_once_with(7)
+
+
+def test_process_incoming_emails_drains_backlog_in_chunks(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+    monkeypatch.setattr(email_processor.config, "EMAIL_FETCH_BATCH_SIZE", 2)
+
+    backlog = [make_msg(f"U{i} <u{i}@example.com>", subject=f"S{i}", text="T") for i in range(5)]
+
+    def fake_fetch(limit, folder, only_unread, mailbox, watermark):
+        chunk = backlog[watermark.last_uid:watermark.last_uid + limit]
+        watermark.uid_validity = 1
+        watermark.last_uid += len(chunk)
+        return chunk
+
+    mock_fetch = MagicMock(side_effect=fake_fetch)
+    monkeypatch.setattr(email_processor, "fetch_emails", mock_fetch)
+    mock_session = MagicMock()
+    mock_session.get.return_value = None
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
+    mock_create = MagicMock(side_effect=lambda session, items, *args, **kwargs: list(range(len(items))))
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
+
+    email_processor.process_incoming_emails()
+
+    assert mock_fetch.call_count == 3
+    assert [[i.title for i in c.args[1]] for c in mock_create.call_args_list] == [["S0", "S1"], ["S2", "S3"], ["S4"]]
+    saved = mock_session.merge.call_args[0][0]
+    assert (saved.folder, saved.uid_validity, saved.last_uid) == ("INBOX", 1, 5)
+    mock_session.close.assert_called_once()
+
+
+def test_process_incoming_emails_resumes_from_stored_watermark(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(return_value=[]))
+    mock_session = MagicMock()
+    mock_session.get.return_value = email_processor.EmailWatermark(folder="INBOX", uid_validity=7, last_uid=42)
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
+
+    email_processor.process_incoming_emails()
+
+    watermark = email_processor.fetch_emails.call_args.kwargs["watermark"]
+    assert watermark == email_processor.UidWatermark(uid_validity=7, last_uid=42)
+    email_processor.fetch_emails.assert_called_once()
+
+
+def test_process_incoming_emails_stops_at_max_batches(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+    monkeypatch.setattr(email_processor.config, "EMAIL_FETCH_BATCH_SIZE", 1)
+    monkeypatch.setattr(email_processor.config, "EMAIL_FETCH_MAX_BATCHES", 3)
+
+    msg = make_msg("A <a@example.com>", subject="S", text="T")
+    mock_fetch = MagicMock(return_value=[msg])
+    monkeypatch.setattr(email_processor, "fetch_emails", mock_fetch)
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=MagicMock()))
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", MagicMock(return_value=[1]))
+
+    email_processor.process_incoming_emails()
+
+    assert mock_fetch.call_count == 3
+
+
+def test_process_incoming_emails_commits_batch_and_isolates_failures(monkeypatch, session_local):
+    from inq_service_svc.models import Inquiry
+    from inq_service_svc.services.email_dedup import ingested_message_filter
+
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "sync")
+    monkeypatch.setattr(email_processor, "SessionLocal", session_local)
+    monkeypatch.setattr(
+        email_processor, "classify_inquiries", MagicMock(side_effect=lambda batch: [RESULT] * len(batch))
+    )
+
+    session = session_local()
+    session.add(Inquiry(title="Old", content="C", customer_email="x@example.com", source_message_id="<dup@x>"))
+    session.commit()
+    session.close()
+    # another replica stored <dup@x> after this run's duplicate check
+    monkeypatch.setattr(ingested_message_filter, "find_ingested", lambda db, keys: set())
+
+    msgs = [
+        make_msg("A <a@example.com>", subject="S1", text="T1"),
+        make_msg("B <b@example.com>", subject="S2", text="T2"),
+        make_msg("C <c@example.com>", subject="S3", text="T3"),
+    ]
+    msgs[1].headers = {"message-id": ("<dup@x>",)}
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(return_value=msgs))
+
+    email_processor.process_incoming_emails()
+
+    session = session_local()
+    try:
+        titles = [row[0] for row in session.query(Inquiry.title).order_by(Inquiry.id)]
+    finally:
+        session.close()
+    assert titles == ["Old", "S1", "S3"]
+
+
+def _chunk_fetch(messages):
+    def fake_fetch(limit, folder, only_unread, mailbox, watermark):
+        watermark.uid_validity = 1
+        watermark.last_uid = len(messages)
+        return messages
+
+    return MagicMock(side_effect=fake_fetch)
+
+
+def test_process_incoming_emails_stores_each_email_when_batch_commit_fails(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+    msgs = [
+        make_msg("A <a@example.com>", subject="S1", text="T1"),
+        make_msg("B <b@example.com>", subject="S2", text="T2"),
+    ]
+    monkeypatch.setattr(email_processor, "fetch_emails", _chunk_fetch(msgs))
+    mock_session = MagicMock()
+    mock_session.get.return_value = None
+    # the batch commit fails, the watermark commit succeeds
+    mock_session.commit.side_effect = [Exception("connection lost"), None]
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", MagicMock(return_value=[1, 2]))
     mock_create = MagicMock()
     monkeypatch.setattr(email_processor.inquiry_service, "create_inquiry", mock_create)
 
     email_processor.process_incoming_emails()
 
-    mock_create.assert_called_once()
-    inquiry_obj = mock_create.call_args[0][1]
-    assert inquiry_obj.content == "<p>Hi</p>"
+    assert [c.args[1].title for c in mock_create.call_args_list] == ["S1", "S2"]
+    assert mock_session.merge.call_args[0][0].last_uid == 2
+
+
+def test_process_incoming_emails_keeps_watermark_when_emails_are_not_stored(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+    monkeypatch.setattr(email_processor.config, "EMAIL_FETCH_BATCH_SIZE", 1)
+    mock_fetch = _chunk_fetch([make_msg("A <a@example.com>", subject="S1", text="T1")])
+    monkeypatch.setattr(email_processor, "fetch_emails", mock_fetch)
+    mock_session = MagicMock()
+    mock_session.get.return_value = None
+    mock_session.commit.side_effect = Exception("database down")
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", MagicMock(return_value=[1]))
+    monkeypatch.setattr(
+        email_processor.inquiry_service, "create_inquiry", MagicMock(side_effect=Exception("database down"))
+    )
+
+    email_processor.process_incoming_emails()
+
+    mock_fetch.assert_called_once()
+    mock_session.merge.assert_not_called()
+    mock_session.close.assert_called_once()
+
+
+def test_process_incoming_emails_skips_only_the_email_that_fails_to_normalize(monkeypatch):
+    from inq_service_svc.services.email_normalizer import normalize_body
+
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+    msgs = [
+        make_msg("A <a@example.com>", subject="S1", text="T1"),
+        make_msg("B <b@example.com>", subject="S2", html="<p>broken</p>"),
+    ]
+    monkeypatch.setattr(email_processor, "fetch_emails", _chunk_fetch(msgs))
+
+    def fake_normalize(bodies):
+        if any(html for _, html, _ in bodies):
+            raise RuntimeError("parser crashed")
+        return [normalize_body(text, html, 100) for text, html, _ in bodies]
+
+    monkeypatch.setattr(email_processor.email_normalizer, "normalize", fake_normalize)
+    mock_session = MagicMock()
+    mock_session.get.return_value = None
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=mock_session))
+    mock_create = MagicMock(return_value=[1])
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
+
+    email_processor.process_incoming_emails()
+
+    assert [i.title for i in mock_create.call_args[0][1]] == ["S1"]
+    assert mock_session.merge.call_args[0][0].last_uid == 2
+
+
+class FakeMailBox:
+    """In-memory IMAP folder answering the searches and flag updates email_client issues."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.folder = types.SimpleNamespace(status=lambda folder, items: {"UIDVALIDITY": 1})
+        self.fetched = []
+        self.on_flag = None
+
+    def fetch(self, criteria="ALL", limit=None, mark_seen=True, bulk=False):
+        query = str(criteria)
+        uid_range = re.search(r"UID (\d+):\*", query)
+        first_uid = int(uid_range.group(1)) if uid_range else 1
+        found = [
+            msg for msg in self.messages if int(msg.uid) >= first_uid and not ("UNSEEN" in query and msg.seen)
+        ][:limit]
+        if mark_seen:
+            for msg in found:
+                msg.seen = True
+        self.fetched.append([msg.uid for msg in found])
+        return iter(found)
+
+    def flag(self, uids, flag_set, value):
+        if self.on_flag is not None:
+            self.on_flag(uids)
+        for msg in self.messages:
+            if msg.uid in uids:
+                msg.seen = value
+
+
+def test_process_incoming_emails_fetches_unstored_chunk_again(monkeypatch, session_local):
+    from inq_service_svc.models import EmailWatermark, Inquiry
+
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "deferred")
+    mailbox = FakeMailBox(
+        [
+            types.SimpleNamespace(
+                uid=str(uid),
+                seen=False,
+                from_=f"U{uid} <u{uid}@example.com>",
+                subject=f"S{uid}",
+                text="T",
+                html=None,
+                date_str="",
+                headers={"message-id": (f"<{uid}@x>",)},
+            )
+            for uid in (1, 2, 3)
+        ]
+    )
+
+    def failing_session():
+        session = session_local()
+        session.commit = MagicMock(side_effect=Exception("database down"))
+        return session
+
+    monkeypatch.setattr(email_processor, "SessionLocal", failing_session)
+    email_processor.process_incoming_emails(mailbox)
+
+    assert mailbox.fetched == [["1", "2", "3"]]
+    assert not any(msg.seen for msg in mailbox.messages)
+
+    def stored_titles():
+        session = session_local()
+        try:
+            return [row[0] for row in session.query(Inquiry.title).order_by(Inquiry.id)]
+        finally:
+            session.close()
+
+    flagged_after = []
+    mailbox.on_flag = lambda uids: flagged_after.append((list(uids), stored_titles()))
+    monkeypatch.setattr(email_processor, "SessionLocal", session_local)
+    email_processor.process_incoming_emails(mailbox)
+
+    assert mailbox.fetched[1] == ["1", "2", "3"]
+    # flagged only once the chunk is committed
+    assert flagged_after == [(["1", "2", "3"], ["S1", "S2", "S3"])]
+    assert all(msg.seen for msg in mailbox.messages)
+    session = session_local()
+    try:
+        assert session.get(EmailWatermark, "INBOX").last_uid == 3
+    finally:
+        session.close()
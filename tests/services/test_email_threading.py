@@ -0,0 +1,99 @@
+import types
+from unittest.mock import MagicMock
+
+from inq_service_svc.models import Inquiry, Message
+from inq_service_svc.models.enums import InquiryStatus, MessageSenderType
+from inq_service_svc.services import email_processor
+from inq_service_svc.services.classifier import ClassificationResult
+from inq_service_svc.services.email_threading import find_thread_inquiry, reference_ids, reply_subject
+
+RESULT = ClassificationResult(category="General", urgency="Low")
+
+
+def make_msg(message_id, subject, text="Body", in_reply_to=None, references=None, from_="Alice <alice@example.com>"):
+    headers = {"message-id": (message_id,)}
+    if in_reply_to:
+        headers["in-reply-to"] = (in_reply_to,)
+    if references:
+        headers["references"] = (references,)
+    return types.SimpleNamespace(from_=from_, subject=subject, text=text, html=None, date_str="", headers=headers)
+
+
+def add_inquiry(db_session, title="Printer broken", source_message_id="<orig@example.com>", status=InquiryStatus.New):
+    inquiry = Inquiry(
+        title=title,
+        content="It does not print",
+        customer_email="alice@example.com",
+        status=status,
+        source_message_id=source_message_id,
+    )
+    db_session.add(inquiry)
+    db_session.commit()
+    return inquiry
+
+
+def test_reference_ids_and_reply_subject():
+    msg = make_msg("<3@x>", "Re: Hi", in_reply_to="<2@x>", references="<1@x> <2@x>")
+    assert reference_ids(msg) == ["<2@x>", "<1@x>"]
+    assert reply_subject("RE: Fwd: Printer broken") == "Printer broken"
+    assert reply_subject("AW[2]: Printer broken") == "Printer broken"
+    assert reply_subject("Printer broken") is None
+    assert reply_subject("Re:") is None
+
+
+def test_find_thread_inquiry_by_reference_and_subject(db_session):
+    inquiry = add_inquiry(db_session)
+    db_session.add(
+        Message(inquiry_id=inquiry.id, content="Fixed", sender_type=MessageSenderType.Staff, email_message_id="<reply@us>")
+    )
+    db_session.commit()
+
+    assert find_thread_inquiry(db_session, ["<reply@us>"], "alice@example.com", "Hi") == inquiry.id
+    assert find_thread_inquiry(db_session, ["<orig@example.com>"], "alice@example.com", "Hi") == inquiry.id
+    # a referenced Message-ID only threads an email from the inquiry's customer
+    assert find_thread_inquiry(db_session, ["<reply@us>"], "mallory@example.com", "Hi") is None
+    assert find_thread_inquiry(db_session, ["<orig@example.com>"], "mallory@example.com", "Re: Printer broken") is None
+    assert find_thread_inquiry(db_session, [], "alice@example.com", "Re: Printer broken") == inquiry.id
+    # subject fallback only applies to replies from the same sender
+    assert find_thread_inquiry(db_session, [], "bob@example.com", "Re: Printer broken") is None
+    assert find_thread_inquiry(db_session, [], "alice@example.com", "Printer broken") is None
+    assert find_thread_inquiry(db_session, ["<unknown@x>"], "alice@example.com", "New question") is None
+
+
+def test_process_incoming_emails_appends_follow_up(monkeypatch, session_local):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr(email_processor.config, "CLASSIFICATION_MODE", "sync")
+    monkeypatch.setattr(email_processor, "SessionLocal", session_local)
+    mock_classify = MagicMock(side_effect=lambda batch: [RESULT] * len(batch))
+    monkeypatch.setattr(email_processor, "classify_inquiries", mock_classify)
+
+    session = session_local()
+    try:
+        inquiry_id = add_inquiry(session, status=InquiryStatus.Completed).id
+    finally:
+        session.close()
+
+    follow_up = make_msg("<f1@example.com>", "Re: Printer broken", text="Still broken", in_reply_to="<orig@example.com>")
+    by_subject = make_msg("<f2@example.com>", "RE: Printer broken", text="Any news?")
+    new = make_msg("<n1@example.com>", "Invoice question", text="Where is my invoice?")
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(side_effect=[[follow_up, by_subject, new], [follow_up]]))
+
+    email_processor.process_incoming_emails()
+    # fetched again (e.g. the seen flag was lost): not appended twice
+    email_processor.process_incoming_emails()
+
+    session = session_local()
+    try:
+        inquiries = session.query(Inquiry).order_by(Inquiry.id).all()
+        messages = session.query(Message).filter(Message.inquiry_id == inquiry_id).order_by(Message.id).all()
+        assert [i.title for i in inquiries] == ["Printer broken", "Invoice question"]
+        assert [(m.content, m.sender_type) for m in messages] == [
+            ("Still broken", MessageSenderType.Customer),
+            ("Any news?", MessageSenderType.Customer),
+        ]
+        # the follow-up reopened the completed inquiry
+        assert inquiries[0].status == InquiryStatus.New
+    finally:
+        session.close()
+    # only the new inquiry was classified
+    mock_classify.assert_called_once_with([("Invoice question", "Where is my invoice?")])
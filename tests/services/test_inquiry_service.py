@@ -1,7 +1,10 @@
 import pytest
 
-from inq_service_svc.models import User, Inquiry, UserRole, InquiryStatus
-from inq_service_svc.services.inquiry_service import assign_staff, create_inquiry
+from sqlalchemy.exc import IntegrityError
+
+from inq_service_svc.models import User, Inquiry, UserRole, InquiryStatus, StaffWorkload
+from inq_service_svc.models.enums import ClassificationSource, ClassificationStatus
+from inq_service_svc.services.inquiry_service import assign_staff, create_inquiry, create_inquiries
 from inq_service_svc.services.classifier import ClassificationResult
 from inq_service_svc.schemas.inquiry import InquiryCreate
 from unittest.mock import patch
@@ -79,6 +82,7 @@ def test_create_inquiry_persists_sets_status_and_classification(db_session):
         assert created.status == InquiryStatus.New
         assert created.category == "Billing"
         assert created.urgency == "High"
+        assert created.classification_source == ClassificationSource.LLM
 
         # verify persisted in DB
         fetched = db_session.get(Inquiry, created.id)
@@ -124,3 +128,68 @@ def test_create_inquiry_no_staff_results_in_none_assignment(db_session):
         created = create_inquiry(db_session, payload)
 
         assert created.assigned_user_id is None
+
+
+def test_create_inquiries_bulk_inserts_and_spreads_assignments(db_session):
+    staff_a = User(email="ba@example.com", hashed_password="h", name="A", role=UserRole.Staff)
+    staff_b = User(email="bb@example.com", hashed_password="h", name="B", role=UserRole.Staff)
+    db_session.add_all([staff_a, staff_b])
+    db_session.commit()
+    db_session.add(Inquiry(title="Old", content="x", customer_email="o@example.com", assigned_user_id=staff_a.id))
+    db_session.commit()
+
+    items = [InquiryCreate(title=f"Bulk {i}", content="c", customer_email=f"b{i}@test.com") for i in range(5)]
+    classifications = [ClassificationResult(category="Billing", urgency="Low")] * 4 + [None]
+    ids = create_inquiries(db_session, items, classifications, deferred=True, source_message_ids=["<m0@x>"] + [None] * 4)
+
+    rows = {row.id: row for row in db_session.query(Inquiry).filter(Inquiry.id.in_(ids))}
+    assert [rows[i].title for i in ids] == [f"Bulk {i}" for i in range(5)]
+    # the whole batch is planned from one snapshot, as if assigned one after another
+    assert [rows[i].assigned_user_id for i in ids] == [staff_b.id, staff_a.id, staff_b.id, staff_a.id, staff_b.id]
+    assert rows[ids[0]].source_message_id == "<m0@x>"
+    assert rows[ids[0]].category == "Billing"
+    assert rows[ids[4]].classification_status == ClassificationStatus.Pending
+    counts = dict(db_session.query(StaffWorkload.user_id, StaffWorkload.active_count))
+    assert counts == {staff_a.id: 3, staff_b.id: 3}
+
+
+def test_create_inquiries_classifies_missing_items_together(db_session):
+    items = [InquiryCreate(title=f"T{i}", content="c", customer_email="c@test.com") for i in range(3)]
+    given = ClassificationResult(category="Account", urgency="High")
+
+    with patch("inq_service_svc.services.inquiry_service.classify_inquiries") as mock_classify:
+        mock_classify.return_value = [ClassificationResult(category="Technical", urgency="Low")] * 2
+        ids = create_inquiries(db_session, items, [None, given, None], deferred=False)
+
+    mock_classify.assert_called_once_with([("T0", "c"), ("T2", "c")])
+    categories = [db_session.get(Inquiry, i).category for i in ids]
+    assert categories == ["Technical", "Account", "Technical"]
+
+
+def test_create_inquiries_duplicate_source_stores_nothing(db_session):
+    db_session.add(Inquiry(title="Old", content="x", customer_email="o@example.com", source_message_id="<dup@x>"))
+    db_session.commit()
+    items = [InquiryCreate(title=f"T{i}", content="c", customer_email="c@test.com") for i in range(2)]
+    result = ClassificationResult(category="General", urgency="Low")
+
+    with pytest.raises(IntegrityError):
+        create_inquiries(db_session, items, [result, result], source_message_ids=["<new@x>", "<dup@x>"])
+
+    assert db_session.query(Inquiry).count() == 1
+
+
+def test_create_inquiries_snapshot_failure_keeps_callers_transaction(db_session):
+    db_session.add(Inquiry(title="Written by the caller", content="x", customer_email="o@example.com"))
+    db_session.flush()
+    items = [InquiryCreate(title="T", content="c", customer_email="c@test.com")]
+    result = ClassificationResult(category="General", urgency="Low")
+
+    with patch(
+        "inq_service_svc.services.inquiry_service.load_workload_snapshot", side_effect=RuntimeError("snapshot failed")
+    ):
+        create_inquiries(db_session, items, [result], commit=False)
+    db_session.commit()
+
+    titles = sorted(title for (title,) in db_session.query(Inquiry.title))
+    assert titles == ["T", "Written by the caller"]
+    assert db_session.query(Inquiry).filter_by(title="T").one().assigned_user_id is None
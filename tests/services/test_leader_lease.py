@@ -0,0 +1,90 @@
+import time
+from unittest.mock import MagicMock
+
+from inq_service_svc.models import SchedulerLease
+from inq_service_svc.services.leader_lease import LeaderLease, leader_only
+
+
+def make_lease(session_local, holder_id, **kwargs):
+    return LeaderLease(session_factory=session_local, holder_id=holder_id, **kwargs)
+
+
+def test_only_one_process_holds_the_lease(session_local):
+    a = make_lease(session_local, "a")
+    b = make_lease(session_local, "b")
+
+    assert a.renew() is True
+    assert b.renew() is False
+    # renewing extends the lease of the holder
+    assert a.renew() is True
+    assert a.is_leader and not b.is_leader
+
+    a.release()
+    assert not a.is_leader
+    assert b.renew() is True
+    assert a.renew() is False
+
+    session = session_local()
+    try:
+        assert session.get(SchedulerLease, "scheduler").holder == "b"
+    finally:
+        session.close()
+
+
+def test_expired_lease_fails_over(session_local):
+    a = make_lease(session_local, "a", ttl=1, margin=0.5)
+    b = make_lease(session_local, "b", ttl=1, margin=0.5)
+    assert a.renew()
+
+    # the leader stopped renewing (crashed or stalled)
+    time.sleep(1.1)
+
+    assert not a.is_leader
+    assert b.renew() is True
+    assert a.renew() is False
+
+
+def test_callbacks_follow_leadership_changes(session_local):
+    a = make_lease(session_local, "a")
+    b = make_lease(session_local, "b")
+    changes = []
+    b.on_change(changes.append)
+
+    a.renew()
+    b.renew()
+    assert changes == []
+
+    a.release()
+    b.renew()
+    b.release()
+    b.renew()
+    assert changes == [True, True]
+    assert b.acquired == 2
+
+
+def test_renew_failure_is_not_leadership():
+    lease = LeaderLease(session_factory=MagicMock(side_effect=RuntimeError("db down")), holder_id="a")
+    assert lease.renew() is False
+    assert not lease.is_leader
+
+
+def test_leader_only_runs_job_in_leader(session_local):
+    a = make_lease(session_local, "a")
+    b = make_lease(session_local, "b")
+    job = MagicMock(__name__="process_something")
+    a.renew()
+    b.renew()
+
+    leader_only(job, lease=b)()
+    job.assert_not_called()
+    wrapped = leader_only(job, lease=a)
+    wrapped()
+    job.assert_called_once_with()
+    assert wrapped.__name__ == "process_something"
+
+
+def test_disabled_election_makes_every_process_leader():
+    lease = LeaderLease(session_factory=MagicMock(side_effect=AssertionError("no db access")), enabled=False)
+    assert lease.renew() is True
+    assert lease.is_leader
+    lease.release()
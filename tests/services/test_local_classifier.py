@@ -0,0 +1,165 @@
+import pytest
+
+from inq_service_svc.models import Inquiry, ClassificationSource, ClassificationStatus
+from inq_service_svc.services import classifier, local_classifier
+from inq_service_svc.services.local_classifier import LocalClassifier, evaluate, load_examples, main
+
+
+TRAINING = [
+    ("Invoice question", "My invoice shows the wrong amount", "Billing", "Medium"),
+    ("Refund request", "Please refund my last payment", "Billing", "Medium"),
+    ("Charged twice", "My card was charged twice for the invoice", "Billing", "Medium"),
+    ("Cannot log in", "I cannot log in to my account, password reset fails", "Account", "High"),
+    ("Password reset", "The password reset link does not work for my account", "Account", "High"),
+    ("Locked account", "My account is locked after failed log in attempts", "Account", "High"),
+    ("API error", "The API returns error 500 on every request", "Technical", "Low"),
+    ("App crash", "The app crashes with an error when uploading", "Technical", "Low"),
+]
+
+
+@pytest.fixture
+def model():
+    return LocalClassifier.train(TRAINING)
+
+
+def test_predicts_trained_labels(model):
+    result, confidence = model.predict("Refund", "I want a refund for the invoice payment")
+    assert (result.category, result.urgency) == ("Billing", "Medium")
+    assert 0.5 < confidence <= 1.0
+
+    result, _ = model.predict("Login problem", "cannot log in, password reset")
+    assert result.category == "Account"
+
+
+def test_classify_respects_threshold(model):
+    assert model.classify("Refund", "refund invoice payment charged", threshold=0.5) is not None
+    # unfamiliar text stays near the priors
+    assert model.classify("Hello", "Question about something new", threshold=0.9) is None
+
+
+def test_save_and_load_round_trip(model, tmp_path):
+    path = tmp_path / "model.json"
+    model.save(str(path))
+    loaded = LocalClassifier.load(str(path))
+    assert loaded.trained_on == len(TRAINING)
+    assert loaded.predict("Refund", "refund my invoice") == model.predict("Refund", "refund my invoice")
+
+
+def test_evaluate_reports_accuracy_coverage_and_latency(model):
+    report = evaluate(model, TRAINING, threshold=0.0)
+    assert report["examples"] == len(TRAINING)
+    assert report["accuracy"] == 1.0
+    assert report["coverage"] == 1.0
+    assert report["latency_ms_mean"] >= 0.0
+
+
+def labeled(title, content, category, urgency, source=ClassificationSource.LLM):
+    return Inquiry(
+        title=title,
+        content=content,
+        customer_email="c@example.com",
+        category=category,
+        urgency=urgency,
+        classification_source=source,
+    )
+
+
+def test_load_examples_holds_out_and_skips_unclassified(db_session):
+    for example in TRAINING:
+        db_session.add(labeled(*example))
+    db_session.add(
+        Inquiry(
+            title="Pending",
+            content="x",
+            customer_email="c@example.com",
+            classification_status=ClassificationStatus.Pending,
+        )
+    )
+    db_session.add(labeled("Old label", "x", "Account Issues", "High"))
+    db_session.commit()
+
+    training, held_out = load_examples(db_session, holdout_every=4)
+    assert len(training) + len(held_out) == len(TRAINING)
+    assert [example[0] for example in held_out] == [TRAINING[3][0], TRAINING[7][0]]
+
+
+def test_load_examples_only_uses_trusted_labels(db_session):
+    db_session.add(labeled("From the LLM", "x", "Billing", "Low"))
+    db_session.add(labeled("Corrected by staff", "x", "Account", "High", ClassificationSource.Staff))
+    db_session.add(labeled("Own answer", "x", "Billing", "Low", ClassificationSource.Local))
+    db_session.add(labeled("LLM failed", "x", "General", "Medium", ClassificationSource.Fallback))
+    db_session.add(labeled("Before sources were recorded", "x", "Technical", "Low", None))
+    db_session.commit()
+
+    training, _ = load_examples(db_session)
+    assert [example[0] for example in training] == ["From the LLM", "Corrected by staff"]
+
+
+def test_classify_inquiry_uses_confident_local_answer(model, tmp_path, monkeypatch):
+    path = tmp_path / "model.json"
+    model.save(str(path))
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_MODEL_PATH", str(path))
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_THRESHOLD", 0.5)
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS", 2)
+
+    def llm_not_expected(title, content):
+        raise AssertionError("LLM called")
+
+    monkeypatch.setattr(classifier, "_classify_with_llm", llm_not_expected)
+    result = classifier.classify_inquiry("Refund", "refund invoice payment charged")
+    assert (result.category, result.urgency) == ("Billing", "Medium")
+    assert result.source == ClassificationSource.Local
+
+    # below the threshold the LLM answers
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_THRESHOLD", 1.01)
+    monkeypatch.setattr(
+        classifier, "_classify_with_llm", lambda title, content: classifier.ClassificationResult(category="General", urgency="Low")
+    )
+    result = classifier.classify_inquiry("Refund", "refund invoice payment again")
+    assert (result.category, result.source) == ("General", ClassificationSource.LLM)
+
+
+def test_train_command_saves_model(session_local, db_session, tmp_path, monkeypatch, capsys):
+    for example in TRAINING:
+        db_session.add(labeled(*example))
+    db_session.commit()
+    monkeypatch.setattr(local_classifier, "SessionLocal", session_local)
+
+    path = tmp_path / "model.json"
+    args = ["train", "--model-path", str(path), "--holdout-every", "4", "--min-examples-per-class", "2"]
+    assert main(args + ["--min-accuracy", "0.5"]) == 0
+    assert LocalClassifier.load(str(path)).trained_on == len(TRAINING)
+    assert '"coverage"' in capsys.readouterr().out
+
+    # not replaced when the held-out answers miss the target
+    path.unlink()
+    assert main(args + ["--min-accuracy", "1.01"]) == 1
+    assert not path.exists()
+    assert "answered_accuracy" in capsys.readouterr().out.splitlines()[-1]
+
+
+def test_single_label_model_is_neither_saved_nor_used(session_local, db_session, tmp_path, monkeypatch, capsys):
+    billing = [example for example in TRAINING if example[2] == "Billing"]
+    one_label = LocalClassifier.train(billing)
+    # every posterior of a single-label model is 1.0
+    assert one_label.predict("Hello", "Question about something new")[1] == 1.0
+    assert one_label.unusable_reason(1) == "category model has 1 label(s), at least 2 are needed"
+    assert "fewer than 3 examples: Technical" in LocalClassifier.train(TRAINING).unusable_reason(3)
+
+    for example in billing:
+        db_session.add(labeled(*example))
+    db_session.commit()
+    monkeypatch.setattr(local_classifier, "SessionLocal", session_local)
+    path = tmp_path / "model.json"
+    assert main(["train", "--model-path", str(path), "--holdout-every", "0", "--min-accuracy", "0"]) == 1
+    assert not path.exists()
+    assert "at least 2 are needed" in capsys.readouterr().out
+
+    # a model file written some other way is not loaded either
+    one_label.save(str(path))
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_MODEL_PATH", str(path))
+    monkeypatch.setattr(local_classifier.config, "LOCAL_CLASSIFIER_MIN_EXAMPLES_PER_CLASS", 1)
+    assert local_classifier.get_local_classifier() is None
+    assert local_classifier.classify_locally("Hello", "Question about something new") is None
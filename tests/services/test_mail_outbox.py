@@ -0,0 +1,168 @@
+import smtplib
+from datetime import timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from inq_service_svc.models import Base, OutboundEmailStatus
+from inq_service_svc.services import mail_outbox as outbox_module
+from inq_service_svc.services.mail_outbox import MailOutbox, enqueue_email
+
+
+class FakeConnection:
+    """Stand-in for SmtpConnection recording sent messages."""
+
+    def __init__(self, fail_with=None):
+        self.fail_with = fail_with
+        self.sent = []
+        self.closed = False
+        self.connected = True
+
+    def send(self, msg):
+        if self.fail_with is not None:
+            raise self.fail_with
+        self.sent.append(msg)
+
+    def close(self):
+        self.closed = True
+
+
+def make_outbound(db_session, to_email="cust@example.com"):
+    outbound = enqueue_email(db_session, to_email, "Re: Help", "Reply body")
+    db_session.commit()
+    return outbound
+
+
+def test_deliver_sends_and_marks_sent(db_session):
+    outbound = make_outbound(db_session)
+    connection = FakeConnection()
+
+    assert MailOutbox().deliver(db_session, outbound.id, connection) is True
+
+    assert [msg["To"] for msg in connection.sent] == ["cust@example.com"]
+    db_session.refresh(outbound)
+    assert outbound.status == OutboundEmailStatus.Sent
+    assert outbound.attempts == 1
+    assert outbound.sent_at is not None
+
+
+def test_deliver_keeps_threading_headers(db_session):
+    outbound = enqueue_email(db_session, "cust@example.com", "Re: Help", "Body", "<reply@us>", "<orig@example.com>")
+    db_session.commit()
+    connection = FakeConnection()
+
+    MailOutbox().deliver(db_session, outbound.id, connection)
+
+    msg = connection.sent[0]
+    assert (msg["Message-ID"], msg["In-Reply-To"], msg["References"]) == ("<reply@us>", "<orig@example.com>", "<orig@example.com>")
+
+
+def test_deliver_is_not_repeated_for_sent_or_claimed_email(db_session):
+    outbound = make_outbound(db_session)
+    outbox = MailOutbox()
+    connection = FakeConnection()
+
+    outbox.deliver(db_session, outbound.id, connection)
+    assert outbox.deliver(db_session, outbound.id, connection) is None
+    assert len(connection.sent) == 1
+
+
+def test_deliver_failure_schedules_retry_with_backoff(db_session):
+    outbound = make_outbound(db_session)
+    outbox = MailOutbox(backoff_initial=60, backoff_max=600)
+    before = outbox_module._utcnow()
+
+    result = outbox.deliver(db_session, outbound.id, FakeConnection(smtplib.SMTPServerDisconnected("gone")))
+
+    assert result is False
+    db_session.refresh(outbound)
+    assert outbound.status == OutboundEmailStatus.Pending
+    assert outbound.attempts == 1
+    assert "gone" in outbound.last_error
+    assert before + timedelta(seconds=29) <= outbound.next_attempt_at <= before + timedelta(seconds=61)
+    # not due yet
+    assert outbox.deliver(db_session, outbound.id, FakeConnection()) is None
+
+
+def test_deliver_gives_up_after_max_attempts(db_session):
+    outbound = make_outbound(db_session)
+    outbox = MailOutbox(max_attempts=2, backoff_initial=0)
+    failing = FakeConnection(ConnectionRefusedError("refused"))
+
+    outbox.deliver(db_session, outbound.id, failing)
+    outbox.deliver(db_session, outbound.id, failing)
+
+    db_session.refresh(outbound)
+    assert outbound.status == OutboundEmailStatus.Failed
+    assert outbound.attempts == 2
+    assert outbox.stats()["failed"] == 1
+
+
+def test_retry_delay_grows_exponentially_up_to_max():
+    outbox = MailOutbox(backoff_initial=10, backoff_max=100)
+    assert 5 <= outbox.retry_delay(1) <= 10
+    assert 20 <= outbox.retry_delay(3) <= 40
+    assert 50 <= outbox.retry_delay(10) <= 100
+
+
+def test_workers_reuse_one_connection_each(tmp_path):
+    # file database: the StaticPool fixture shares one sqlite connection between threads
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session_local = sessionmaker(bind=engine)
+    connections = []
+
+    def connection_factory():
+        connections.append(FakeConnection())
+        return connections[-1]
+
+    session = session_local()
+    try:
+        ids = [make_outbound(session, f"c{i}@example.com").id for i in range(10)]
+    finally:
+        session.close()
+
+    outbox = MailOutbox(session_factory=session_local, connection_factory=connection_factory)
+    outbox.start(workers=2)
+    try:
+        for outbound_id in ids:
+            assert outbox.submit(outbound_id)
+        outbox.join()
+    finally:
+        outbox.stop()
+
+    assert len(connections) == 2
+    assert sum(len(c.sent) for c in connections) == 10
+    assert all(c.closed for c in connections)
+    assert outbox.stats()["sent"] == 10
+
+
+def test_submit_rejects_when_stopped_or_full(session_local):
+    outbox = MailOutbox(session_factory=session_local, connection_factory=FakeConnection, queue_size=1)
+    assert outbox.submit(1) is False
+
+    outbox.start(workers=1)
+    outbox.stop()
+    assert outbox.submit(1) is False
+
+
+def test_process_outbound_email_retries_queues_due_emails(session_local, monkeypatch):
+    session = session_local()
+    try:
+        due = make_outbound(session)
+        later = make_outbound(session)
+        later.next_attempt_at = outbox_module._utcnow() + timedelta(hours=1)
+        session.commit()
+        due_id = due.id
+    finally:
+        session.close()
+
+    outbox = MailOutbox(session_factory=session_local)
+    submitted = []
+    monkeypatch.setattr(outbox_module, "mail_outbox", outbox)
+    monkeypatch.setattr(MailOutbox, "running", property(lambda self: True))
+    monkeypatch.setattr(outbox, "submit", lambda outbound_id: submitted.append(outbound_id) or True)
+
+    outbox_module.process_outbound_email_retries()
+
+    assert submitted == [due_id]
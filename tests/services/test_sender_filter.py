@@ -0,0 +1,120 @@
+import os
+import types
+from unittest.mock import MagicMock
+
+from inq_service_svc.models import SenderFilterRule
+from inq_service_svc.models.enums import SenderFilterKind
+from inq_service_svc.services import email_processor
+from inq_service_svc.services.sender_filter import (
+    SenderFilter,
+    SenderFilterStore,
+    blacklist_rules,
+    parse_rule_lines,
+)
+
+
+def test_domain_rules_match_subdomains_only_on_label_boundaries():
+    sender_filter = SenderFilter(blacklist_rules(" Spam.Example ,other.test"))
+
+    assert sender_filter.match("a@spam.example") == "domain spam.example"
+    assert sender_filter.match("a@mail.SPAM.example") == "domain spam.example"
+    assert sender_filter.match("a@notspam.example") is None
+    assert sender_filter.match("a@example") is None
+    assert sender_filter.match("a@other.test.org") is None
+    assert sender_filter.match("") is None
+
+
+def test_address_subject_and_header_rules():
+    sender_filter = SenderFilter(
+        parse_rule_lines(
+            [
+                "# comment",
+                "",
+                "Bad.Person@example.com",
+                "subject:^\\[spam\\]",
+                "subject:(unsubscribe|newsletter)",
+                "header:X-Spam-Flag:^yes$",
+                "subject:([unclosed",
+            ]
+        )
+    )
+
+    assert sender_filter.size == 4
+    assert sender_filter.match("bad.person@EXAMPLE.com") == "address bad.person@example.com"
+    assert sender_filter.match("good@example.com") is None
+    assert sender_filter.match("good@example.com", "[SPAM] offer") == "subject rule"
+    assert sender_filter.match("good@example.com", "Weekly Newsletter") == "subject rule"
+    assert sender_filter.match("good@example.com", "Help please") is None
+    assert sender_filter.match("good@example.com", "Hi", {"x-spam-flag": ("YES",)}) == "header rule for x-spam-flag"
+    assert sender_filter.match("good@example.com", "Hi", {"x-spam-flag": ("no",)}) is None
+
+
+def test_many_domain_rules_still_match_exactly():
+    sender_filter = SenderFilter((SenderFilterKind.Domain, f"d{i}.example") for i in range(50000))
+
+    assert sender_filter.size == 50000
+    assert sender_filter.match("x@mx.d49999.example") == "domain d49999.example"
+    assert sender_filter.match("x@d50000.example") is None
+
+
+def test_store_reloads_when_file_or_table_changes(monkeypatch, tmp_path, db_session):
+    rules_file = tmp_path / "rules.txt"
+    rules_file.write_text("spam.example\n")
+    monkeypatch.setattr("inq_service_svc.config.EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr("inq_service_svc.config.EMAIL_SENDER_FILTER_FILE", str(rules_file))
+    store = SenderFilterStore()
+
+    first = store.get(db_session)
+    assert first.match("a@spam.example")
+    assert store.get(db_session) is first
+    assert store.reloads == 1
+
+    rules_file.write_text("spam.example\nsubject:lottery\n")
+    os.utime(rules_file, ns=(0, 10**9))
+    assert store.get(db_session).match("a@ok.example", "You won the lottery")
+
+    db_session.add(SenderFilterRule(kind=SenderFilterKind.Address, pattern="x@ok.example"))
+    db_session.commit()
+    assert store.get(db_session).match("x@ok.example")
+    assert store.reloads == 3
+
+
+def test_store_retries_when_rule_table_cannot_be_read(monkeypatch, db_session):
+    monkeypatch.setattr("inq_service_svc.config.EMAIL_DOMAIN_BLACKLIST", "")
+    monkeypatch.setattr("inq_service_svc.config.EMAIL_SENDER_FILTER_FILE", "")
+    db_session.add(SenderFilterRule(kind=SenderFilterKind.Address, pattern="x@ok.example"))
+    db_session.commit()
+    store = SenderFilterStore()
+
+    execute = db_session.execute
+    calls = []
+
+    def failing_rule_query(statement, *args, **kwargs):
+        calls.append(statement)
+        if len(calls) == 2:
+            raise RuntimeError("rule table unavailable")
+        return execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db_session, "execute", failing_rule_query)
+    assert store.get(db_session).match("x@ok.example") is None
+
+    monkeypatch.setattr(db_session, "execute", execute)
+    assert store.get(db_session).match("x@ok.example")
+    assert store.reloads == 2
+
+
+def test_process_incoming_emails_skips_blacklisted_subdomain(monkeypatch):
+    monkeypatch.setattr(email_processor.config, "EMAIL_DOMAIN_BLACKLIST", "spam.example")
+    msgs = [
+        types.SimpleNamespace(from_="A <a@mail.spam.example>", subject="S", text="T", html=None),
+        types.SimpleNamespace(from_="B <b@ok.example>", subject="S", text="T", html=None),
+    ]
+    monkeypatch.setattr(email_processor, "fetch_emails", MagicMock(return_value=msgs))
+    monkeypatch.setattr(email_processor, "SessionLocal", MagicMock(return_value=MagicMock()))
+    mock_create = MagicMock(return_value=[1])
+    monkeypatch.setattr(email_processor.inquiry_service, "create_inquiries", mock_create)
+
+    email_processor.process_incoming_emails()
+
+    (inquiry,) = mock_create.call_args.args[1]
+    assert str(inquiry.customer_email) == "b@ok.example"
@@ -0,0 +1,177 @@
+import random
+from collections import Counter
+
+import pytest
+from unittest.mock import patch
+
+from inq_service_svc.models import User, Inquiry, UserRole, InquiryStatus
+from inq_service_svc.services.inquiry_service import (
+    assign_staff,
+    build_workload_query,
+    create_inquiries,
+    create_inquiry,
+)
+from inq_service_svc.services.classifier import ClassificationResult
+from inq_service_svc.services.staff_assigner import StaffAssigner, staff_assigner
+from inq_service_svc.schemas.inquiry import InquiryCreate
+
+
+@pytest.fixture
+def loaded_assigner():
+    yield staff_assigner
+    staff_assigner.reset()
+
+
+def make_user(db_session, email: str, role: UserRole = UserRole.Staff) -> User:
+    user = User(email=email, hashed_password="h", name=email.split("@")[0], role=role)
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def sql_pick(db_session):
+    row = db_session.execute(build_workload_query()).first()
+    return row[0] if row else None
+
+
+def test_empty_assigner_returns_none(db_session):
+    assigner = StaffAssigner()
+    assert assigner.pick() is None
+    make_user(db_session, "admin@example.com", UserRole.Admin)
+    assert assigner.load(db_session) == 0
+    assert assigner.ready
+    assert assigner.pick() is None
+
+
+def test_load_matches_sql_tie_breaking(db_session):
+    staff = [make_user(db_session, f"s{i}@example.com") for i in range(4)]
+    make_user(db_session, "admin@example.com", UserRole.Admin)
+    # workloads 2, 1, 1, 3 -> lowest count tie broken by the smaller id
+    for user, count in zip(staff, (2, 1, 1, 3)):
+        for n in range(count):
+            db_session.add(Inquiry(title="T", content="C", customer_email="c@example.com", assigned_user_id=user.id))
+    db_session.commit()
+
+    assigner = StaffAssigner()
+    assert assigner.load(db_session) == 4
+    assert assigner.pick() == sql_pick(db_session) == staff[1].id
+
+
+def test_assigner_follows_committed_changes(db_session, loaded_assigner):
+    staff_a = make_user(db_session, "a@example.com")
+    staff_b = make_user(db_session, "b@example.com")
+    loaded_assigner.load(db_session)
+
+    data = InquiryCreate(title="T", content="C", customer_email="c@example.com")
+    classification = ClassificationResult(category="General", urgency="Low")
+    picks = []
+    with patch("inq_service_svc.services.inquiry_service.build_workload_query") as mock_query:
+        for _ in range(4):
+            picks.append(create_inquiry(db_session, data, classification).assigned_user_id)
+        # no query while the assigner is loaded
+        mock_query.assert_not_called()
+    assert picks == [staff_a.id, staff_b.id, staff_a.id, staff_b.id]
+
+    # completing one of staff_b's inquiries makes staff_b the least loaded
+    inquiry = db_session.query(Inquiry).filter_by(assigned_user_id=staff_b.id).first()
+    inquiry.status = InquiryStatus.Completed
+    db_session.commit()
+    assert assign_staff(db_session) == sql_pick(db_session) == staff_b.id
+
+    # demoting staff_b removes them; a new staff user starts at zero
+    staff_b.role = UserRole.Admin
+    db_session.commit()
+    assert assign_staff(db_session) == sql_pick(db_session) == staff_a.id
+    staff_c = make_user(db_session, "c@example.com")
+    assert assign_staff(db_session) == sql_pick(db_session) == staff_c.id
+
+    db_session.delete(staff_c)
+    db_session.commit()
+    assert assign_staff(db_session) == sql_pick(db_session) == staff_a.id
+
+
+def test_rolled_back_changes_are_not_applied(db_session, loaded_assigner):
+    staff_a = make_user(db_session, "a@example.com")
+    staff_b = make_user(db_session, "b@example.com")
+    loaded_assigner.load(db_session)
+
+    db_session.add(Inquiry(title="T", content="C", customer_email="c@example.com", assigned_user_id=staff_a.id))
+    db_session.flush()
+    db_session.rollback()
+
+    assert loaded_assigner.pick() == staff_a.id
+
+
+def test_stale_heap_entries_are_compacted(db_session):
+    staff = make_user(db_session, "a@example.com")
+    assigner = StaffAssigner()
+    assigner.load(db_session)
+    for _ in range(100):
+        assigner.apply({staff.id: 1}, {})
+    assert assigner.pick() == staff.id
+    assert len(assigner._heap) <= 2 * 1 + 16
+
+
+def test_assigner_spreads_uncommitted_batch(db_session, loaded_assigner):
+    staff_a = make_user(db_session, "a@example.com")
+    staff_b = make_user(db_session, "b@example.com")
+    loaded_assigner.load(db_session)
+
+    data = InquiryCreate(title="T", content="C", customer_email="c@example.com")
+    classification = ClassificationResult(category="General", urgency="Low")
+    # one transaction: earlier picks are only flushed, not committed, when the next one is made
+    picks = [create_inquiry(db_session, data, classification, commit=False).assigned_user_id for _ in range(4)]
+    db_session.commit()
+
+    assert picks == [staff_a.id, staff_b.id, staff_a.id, staff_b.id]
+    assert loaded_assigner.pick() == sql_pick(db_session) == staff_a.id
+
+
+def test_assigner_follows_bulk_created_inquiries(db_session, loaded_assigner):
+    staff_a = make_user(db_session, "ba@example.com")
+    staff_b = make_user(db_session, "bb@example.com")
+    loaded_assigner.load(db_session)
+
+    items = [InquiryCreate(title=f"T{i}", content="C", customer_email="c@example.com") for i in range(3)]
+    classification = ClassificationResult(category="General", urgency="Low")
+    create_inquiries(db_session, items, [classification] * 3)
+
+    # bulk inserts bypass the flush hook but still publish their deltas on commit
+    assert loaded_assigner.snapshot() == {staff_a.id: 2, staff_b.id: 1}
+    assert loaded_assigner.pick() == sql_pick(db_session) == staff_b.id
+
+
+def test_pick_with_pending_deltas_matches_full_scan():
+    rng = random.Random(7)
+    assigner = StaffAssigner()
+    assigner.ready = True
+    assigner.apply({user_id: rng.randrange(5) for user_id in range(40)}, {user_id: True for user_id in range(40)})
+
+    def new_transaction():
+        return {"deltas": Counter(), "staff": {}, "changed": set()}
+
+    def record(pending, user_id, delta):
+        pending["deltas"][user_id] += delta
+        pending["changed"].add(user_id)
+
+    pending = new_transaction()
+    for _ in range(2000):
+        step = rng.random()
+        if step < 0.5:
+            counts = assigner.snapshot(pending["deltas"])
+            expected = min(((count, user_id) for user_id, count in counts.items()), default=(None, None))[1]
+            picked = assigner.pick(pending)
+            assert picked == expected
+            if picked is not None:
+                record(pending, picked, 1)
+        elif step < 0.55:
+            # e.g. an inquiry completed earlier in the same transaction
+            record(pending, rng.randrange(40), -1)
+        elif step < 0.9:
+            # committed by other transactions while this one is open
+            assigner.apply({rng.randrange(40): rng.choice((1, 1, 2, -1, -3))}, {})
+        elif step < 0.97:
+            assigner.apply({}, {rng.randrange(45): rng.random() > 0.3})
+        else:
+            pending = new_transaction()
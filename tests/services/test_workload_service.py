@@ -0,0 +1,112 @@
+from unittest.mock import MagicMock
+
+from sqlalchemy import update
+
+from inq_service_svc.models import User, Inquiry, StaffWorkload, UserRole, InquiryStatus
+from inq_service_svc.services import workload_service
+from inq_service_svc.services.workload_service import reconcile_staff_workloads
+
+
+def make_staff(db_session, email: str, role: UserRole = UserRole.Staff) -> User:
+    user = User(email=email, hashed_password="h", name=email.split("@")[0], role=role)
+    db_session.add(user)
+    db_session.commit()
+    db_session.refresh(user)
+    return user
+
+
+def workload(db_session, user_id: int) -> int:
+    db_session.expire_all()
+    row = db_session.get(StaffWorkload, user_id)
+    return row.active_count if row is not None else None
+
+
+def test_new_user_gets_zero_counter(db_session):
+    staff = make_staff(db_session, "zero@example.com")
+    assert workload(db_session, staff.id) == 0
+
+
+def test_counter_follows_inquiry_lifecycle(db_session):
+    staff_a = make_staff(db_session, "a@example.com")
+    staff_b = make_staff(db_session, "b@example.com")
+
+    inq = Inquiry(title="T", content="C", customer_email="c@example.com", assigned_user_id=staff_a.id)
+    db_session.add(inq)
+    db_session.commit()
+    assert workload(db_session, staff_a.id) == 1
+
+    # InProgress is not an active status
+    inq.status = InquiryStatus.InProgress
+    db_session.commit()
+    assert workload(db_session, staff_a.id) == 0
+
+    inq.status = InquiryStatus.On_Hold
+    db_session.commit()
+    assert workload(db_session, staff_a.id) == 1
+
+    # reassignment moves the count
+    inq.assigned_user_id = staff_b.id
+    db_session.commit()
+    assert workload(db_session, staff_a.id) == 0
+    assert workload(db_session, staff_b.id) == 1
+
+    inq.status = InquiryStatus.Completed
+    db_session.commit()
+    assert workload(db_session, staff_b.id) == 0
+
+
+def test_counter_set_through_relationship_and_delete(db_session):
+    staff = make_staff(db_session, "rel@example.com")
+    inq = Inquiry(title="T", content="C", customer_email="c@example.com", assigned_user=staff)
+    db_session.add(inq)
+    db_session.commit()
+    assert workload(db_session, staff.id) == 1
+
+    db_session.delete(inq)
+    db_session.commit()
+    assert workload(db_session, staff.id) == 0
+
+
+def test_rollback_discards_counter_change(db_session):
+    staff = make_staff(db_session, "rb@example.com")
+    db_session.add(Inquiry(title="T", content="C", customer_email="c@example.com", assigned_user_id=staff.id))
+    db_session.flush()
+    db_session.rollback()
+    assert workload(db_session, staff.id) == 0
+
+
+def test_reconcile_corrects_drift_and_creates_missing_rows(db_session):
+    staff = make_staff(db_session, "drift@example.com")
+    other = make_staff(db_session, "other@example.com")
+    db_session.add_all(
+        [
+            Inquiry(title="A", content="C", customer_email="c@example.com", assigned_user_id=staff.id),
+            Inquiry(title="B", content="C", customer_email="c@example.com", assigned_user_id=staff.id, status=InquiryStatus.Completed),
+        ]
+    )
+    db_session.commit()
+
+    # simulate drift and a missing row
+    db_session.execute(update(StaffWorkload).where(StaffWorkload.user_id == staff.id).values(active_count=7))
+    db_session.delete(db_session.get(StaffWorkload, other.id))
+    db_session.commit()
+
+    changed = reconcile_staff_workloads(db_session)
+    assert changed == 2
+    assert workload(db_session, staff.id) == 1
+    assert workload(db_session, other.id) == 0
+
+    # a second run finds nothing to fix
+    assert reconcile_staff_workloads(db_session) == 0
+
+
+def test_process_workload_reconciliation_closes_session(monkeypatch):
+    mock_session = MagicMock()
+    monkeypatch.setattr(workload_service, "SessionLocal", MagicMock(return_value=mock_session))
+    mock_reconcile = MagicMock(return_value=0)
+    monkeypatch.setattr(workload_service, "reconcile_staff_workloads", mock_reconcile)
+
+    workload_service.process_workload_reconciliation()
+
+    mock_reconcile.assert_called_once_with(mock_session)
+    mock_session.close.assert_called_once()
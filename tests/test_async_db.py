@@ -0,0 +1,52 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from inq_service_svc.models import User, UserRole, Inquiry, InquiryStatus
+from inq_service_svc.models.base import to_async_url, get_async_db
+from inq_service_svc.schemas.inquiry import InquiryCreate
+from inq_service_svc.services import inquiry_service
+from inq_service_svc.services.classifier import ClassificationResult
+
+
+@pytest.mark.parametrize(
+    "url, expected",
+    [
+        ("sqlite:///app.db", "sqlite+aiosqlite:///app.db"),
+        ("postgresql://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql+psycopg2://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+        ("postgresql+asyncpg://u:p@db/app", "postgresql+asyncpg://u:p@db/app"),
+    ],
+)
+def test_to_async_url_swaps_driver(url, expected):
+    assert to_async_url(url) == expected
+
+
+@pytest.mark.anyio
+async def test_get_async_db_yields_async_session():
+    gen = get_async_db()
+    session = await gen.__anext__()
+    assert isinstance(session, AsyncSession)
+    await gen.aclose()
+
+
+@pytest.mark.anyio
+async def test_create_inquiry_async_persists_via_aiosqlite(db_session, async_session_local, monkeypatch):
+    staff = User(email="asyncstaff@example.com", hashed_password="h", name="S", role=UserRole.Staff)
+    db_session.add(staff)
+    db_session.commit()
+    db_session.refresh(staff)
+
+    monkeypatch.setattr(
+        inquiry_service, "classify_inquiry", lambda title, content: ClassificationResult(category="Billing", urgency="Low")
+    )
+
+    payload = InquiryCreate(title="Async", content="via aiosqlite", customer_email="a@test.com", customer_name=None)
+    async with async_session_local() as db:
+        created = await inquiry_service.create_inquiry_async(db, payload)
+        assert created.id is not None
+        assert created.category == "Billing"
+        assert created.assigned_user_id == staff.id
+
+        fetched = (await db.execute(select(Inquiry).where(Inquiry.id == created.id))).scalar_one()
+        assert fetched.status == InquiryStatus.New
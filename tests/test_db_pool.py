@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from inq_service_svc import config
+from inq_service_svc.models import base
+from inq_service_svc.models.pool import InstrumentedQueuePool, engine_options, instrument_engine, describe_pool
+
+
+def test_engine_options_sqlite_keeps_default_pool():
+    options = engine_options("sqlite:///:memory:")
+    assert "poolclass" not in options
+    assert "pool_size" not in options
+    assert options["pool_pre_ping"] == config.DB_POOL_PRE_PING
+
+
+def test_engine_options_server_database_uses_configured_pool(monkeypatch):
+    monkeypatch.setattr(config, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(config, "DB_MAX_OVERFLOW", 3)
+    monkeypatch.setattr(config, "DB_POOL_TIMEOUT", 2.5)
+    monkeypatch.setattr(config, "DB_POOL_RECYCLE", 600)
+    monkeypatch.setattr(config, "DB_POOL_PRE_PING", True)
+
+    options = engine_options("postgresql://user:pw@db/app")
+    assert options["poolclass"] is InstrumentedQueuePool
+    assert options["pool_size"] == 7
+    assert options["max_overflow"] == 3
+    assert options["pool_timeout"] == 2.5
+    assert options["pool_recycle"] == 600
+    assert options["pool_pre_ping"] is True
+
+
+def test_instrumented_pool_tracks_in_use_and_waits(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    stats = instrument_engine(engine)
+
+    conn = engine.connect()
+    conn.execute(text("SELECT 1"))
+    assert stats.in_use == 1
+
+    # pool exhausted: a second checkout waits for pool_timeout and then fails
+    errors = []
+
+    def second_checkout():
+        try:
+            engine.connect()
+        except PoolTimeoutError as e:
+            errors.append(e)
+
+    t = threading.Thread(target=second_checkout)
+    t.start()
+    t.join()
+    assert len(errors) == 1
+
+    conn.close()
+    info = describe_pool(engine, stats)
+    assert info["in_use"] == 0
+    assert info["peak_in_use"] == 1
+    assert info["pool_size"] == 1
+    assert info["timeouts"] == 1
+    assert info["wait_count"] == 2
+    assert info["wait_seconds_max"] >= 0.05
+    engine.dispose()
+
+
+def test_get_db_reuses_module_session_factory(monkeypatch):
+    created = []
+    original = base.SessionLocal
+
+    def factory():
+        session = original()
+        created.append(session)
+        return session
+
+    monkeypatch.setattr(base, "SessionLocal", factory)
+    gen = base.get_db()
+    session = next(gen)
+    assert created == [session]
+    with pytest.raises(StopIteration):
+        next(gen)
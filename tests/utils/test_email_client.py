@@ -1,8 +1,9 @@
 import logging
+import smtplib
 from unittest.mock import MagicMock, patch
 
 import pytest
-from imap_tools import AND
+from imap_tools import AND, MailMessageFlags, U
 
 from inq_service_svc.utils import email_client
 
@@ -32,8 +33,8 @@ def test_fetch_emails_happy_path(monkeypatch):
     mock_mailbox_cls.return_value.login.assert_called_with(
         "me@example.com", "secret", initial_folder="INBOX"
     )
-    # Verify fetch called with unread criteria and limit
-    mailbox_cm.fetch.assert_called_with(AND(seen=False), limit=2)
+    # Verify fetch called with unread criteria and limit, bodies fetched in bulk
+    mailbox_cm.fetch.assert_called_with(AND(seen=False), limit=2, mark_seen=False, bulk=True)
     assert result == ["msg1", "msg2"]
 
 
@@ -46,7 +47,7 @@ def test_fetch_emails_only_unread_flag_false(monkeypatch):
     with patch("inq_service_svc.utils.email_client.MailBox", mock_mailbox_cls):
         result = email_client.fetch_emails(limit=2, folder="INBOX", only_unread=False)
 
-    mailbox_cm.fetch.assert_called_with(limit=2)
+    mailbox_cm.fetch.assert_called_with(limit=2, mark_seen=False, bulk=True)
     assert result == ["msg1", "msg2"]
 
 
@@ -107,3 +108,94 @@ def test_send_email_failure_logs_and_raises(monkeypatch):
                 email_client.send_email("you@example.com", "subject", "body")
             mock_log_error.assert_called_once()
             assert mock_log_error.call_args.kwargs.get("exc_info") is True
+
+
+def test_fetch_emails_reuses_given_mailbox(monkeypatch):
+    setup_config(monkeypatch)
+    mock_mailbox_cls = MagicMock()
+    mailbox = MagicMock()
+    mailbox.fetch.return_value = ["msg1"]
+
+    with patch("inq_service_svc.utils.email_client.MailBox", mock_mailbox_cls):
+        result = email_client.fetch_emails(limit=5, mailbox=mailbox)
+
+    mock_mailbox_cls.assert_not_called()
+    mailbox.fetch.assert_called_with(AND(seen=False), limit=5, mark_seen=False, bulk=True)
+    mailbox.logout.assert_not_called()
+    assert result == ["msg1"]
+
+
+def make_uid_msg(uid):
+    msg = MagicMock()
+    msg.uid = str(uid)
+    return msg
+
+
+def test_fetch_emails_with_watermark_searches_newer_uids(monkeypatch):
+    setup_config(monkeypatch)
+    mailbox = MagicMock()
+    mailbox.folder.status.return_value = {"UIDVALIDITY": 7}
+    # "UID 11:*" also returns the newest message when no UID is above 10
+    mailbox.fetch.return_value = [make_uid_msg(10), make_uid_msg(12), make_uid_msg(15)]
+    watermark = email_client.UidWatermark(uid_validity=7, last_uid=10)
+
+    result = email_client.fetch_emails(limit=50, mailbox=mailbox, watermark=watermark)
+
+    mailbox.fetch.assert_called_with(AND(seen=False, uid=U(11, "*")), limit=50, mark_seen=False, bulk=True)
+    assert [m.uid for m in result] == ["12", "15"]
+    assert watermark == email_client.UidWatermark(uid_validity=7, last_uid=15)
+
+
+def test_fetch_emails_resets_watermark_when_uidvalidity_changes(monkeypatch):
+    setup_config(monkeypatch)
+    mailbox = MagicMock()
+    mailbox.folder.status.return_value = {"UIDVALIDITY": 8}
+    mailbox.fetch.return_value = [make_uid_msg(1)]
+    watermark = email_client.UidWatermark(uid_validity=7, last_uid=500)
+
+    result = email_client.fetch_emails(limit=50, mailbox=mailbox, watermark=watermark)
+
+    mailbox.fetch.assert_called_with(AND(seen=False), limit=50, mark_seen=False, bulk=True)
+    assert len(result) == 1
+    assert watermark == email_client.UidWatermark(uid_validity=8, last_uid=1)
+
+
+def test_mark_emails_seen_flags_uids_on_given_mailbox(monkeypatch):
+    setup_config(monkeypatch)
+    mock_mailbox_cls = MagicMock()
+    mailbox = MagicMock()
+
+    with patch("inq_service_svc.utils.email_client.MailBox", mock_mailbox_cls):
+        email_client.mark_emails_seen([12, "15"], mailbox=mailbox)
+        email_client.mark_emails_seen([], mailbox=mailbox)
+
+    mock_mailbox_cls.assert_not_called()
+    mailbox.flag.assert_called_once_with(["12", "15"], MailMessageFlags.SEEN, True)
+
+    mailbox.flag.side_effect = Exception("connection reset")
+    with pytest.raises(RuntimeError):
+        email_client.mark_emails_seen(["12"], mailbox=mailbox)
+
+
+def test_smtp_connection_reuses_session_and_reconnects_once(monkeypatch):
+    setup_config(monkeypatch)
+    mock_smtp_cls = MagicMock()
+    smtp = mock_smtp_cls.return_value
+
+    with patch("inq_service_svc.utils.email_client.smtplib.SMTP", mock_smtp_cls):
+        connection = email_client.SmtpConnection()
+        for i in range(3):
+            connection.send(email_client.build_email_message("you@example.com", f"subject {i}", "body"))
+        assert mock_smtp_cls.call_count == 1
+        smtp.starttls.assert_called_once()
+        smtp.login.assert_called_once_with("me@example.com", "secret")
+        assert smtp.send_message.call_count == 3
+
+        # the server dropped the idle session: reconnect and resend
+        smtp.send_message.side_effect = [smtplib.SMTPServerDisconnected("idle"), None]
+        connection.send(email_client.build_email_message("you@example.com", "again", "body"))
+        assert mock_smtp_cls.call_count == 2
+        assert connection.connects == 2
+
+        connection.close()
+        assert not connection.connected
@@ -0,0 +1,19 @@
+from datetime import datetime
+
+import pytest
+
+from inq_service_svc.utils.pagination import encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 15, 12, 30, 45)
+    token = encode_cursor(created_at, 42)
+    assert isinstance(token, str)
+    assert "=" not in token
+    assert decode_cursor(token) == (created_at, 42)
+
+
+@pytest.mark.parametrize("token", ["", "%%%", "bm90LWpzb24", "WzFd"])
+def test_decode_cursor_rejects_malformed_tokens(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
@@ -44,3 +44,11 @@ async def test_shutdown_scheduler_is_idempotent():
     s = init_scheduler()
     await shutdown_scheduler()
     await shutdown_scheduler()
+
+
+@pytest.mark.anyio
+async def test_jobs_are_not_overlapped_by_default():
+    s = init_scheduler()
+    job = s.add_job(lambda: None, "interval", minutes=1, id="overlap_check")
+    assert job.max_instances == 1
+    assert job.coalesce is True
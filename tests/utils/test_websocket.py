@@ -1,9 +1,11 @@
+import asyncio
 import logging
 from unittest.mock import AsyncMock
 
 import pytest
 
-from inq_service_svc.utils.websocket_manager import ConnectionManager
+from inq_service_svc.models.enums import InquiryStatus
+from inq_service_svc.utils.websocket_manager import ConnectionManager, inquiry_topics
 
 
 class DummyWebSocket:
@@ -11,6 +13,7 @@ class DummyWebSocket:
         # async methods
         self.accept = AsyncMock()
         self.send_text = AsyncMock()
+        self.close = AsyncMock()
 
     def __hash__(self):
         # make instances hashable so they can be stored in a set
@@ -20,6 +23,20 @@ class DummyWebSocket:
         return f"<DummyWebSocket {id(self)}>"
 
 
+class GatedWebSocket(DummyWebSocket):
+    """Records messages but only completes a send once ``gate`` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = asyncio.Event()
+        self.received = []
+        self.send_text = self._send
+
+    async def _send(self, message):
+        await self.gate.wait()
+        self.received.append(message)
+
+
 @pytest.mark.anyio
 async def test_connect_adds_connection_and_accept_called():
     manager = ConnectionManager()
@@ -46,6 +63,7 @@ async def test_broadcast_sends_to_all_connections():
     await manager.connect(ws1)
     await manager.connect(ws2)
     await manager.broadcast("hello")
+    await manager.drain()
     ws1.send_text.assert_awaited_once_with("hello")
     ws2.send_text.assert_awaited_once_with("hello")
 
@@ -61,7 +79,243 @@ async def test_broadcast_logs_and_continues_on_send_error(caplog):
     await manager.connect(ws2)
     with caplog.at_level(logging.ERROR):
         await manager.broadcast("msg")
+        await manager.drain()
     # second websocket still received
     ws2.send_text.assert_awaited_once_with("msg")
-    # error was logged
+    # error was logged and the failing connection removed
+    assert ws1 not in manager.active_connections
     assert any("boom" in rec.getMessage() for rec in caplog.records)
+
+
+@pytest.mark.anyio
+async def test_publish_reaches_only_topic_subscribers_once():
+    manager = ConnectionManager(default_topics=())
+    everything = DummyWebSocket()
+    watcher = DummyWebSocket()
+    assignee = DummyWebSocket()
+    other = DummyWebSocket()
+    await manager.connect(everything, ["all"])
+    await manager.connect(watcher, ["inquiry:1", "status:New"])
+    await manager.connect(assignee, ["assignee:7"])
+    await manager.connect(other, ["inquiry:2"])
+
+    await manager.publish(inquiry_topics(1, ["New"], [7]), "update")
+    await manager.drain()
+
+    everything.send_text.assert_awaited_once_with("update")
+    watcher.send_text.assert_awaited_once_with("update")
+    assignee.send_text.assert_awaited_once_with("update")
+    other.send_text.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_status_topics_use_published_status_values():
+    manager = ConnectionManager(default_topics=())
+    ws = DummyWebSocket()
+    await manager.connect(ws, ["status:On-Hold"])
+    # the member name is not a topic anything is published to
+    with pytest.raises(ValueError):
+        manager.subscribe(ws, ["status:On_Hold"])
+    with pytest.raises(ValueError):
+        manager.subscribe(ws, ["status:Bogus"])
+
+    await manager.publish(inquiry_topics(1, [InquiryStatus.On_Hold.value]), "held")
+    await manager.drain()
+
+    ws.send_text.assert_awaited_once_with("held")
+
+
+@pytest.mark.anyio
+async def test_unsubscribe_and_disconnect_clean_the_topic_index():
+    manager = ConnectionManager(max_subscriptions=2)
+    ws = DummyWebSocket()
+    await manager.connect(ws)
+    assert manager.subscriptions[ws] == {"all"}
+
+    assert manager.subscribe(ws, ["inquiry:5"]) == {"all", "inquiry:5"}
+    with pytest.raises(ValueError):
+        manager.subscribe(ws, ["status:New"])
+    with pytest.raises(ValueError):
+        manager.subscribe(ws, ["inquiry:abc"])
+    assert manager.unsubscribe(ws, ["all"]) == {"inquiry:5"}
+
+    await manager.publish(["inquiry:6"], "ignored")
+    await manager.drain()
+    ws.send_text.assert_not_awaited()
+
+    manager.disconnect(ws)
+    assert manager.topics == {}
+    assert manager.subscriptions == {}
+
+
+@pytest.mark.anyio
+async def test_slow_client_does_not_delay_others():
+    manager = ConnectionManager()
+    slow = GatedWebSocket()
+    fast = DummyWebSocket()
+    await manager.connect(slow)
+    await manager.connect(fast)
+
+    for i in range(3):
+        await manager.broadcast(f"m{i}")
+    await asyncio.sleep(0.01)
+
+    assert [call.args[0] for call in fast.send_text.await_args_list] == ["m0", "m1", "m2"]
+    assert slow.received == []
+    assert manager.stats()["queued"] == 2
+
+    slow.gate.set()
+    await manager.drain()
+    assert slow.received == ["m0", "m1", "m2"]
+
+
+async def _fill(manager, ws, messages):
+    # the first message is taken by the blocked writer, the rest stay queued
+    key, message = messages[0]
+    await manager.publish(["all"], message, key=key)
+    await asyncio.sleep(0)
+    for key, message in messages[1:]:
+        await manager.publish(["all"], message, key=key)
+
+
+@pytest.mark.anyio
+async def test_full_queue_drop_oldest():
+    manager = ConnectionManager(queue_size=2)
+    ws = GatedWebSocket()
+    await manager.connect(ws)
+    await _fill(manager, ws, [(None, "m1"), (None, "m2"), (None, "m3"), (None, "m4")])
+
+    ws.gate.set()
+    await manager.drain()
+    assert ws.received == ["m1", "m3", "m4"]
+    assert manager.stats()["dropped"] == 1
+    assert manager.stats()["queue_depth_peak"] == 2
+
+
+@pytest.mark.anyio
+async def test_full_queue_coalesces_same_key():
+    manager = ConnectionManager(queue_size=2, policy="coalesce")
+    ws = GatedWebSocket()
+    await manager.connect(ws)
+    await _fill(manager, ws, [("a", "a1"), ("a", "a2"), ("b", "b1"), ("a", "a3")])
+
+    ws.gate.set()
+    await manager.drain()
+    assert ws.received == ["a1", "a3", "b1"]
+    assert manager.stats()["coalesced"] == 1
+    assert manager.stats()["dropped"] == 0
+
+
+@pytest.mark.anyio
+async def test_full_queue_disconnect_evicts_client():
+    manager = ConnectionManager(queue_size=2, policy="disconnect")
+    ws = GatedWebSocket()
+    await manager.connect(ws)
+    await _fill(manager, ws, [(None, "m1"), (None, "m2"), (None, "m3"), (None, "m4")])
+    await asyncio.sleep(0.01)
+
+    assert ws not in manager.active_connections
+    assert manager.topics == {}
+    ws.close.assert_awaited_once_with(code=1013)
+    assert manager.stats()["evicted"] == 1
+
+
+@pytest.mark.anyio
+async def test_send_timeout_evicts_stalled_client():
+    manager = ConnectionManager(send_timeout=0.05)
+    ws = GatedWebSocket()
+    await manager.connect(ws)
+
+    await manager.broadcast("stuck")
+    await asyncio.sleep(0.2)
+
+    assert ws not in manager.active_connections
+    ws.close.assert_awaited_once_with(code=1013)
+    assert manager.stats()["evicted"] == 1
+
+
+def test_unknown_queue_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ConnectionManager(policy="block")
+
+
+@pytest.mark.anyio
+async def test_coalesce_window_batches_events_and_keeps_latest_state():
+    manager = ConnectionManager(coalesce_window=0.05)
+    ws = DummyWebSocket()
+    await manager.connect(ws)
+
+    await manager.publish(["inquiry:1"], '{"id": 1, "v": 1}', key="inquiry_updated:1")
+    await manager.publish(["inquiry:2"], '{"id": 2, "v": 1}', key="inquiry_updated:2")
+    await manager.publish(["inquiry:1"], '{"id": 1, "v": 2}', key="inquiry_updated:1")
+    await manager.publish(["inquiry:3"], '{"id": 3}')
+    assert ws.send_text.await_count == 0
+    await manager.drain()
+
+    ws.send_text.assert_awaited_once_with('[{"id": 1, "v": 2},{"id": 2, "v": 1},{"id": 3}]')
+    stats = manager.stats()
+    assert stats["collapsed"] == 1
+    assert stats["sent"] == 3
+    assert stats["frames"] == 1
+
+
+@pytest.mark.anyio
+async def test_coalesce_window_limits_batch_and_sends_replies_alone():
+    manager = ConnectionManager(coalesce_window=0.05, batch_max=2)
+    ws = DummyWebSocket()
+    await manager.connect(ws)
+
+    for i in range(3):
+        await manager.publish(["all"], str(i))
+    await manager.send(ws, "pong")
+    await manager.publish(["all"], "3")
+    await manager.drain()
+
+    sent = [call.args[0] for call in ws.send_text.await_args_list]
+    assert sent == ["[0,1]", "2", "pong", "3"]
+    assert manager.stats()["frames"] == 4
+
+
+@pytest.mark.anyio
+async def test_audience_events_reach_affected_users_and_admins_only():
+    manager = ConnectionManager()
+    assignee = DummyWebSocket()
+    previous = DummyWebSocket()
+    admin = DummyWebSocket()
+    muted_admin = DummyWebSocket()
+    bystander = DummyWebSocket()
+    await manager.connect(assignee, [], user_id=1, role="Staff")
+    await manager.connect(previous, user_id=2, role="Staff")
+    await manager.connect(admin, user_id=3, role="Admin")
+    await manager.connect(muted_admin, [], user_id=4, role="Admin")
+    await manager.connect(bystander, user_id=5, role="Staff")
+
+    await manager.publish(inquiry_topics(9, ["New"], [2, 1]), "reassigned", audience=[2, 1, None])
+    await manager.publish(inquiry_topics(9, ["New"]), "status")
+    await manager.drain()
+
+    assert [call.args[0] for call in assignee.send_text.await_args_list] == ["reassigned"]
+    assert [call.args[0] for call in previous.send_text.await_args_list] == ["reassigned", "status"]
+    assert [call.args[0] for call in admin.send_text.await_args_list] == ["reassigned", "status"]
+    muted_admin.send_text.assert_not_awaited()
+    assert [call.args[0] for call in bystander.send_text.await_args_list] == ["status"]
+
+
+@pytest.mark.anyio
+async def test_staff_cannot_subscribe_to_other_assignees():
+    manager = ConnectionManager()
+    staff = DummyWebSocket()
+    admin = DummyWebSocket()
+    await manager.connect(staff, user_id=1, role="Staff")
+    await manager.connect(admin, user_id=2, role="Admin")
+
+    assert "assignee:1" in manager.subscribe(staff, ["assignee:1"])
+    with pytest.raises(ValueError):
+        manager.subscribe(staff, ["assignee:2"])
+    with pytest.raises(ValueError):
+        await manager.connect(DummyWebSocket(), ["assignee:2"], user_id=1, role="Staff")
+    assert "assignee:1" in manager.subscribe(admin, ["assignee:1"])
+
+    manager.disconnect(staff)
+    assert manager.users == {2: {admin}}
+    assert manager.roles == {"Admin": {admin}}
@@ -0,0 +1,176 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from inq_service_svc.utils.websocket_backplane import (
+    InProcessBackplane,
+    InProcessHub,
+    PostgresBackplane,
+    UnixSocketBackplane,
+    build_backplane,
+    postgres_dsn,
+)
+from inq_service_svc.utils.websocket_manager import ConnectionManager
+
+
+class DummyWebSocket:
+    def __init__(self):
+        self.accept = AsyncMock()
+        self.send_text = AsyncMock()
+        self.close = AsyncMock()
+
+    def __hash__(self):
+        return id(self)
+
+
+def sent(ws):
+    return [call.args[0] for call in ws.send_text.await_args_list]
+
+
+@pytest.mark.anyio
+async def test_in_process_backplane_relays_to_other_managers_once():
+    hub = InProcessHub()
+    worker_a = ConnectionManager(default_topics=())
+    worker_b = ConnectionManager(default_topics=())
+    await worker_a.start_backplane(InProcessBackplane(hub))
+    await worker_b.start_backplane(InProcessBackplane(hub))
+    local = DummyWebSocket()
+    remote = DummyWebSocket()
+    bystander = DummyWebSocket()
+    await worker_a.connect(local, ["all"])
+    await worker_b.connect(remote, ["inquiry:1"])
+    await worker_b.connect(bystander, ["inquiry:2"])
+
+    await worker_a.publish(["inquiry:1"], "update", key="inquiry_updated:1")
+    await worker_a.broadcast("notice")
+    await worker_a.drain()
+    await worker_b.drain()
+
+    assert sent(local) == ["update", "notice"]
+    assert sent(remote) == ["update", "notice"]
+    assert sent(bystander) == ["notice"]
+    stats_a, stats_b = worker_a.stats(), worker_b.stats()
+    assert stats_a["backplane"]["published"] == 2
+    assert stats_b["backplane"]["received"] == 2
+    assert stats_a["latency"]["publish"]["count"] == 2
+    assert stats_b["latency"]["transport"]["count"] == 2
+    assert stats_b["latency"]["relay"]["count"] == 2
+    assert stats_b["latency"]["send"]["count"] == 3
+
+    await worker_b.stop_backplane()
+    await worker_a.publish(["inquiry:1"], "after stop")
+    await worker_b.drain()
+    assert sent(remote) == ["update", "notice"]
+
+
+@pytest.mark.anyio
+async def test_unix_socket_backplane_relays_between_managers(tmp_path):
+    worker_a = ConnectionManager()
+    worker_b = ConnectionManager()
+    await worker_a.start_backplane(UnixSocketBackplane(str(tmp_path)))
+    await worker_b.start_backplane(UnixSocketBackplane(str(tmp_path)))
+    # a socket file left behind by a crashed process is cleaned up
+    stale = UnixSocketBackplane(str(tmp_path))
+    await stale.start(lambda payload: None)
+    stale._sock.close()
+    stale._sock = None
+    remote = DummyWebSocket()
+    await worker_b.connect(remote)
+
+    try:
+        await worker_a.publish(["inquiry:5"], "hello")
+        for _ in range(100):
+            if remote.send_text.await_count:
+                break
+            await asyncio.sleep(0.01)
+
+        assert sent(remote) == ["hello"]
+        assert worker_b.stats()["backplane"]["received"] == 1
+        assert not (tmp_path / stale.path.rsplit("/", 1)[1]).exists()
+    finally:
+        await worker_a.stop_backplane()
+        await worker_b.stop_backplane()
+    assert list(tmp_path.iterdir()) == []
+
+
+@pytest.mark.anyio
+async def test_postgres_backplane_drops_payloads_too_large_for_notify():
+    backplane = PostgresBackplane("postgresql://localhost/none")
+
+    await backplane.publish("x" * 8000)
+
+    assert backplane.dropped == 1
+    assert backplane.published == 0
+
+
+class FakePgConnection:
+    def __init__(self):
+        self.listeners = []
+        self.termination_listeners = []
+        self.closed = False
+
+    async def add_listener(self, channel, callback):
+        self.listeners.append((channel, callback))
+
+    def add_termination_listener(self, callback):
+        self.termination_listeners.append(callback)
+
+    def is_closed(self):
+        return self.closed
+
+    async def execute(self, *args, **kwargs):
+        pass
+
+    def terminate(self):
+        self.closed = True
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.mark.anyio
+async def test_postgres_backplane_listens_again_after_connection_loss(monkeypatch):
+    import asyncpg
+
+    connections = []
+
+    async def fake_connect(dsn):
+        connections.append(FakePgConnection())
+        return connections[-1]
+
+    monkeypatch.setattr(asyncpg, "connect", fake_connect)
+    received = []
+    backplane = PostgresBackplane("postgresql://localhost/none", channel="events")
+    await backplane.start(received.append)
+    try:
+        # the server went away; this process never publishes
+        first = connections[0]
+        first.closed = True
+        first.termination_listeners[0](first)
+        for _ in range(100):
+            if len(connections) == 2:
+                break
+            await asyncio.sleep(0.01)
+
+        assert len(connections) == 2
+        channel, callback = connections[1].listeners[0]
+        assert channel == "events"
+        callback(connections[1], 1, channel, "payload")
+        assert received == ["payload"]
+        assert backplane.stats()["reconnects"] == 1
+    finally:
+        await backplane.stop()
+    assert connections[1].closed
+
+
+def test_build_backplane_from_settings(monkeypatch):
+    assert build_backplane("") is None
+    assert build_backplane("bogus") is None
+    assert isinstance(build_backplane("memory"), InProcessBackplane)
+    monkeypatch.setattr("inq_service_svc.config.WS_BACKPLANE_DSN", "")
+    monkeypatch.setattr("inq_service_svc.config.DATABASE_URL", "postgresql+psycopg2://u:p@db:5432/inq")
+    backplane = build_backplane("postgres")
+    assert isinstance(backplane, PostgresBackplane)
+    assert backplane.dsn == "postgresql://u:p@db:5432/inq"
+    assert postgres_dsn("postgresql+asyncpg://u@db/inq") == "postgresql://u@db/inq"